@@ -0,0 +1,184 @@
+"""
+Débit et mémoire du scoring en masse, selon le format du corps.
+
+Un même lot d'élèves (tirés du jeu de données, avec remise) est envoyé :
+
+- json         : /predict-batch-with-g2 (liste JSON, validation Pydantic par ligne)
+- arrow-stream : /predict-bulk, Arrow IPC (flux)
+- parquet      : /predict-bulk, Parquet
+- ndjson       : /predict-bulk, NDJSON
+- arrow-ndjson : /predict-bulk?stream=true, Arrow IPC en entrée, prédictions
+                 renvoyées bloc par bloc en NDJSON
+- arrow-explain: /predict-bulk?explain=true, Arrow IPC avec contributions
+
+Pour chaque format : lignes/s (médiane de `--runs` requêtes, encodage du
+corps exclu) et pic d'allocations Python/NumPy pendant une requête
+(tracemalloc, mesuré à part ; les tampons Arrow natifs n'y figurent pas).
+
+L'application est chargée en process comme dans serving_bench.
+
+Exemples (depuis backend/) :
+
+    python -m benchmarks.bulk_bench --rows 100000 --runs 3 --output bulk.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import pandas as pd
+
+from benchmarks.serving_bench import DATASET, load_app
+
+FORMATS = ["json", "arrow-stream", "parquet", "ndjson", "arrow-ndjson", "arrow-explain"]
+
+
+# -------------------------------------------------------------------
+# Corps de requête
+# -------------------------------------------------------------------
+
+def make_requests(df: pd.DataFrame) -> dict:
+    """(url, corps, en-têtes) par format, pour un DataFrame d'élèves."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    stream = io.BytesIO()
+    with pa.ipc.new_stream(stream, table.schema) as writer:
+        writer.write_table(table)
+    parquet = io.BytesIO()
+    pq.write_table(table, parquet)
+
+    arrow = {"Content-Type": "application/vnd.apache.arrow.stream"}
+    return {
+        "json": (
+            "/predict-batch-with-g2",
+            json.dumps(df.to_dict(orient="records")).encode(),
+            {"Content-Type": "application/json"},
+        ),
+        "arrow-stream": ("/predict-bulk", stream.getvalue(), arrow),
+        "parquet": (
+            "/predict-bulk",
+            parquet.getvalue(),
+            {"Content-Type": "application/vnd.apache.parquet"},
+        ),
+        "ndjson": (
+            "/predict-bulk",
+            df.to_json(orient="records", lines=True).encode(),
+            {"Content-Type": "application/x-ndjson"},
+        ),
+        "arrow-ndjson": ("/predict-bulk?stream=true", stream.getvalue(), arrow),
+        "arrow-explain": ("/predict-bulk?explain=true", stream.getvalue(), arrow),
+    }
+
+
+# -------------------------------------------------------------------
+# Mesure
+# -------------------------------------------------------------------
+
+async def send(client: httpx.AsyncClient, url: str, body: bytes, headers: dict) -> float:
+    start = time.perf_counter()
+    response = await client.post(url, content=body, headers=headers)
+    elapsed = time.perf_counter() - start
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} : HTTP {response.status_code} {response.text[:200]}")
+    return elapsed
+
+
+async def bench_format(client, request: tuple, n_rows: int, runs: int) -> dict:
+    url, body, headers = request
+    await send(client, url, body, headers)  # warm-up (imports, premier bloc)
+
+    durations = [await send(client, url, body, headers) for _ in range(runs)]
+
+    tracemalloc.start()
+    try:
+        await send(client, url, body, headers)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    duration = statistics.median(durations)
+    return {
+        "body_bytes": len(body),
+        "median_s": round(duration, 4),
+        "rows_per_s": round(n_rows / duration),
+        "peak_python_mb": round(peak / 2**20, 1),
+    }
+
+
+async def run_bulk_benchmark_async(app, df, formats: list = FORMATS, runs: int = 3) -> dict:
+    requests = make_requests(df)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        results = {
+            fmt: await bench_format(client, requests[fmt], len(df), runs)
+            for fmt in formats
+        }
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "rows": len(df),
+            "runs": runs,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "formats": results,
+    }
+
+
+def sample_students(dataset: pd.DataFrame, n_rows: int) -> pd.DataFrame:
+    from modules.data_preparation import FEATURES_WITH_G2
+
+    return dataset[FEATURES_WITH_G2].sample(n=n_rows, replace=True, random_state=0)
+
+
+def print_report(results: dict):
+    print(f"\n{results['config']['rows']} lignes, médiane de {results['config']['runs']} requêtes\n")
+    header = f"{'format':<14}{'corps (Mo)':>12}{'lignes/s':>12}{'durée (s)':>11}{'pic (Mo)':>10}"
+    print(header)
+    print("-" * len(header))
+    for fmt, r in results["formats"].items():
+        print(
+            f"{fmt:<14}{r['body_bytes'] / 2**20:>12.1f}{r['rows_per_s']:>12}"
+            f"{r['median_s']:>11.3f}{r['peak_python_mb']:>10.1f}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="élèves par requête")
+    parser.add_argument("--runs", type=int, default=3, help="requêtes mesurées par format")
+    parser.add_argument("--formats", nargs="+", default=FORMATS, choices=FORMATS)
+    parser.add_argument("--output", type=Path, help="fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    df = sample_students(pd.read_csv(DATASET, sep=";"), args.rows)
+    with tempfile.TemporaryDirectory() as workdir:
+        app, _ = load_app(Path(workdir))
+        results = asyncio.run(
+            run_bulk_benchmark_async(app, df, formats=args.formats, runs=args.runs)
+        )
+
+    print_report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Part du suivi MLflow dans la durée d'un ré-entraînement complet.
+
+Le ré-entraînement des deux scénarios (retrain_models) est mesuré avec
+trois configurations de suivi :
+
+- none    : aucun suivi (entraînement seul, référence)
+- legacy  : ancien comportement, un appel MLflow par paramètre / métrique
+            puis log_model synchrone avant la réponse
+- batched : paramètres et métriques en un log_batch, modèle loggé en
+            arrière-plan (modules/tracking.py) ; la durée d'écriture de
+            l'artefact après la réponse est mesurée à part
+
+Les runs MLflow sont écrits dans un répertoire temporaire.
+
+Exemples (depuis backend/) :
+
+    python -m benchmarks.retrain_bench --runs 3 --output retrain.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from modules.retraining import retrain_models
+from modules.tracking import MlflowTracker, NullTracker, set_tracker
+
+DATA_PATH = Path(__file__).resolve().parents[2] / "data" / "students_concat.csv"
+
+
+class LegacyMlflowTracker(MlflowTracker):
+    """Reproduction de l'ancien suivi : écritures unitaires, modèle synchrone."""
+
+    def write(self, run):
+        import mlflow
+        import mlflow.sklearn
+
+        self._setup()
+        mlflow.set_experiment(self.experiment)
+        with mlflow.start_run(run_name=run.run_name):
+            for name, value in run.params.items():
+                mlflow.log_param(name, value)
+            for name, value in run.metrics.items():
+                mlflow.log_metric(name, value)
+            if run.model is not None:
+                mlflow.sklearn.log_model(run.model, name="model")
+
+
+def measure(df: pd.DataFrame, tracker, workdir: Path) -> dict:
+    output_dir = Path(tempfile.mkdtemp(dir=workdir))
+    previous = set_tracker(tracker)
+    try:
+        start = time.perf_counter()
+        result = retrain_models(df, output_dir=output_dir)
+        critical = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tracker.flush()
+        background = time.perf_counter() - start
+    finally:
+        set_tracker(previous)
+
+    tracking = sum(r["timings"]["tracking"] for r in result["results"].values())
+    return {"critical_s": critical, "tracking_s": tracking, "background_s": background}
+
+
+def run_retrain_benchmark(runs: int = 3, data_path: Path = DATA_PATH) -> dict:
+    os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")
+    df = pd.read_csv(data_path, sep=";")
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        uri = f"file://{workdir / 'mlruns'}"
+        trackers = {
+            "none": NullTracker(),
+            "legacy": LegacyMlflowTracker(uri=uri),
+            "batched": MlflowTracker(uri=uri),
+        }
+        # Premier passage non mesuré (imports, création de l'expérience)
+        for tracker in trackers.values():
+            measure(df, tracker, workdir)
+
+        for label, tracker in trackers.items():
+            samples = [measure(df, tracker, workdir) for _ in range(runs)]
+            results[label] = {
+                key: round(statistics.median(s[key] for s in samples), 3)
+                for key in ("critical_s", "tracking_s", "background_s")
+            }
+
+    for stats in results.values():
+        stats["tracking_share"] = round(stats["tracking_s"] / stats["critical_s"], 3)
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "n_rows": len(df),
+        "runs": runs,
+        "trackers": results,
+    }
+
+
+def print_report(results: dict):
+    print(f"\nretrain_models — {results['n_rows']} lignes, médiane de {results['runs']} runs\n")
+    header = f"{'suivi':<10}{'réponse (s)':>13}{'suivi (s)':>11}{'part':>8}{'après (s)':>11}"
+    print(header)
+    print("-" * len(header))
+    for label, s in results["trackers"].items():
+        print(
+            f"{label:<10}{s['critical_s']:>13.3f}{s['tracking_s']:>11.3f}"
+            f"{s['tracking_share']:>8.1%}{s['background_s']:>11.3f}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3, help="mesures par configuration")
+    parser.add_argument("--output", type=Path, help="fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    results = run_retrain_benchmark(runs=args.runs)
+    print_report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
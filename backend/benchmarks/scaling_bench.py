@@ -0,0 +1,227 @@
+"""
+Débit de l'API en fonction du nombre de workers (gunicorn, pré-fork).
+
+Pour chaque nombre de workers, l'API est lancée avec gunicorn.conf.py sur
+un port local, puis chargée par plusieurs process clients (HTTP réel,
+connexions keep-alive). Le rapport donne le débit, les latences et
+l'accélération par rapport à un seul worker.
+
+Les process clients tournent sur la même machine : sur peu de cœurs, ils
+consomment une partie du CPU mesuré. Le cache des prédictions est
+désactivé pour mesurer l'inférence.
+
+Exemples (depuis backend/) :
+
+    python -m benchmarks.scaling_bench --workers 1 2 4 --duration 10
+    python -m benchmarks.scaling_bench --output scaling.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from benchmarks.serving_bench import make_payloads, summarize, train_fixture_models
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+ENDPOINT = "/predict-with-g2"
+
+
+def default_worker_counts() -> list:
+    counts, n = [], 1
+    while n < os.cpu_count():
+        counts.append(n)
+        n *= 2
+    return counts + [os.cpu_count()]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# -------------------------------------------------------------------
+# Serveur
+# -------------------------------------------------------------------
+
+def start_server(workdir: Path, workers: int, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "PORT": str(port),
+        "MODELS_DIR": str(workdir / "models"),
+        "LOGS_DIR": str(workdir / "logs"),
+        "PREDICTION_LOG": str(workdir / "logs" / "predictions.jsonl"),
+        "PREDICTION_DB": str(workdir / "logs" / "predictions.db"),
+        "PREDICTION_CACHE_SIZE": "0",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:app", "-c", "gunicorn.conf.py",
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def wait_ready(url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"API non disponible sur {url}")
+
+
+# -------------------------------------------------------------------
+# Clients (process séparés)
+# -------------------------------------------------------------------
+
+async def _client_loop(url: str, payloads: list, duration: float, concurrency: int) -> tuple:
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        async def worker(offset):
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.post(ENDPOINT, json=payloads[i % len(payloads)])
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+                i += concurrency
+
+        await asyncio.gather(*(worker(k) for k in range(concurrency)))
+
+    return latencies, errors
+
+
+def client_process(url: str, payloads: list, duration: float, concurrency: int) -> tuple:
+    return asyncio.run(_client_loop(url, payloads, duration, concurrency))
+
+
+def run_load(url: str, payloads: list, duration: float, clients: int, concurrency: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(clients) as pool:
+        results = pool.starmap(
+            client_process, [(url, payloads, duration, concurrency)] * clients
+        )
+
+    latencies = [value for lat, _ in results for value in lat]
+    errors = sum(err for _, err in results)
+    # Chaque client charge l'API pendant `duration` secondes (hors démarrage)
+    return summarize(latencies, errors, duration)
+
+
+# -------------------------------------------------------------------
+# Campagne
+# -------------------------------------------------------------------
+
+def run_scaling_benchmark(
+    worker_counts: list,
+    duration: float = 10.0,
+    clients: int = None,
+    concurrency: int = 16
+) -> dict:
+    clients = clients or max(2, os.cpu_count() // 2)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        (workdir / "models").mkdir()
+        (workdir / "logs").mkdir()
+        payloads = make_payloads(train_fixture_models(workdir / "models"))[ENDPOINT]
+
+        for workers in worker_counts:
+            port = free_port()
+            url = f"http://127.0.0.1:{port}"
+            server = start_server(workdir, workers, port)
+            try:
+                wait_ready(url)
+                # Préchauffage (connexions, premiers appels de chaque worker)
+                run_load(url, payloads, 1.0, clients, concurrency)
+                stats = run_load(url, payloads, duration, clients, concurrency)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+            results[workers] = stats
+
+    base = results[worker_counts[0]]["throughput_rps"]
+    for workers, stats in results.items():
+        stats["speedup"] = round(stats["throughput_rps"] / base, 2) if base else None
+        stats["efficiency"] = (
+            round(stats["speedup"] * worker_counts[0] / workers, 2) if base else None
+        )
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "endpoint": ENDPOINT,
+        "duration_s": duration,
+        "clients": clients,
+        "concurrency_per_client": concurrency,
+        "workers": {str(w): s for w, s in results.items()},
+    }
+
+
+def print_report(results: dict):
+    print(
+        f"\n{results['endpoint']} — {results['cpu_count']} cœurs, "
+        f"{results['clients']} clients × {results['concurrency_per_client']} connexions, "
+        f"{results['duration_s']} s\n"
+    )
+    header = f"{'workers':>8}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'accél.':>8}{'effic.':>8}{'erreurs':>9}"
+    print(header)
+    print("-" * len(header))
+    for workers, s in results["workers"].items():
+        print(
+            f"{workers:>8}{s['throughput_rps']:>10.1f}{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}"
+            f"{s['p99_ms']:>9.2f}{s['speedup']:>8.2f}{s['efficiency']:>8.2f}{s['errors']:>9}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=default_worker_counts())
+    parser.add_argument("--duration", type=float, default=10.0, help="secondes par palier")
+    parser.add_argument("--clients", type=int, help="process clients")
+    parser.add_argument("--concurrency", type=int, default=16, help="connexions par client")
+    parser.add_argument("--output", type=Path, help="fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    results = run_scaling_benchmark(
+        sorted(args.workers),
+        duration=args.duration,
+        clients=args.clients,
+        concurrency=args.concurrency
+    )
+    print_report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Latence d'une prédiction unitaire : scoreur compilé (modules/fast_scorer.py)
+contre pipeline sklearn complet, sans couche HTTP.
+
+Les modèles sont entraînés à partir de data/students_concat.csv dans un
+répertoire temporaire, comme dans serving_bench.
+
+Exemples (depuis backend/) :
+
+    python -m benchmarks.scorer_bench --repeat 5000 --output scorer.json
+    python -m benchmarks.scorer_bench --max-us 10 --min-speedup 50
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from benchmarks.serving_bench import train_fixture_models
+
+MODELS = ["with_g2", "without_g2"]
+
+
+# -------------------------------------------------------------------
+# Mesure
+# -------------------------------------------------------------------
+
+def median_latency_us(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1e6
+
+
+def bench_model(pipeline, df, repeat: int) -> dict:
+    from modules.fast_scorer import compile_pipeline
+
+    scorer = compile_pipeline(pipeline)
+    X = df[scorer.features]
+    student = X.iloc[0].to_dict()
+    row = X.head(1).copy()
+
+    compiled_us = median_latency_us(lambda: scorer.predict_one(student), repeat)
+    # Pipeline sklearn : quelques centaines de µs par appel, moins de répétitions
+    pipeline_us = median_latency_us(lambda: pipeline.predict(row), max(repeat // 40, 10))
+    return {
+        "compiled_us": round(compiled_us, 2),
+        "pipeline_us": round(pipeline_us, 2),
+        "speedup": round(pipeline_us / compiled_us, 1),
+    }
+
+
+def run_scorer_benchmark(models_dir: Path, df, repeat: int = 2000) -> dict:
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "models": {
+            name: bench_model(joblib.load(models_dir / f"model_{name}.pkl"), df, repeat)
+            for name in MODELS
+        },
+    }
+
+
+def check_limits(results: dict, max_us: float = None, min_speedup: float = None) -> list:
+    """Liste des dépassements des seuils demandés (vide si aucun)."""
+    failures = []
+    for name, r in results["models"].items():
+        if max_us is not None and r["compiled_us"] > max_us:
+            failures.append(f"{name} : {r['compiled_us']} µs > {max_us} µs")
+        if min_speedup is not None and r["speedup"] < min_speedup:
+            failures.append(f"{name} : accélération ×{r['speedup']} < ×{min_speedup}")
+    return failures
+
+
+def print_report(results: dict):
+    print(f"{'modèle':<14}{'compilé µs':>12}{'pipeline µs':>13}{'×':>8}")
+    for name, r in results["models"].items():
+        print(
+            f"{name:<14}{r['compiled_us']:>12.2f}{r['pipeline_us']:>13.2f}"
+            f"{r['speedup']:>8.1f}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=2000, help="prédictions mesurées")
+    parser.add_argument("--max-us", type=float, help="latence maximale du scoreur compilé")
+    parser.add_argument("--min-speedup", type=float, help="accélération minimale")
+    parser.add_argument("--output", type=Path, help="fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        df = train_fixture_models(Path(workdir))
+        results = run_scorer_benchmark(Path(workdir), df, repeat=args.repeat)
+
+    print_report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    failures = check_limits(results, args.max_us, args.min_speedup)
+    for failure in failures:
+        print(f"Seuil dépassé : {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+Benchmark de l'API de prédiction, exécutée en process (transport ASGI).
+
+Les modèles sont ré-entraînés à partir de data/students_concat.csv dans un
+répertoire temporaire : les modèles livrés et les journaux ne sont pas touchés.
+
+Exemples (depuis backend/) :
+
+    python -m benchmarks.serving_bench --requests 2000 --concurrency 32 \\
+        --output bench.json
+    python -m benchmarks.serving_bench --baseline bench.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import joblib
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+DATASET = BACKEND_DIR.parent / "data" / "students_concat.csv"
+
+ENDPOINTS = ["/predict-with-g2", "/predict-without-g2", "/health"]
+
+
+# -------------------------------------------------------------------
+# Préparation (modèles de test + application)
+# -------------------------------------------------------------------
+
+def train_fixture_models(models_dir: Path, dataset: Path = DATASET) -> pd.DataFrame:
+    """Entraîne les deux modèles de production sur le jeu de données complet."""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    from modules.data_preparation import prepare_dataset
+    from modules.preprocessing import make_preprocessor
+
+    df = pd.read_csv(dataset, sep=";")
+    for name, include_g2 in (("with_g2", True), ("without_g2", False)):
+        X, y = prepare_dataset(df, include_g2=include_g2)
+        pipeline = Pipeline(
+            steps=[
+                ("preprocessor", make_preprocessor(X)),
+                ("classifier", LogisticRegression(max_iter=1000))
+            ]
+        )
+        joblib.dump(pipeline.fit(X, y), models_dir / f"model_{name}.pkl")
+    return df
+
+
+def make_payloads(df: pd.DataFrame) -> dict:
+    from modules.data_preparation import FEATURES_WITH_G2, FEATURES_WITHOUT_G2
+
+    with_g2 = df[FEATURES_WITH_G2].to_dict(orient="records")
+    return {
+        "/predict-with-g2": with_g2,
+        "/predict-without-g2": df[FEATURES_WITHOUT_G2].to_dict(orient="records"),
+        "/health": [None],
+        # Hors ENDPOINTS par défaut : --endpoints pour mesurer le surcoût
+        "/predict-with-g2?explain=true": with_g2,
+    }
+
+
+def load_app(workdir: Path):
+    """Importe main.py avec des répertoires de travail isolés."""
+    models_dir = workdir / "models"
+    models_dir.mkdir()
+    df = train_fixture_models(models_dir)
+
+    os.environ["MODELS_DIR"] = str(models_dir)
+    os.environ["LOGS_DIR"] = str(workdir)
+    os.environ["PREDICTION_LOG"] = str(workdir / "predictions.jsonl")
+    os.environ["PREDICTION_DB"] = str(workdir / "predictions.db")
+    os.environ["FEATURE_STORE_DIR"] = str(workdir / "feature-store")
+
+    from main import app, start_process_services
+
+    # Transport ASGI sans lifespan : journaux et scrutation démarrés ici
+    start_process_services()
+    return app, make_payloads(df)
+
+
+# -------------------------------------------------------------------
+# Mesure
+# -------------------------------------------------------------------
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    values = np.asarray(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+async def bench_endpoint(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    payloads: list,
+    n_requests: int,
+    concurrency: int
+) -> dict:
+    latencies, errors = [], 0
+    counter = iter(range(n_requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            payload = payloads[i % len(payloads)]
+            start = time.perf_counter()
+            if payload is None:
+                response = await client.get(endpoint)
+            else:
+                response = await client.post(endpoint, json=payload)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_benchmark_async(
+    app,
+    payloads: dict,
+    endpoints: list = ENDPOINTS,
+    n_requests: int = 1000,
+    concurrency: int = 16,
+    warmup: int = 50
+) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = {}
+        for endpoint in endpoints:
+            await bench_endpoint(client, endpoint, payloads[endpoint], warmup, concurrency)
+            results[endpoint] = await bench_endpoint(
+                client, endpoint, payloads[endpoint], n_requests, concurrency
+            )
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "requests": n_requests,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "endpoints": results,
+    }
+
+
+def run_benchmark(app, payloads: dict, **kwargs) -> dict:
+    return asyncio.run(run_benchmark_async(app, payloads, **kwargs))
+
+
+# -------------------------------------------------------------------
+# Comparaison avec une référence
+# -------------------------------------------------------------------
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float = 0.2) -> list:
+    """
+    Liste des régressions : p95 ou p99 plus lents, ou débit plus faible,
+    de plus de `tolerance` (proportion) par rapport à la référence.
+    """
+    regressions = []
+    for endpoint, current in results["endpoints"].items():
+        reference = baseline.get("endpoints", {}).get(endpoint)
+        if reference is None:
+            continue
+
+        for metric in ("p95_ms", "p99_ms"):
+            if current[metric] > reference[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{endpoint} {metric} : {reference[metric]} → {current[metric]}"
+                )
+        if current["throughput_rps"] < reference["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{endpoint} throughput_rps : "
+                f"{reference['throughput_rps']} → {current['throughput_rps']}"
+            )
+    return regressions
+
+
+def print_report(results: dict):
+    print(f"{'endpoint':<32}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'err':>6}")
+    for endpoint, r in results["endpoints"].items():
+        print(
+            f"{endpoint:<32}{r['throughput_rps']:>10}{r['p50_ms']:>10}"
+            f"{r['p95_ms']:>10}{r['p99_ms']:>10}{r['errors']:>6}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=1000, help="requêtes par endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--endpoints", nargs="+", default=ENDPOINTS)
+    parser.add_argument("--output", type=Path, help="fichier JSON de résultats")
+    parser.add_argument("--baseline", type=Path, help="résultats de référence (JSON)")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app, payloads = load_app(Path(workdir))
+        results = run_benchmark(
+            app,
+            payloads,
+            endpoints=args.endpoints,
+            n_requests=args.requests,
+            concurrency=args.concurrency,
+            warmup=args.warmup
+        )
+
+    print_report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        regressions = compare_with_baseline(
+            results, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(BACKEND_DIR))
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Mesure du démarrage à froid de l'API (temps jusqu'à la disponibilité, mémoire).
+
+Chaque mesure lance un interpréteur neuf qui importe main.py puis interroge
+/health jusqu'à obtenir 200. Le premier lancement part d'un registre vide
+(import des modèles livrés + export du format compact) ; les suivants
+réutilisent le registre, comme un nouveau worker ou un nouveau conteneur
+construit avec le registre déjà exporté.
+
+Exemples (depuis backend/) :
+
+    python -m benchmarks.startup_bench --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+SHIPPED_MODELS = [BACKEND_DIR / "models" / name
+                  for name in ("model_with_g2.pkl", "model_without_g2.pkl")]
+
+# Modules lourds dont on veut vérifier l'absence dans le process de service
+HEAVY_MODULES = ["mlflow", "sklearn", "scipy"]
+
+# Script exécuté dans le process mesuré : imprime une ligne JSON
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    status = client.get("/health").status_code
+ready = time.perf_counter()
+rss_kb = 0
+with open("/proc/self/status") as f:
+    for line in f:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+print(json.dumps({
+    "import_s": imported - start,
+    "ready_s": ready - start,
+    "health_status": status,
+    "rss_mb": rss_kb / 1024,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_once(workdir: Path) -> dict:
+    env = {
+        **os.environ,
+        "MODELS_DIR": str(workdir / "models"),
+        "LOGS_DIR": str(workdir / "logs"),
+        "PREDICTION_LOG": str(workdir / "logs" / "predictions.jsonl"),
+        "PREDICTION_DB": str(workdir / "logs" / "predictions.db"),
+    }
+    start = datetime.now()
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["wall_s"] = (datetime.now() - start).total_seconds()
+    return result
+
+
+def run_startup_benchmark(runs: int = 5, models: list = SHIPPED_MODELS) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        (workdir / "models").mkdir()
+        (workdir / "logs").mkdir()
+        for path in models:
+            shutil.copy(path, workdir / "models" / path.name)
+
+        cold = measure_once(workdir)
+        warm = [measure_once(workdir) for _ in range(runs)]
+
+    def median(key):
+        return round(statistics.median(run[key] for run in warm), 3)
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "runs": runs,
+        "cold": {k: round(v, 3) if isinstance(v, float) else v for k, v in cold.items()},
+        "warm": {
+            "wall_s": median("wall_s"),
+            "import_s": median("import_s"),
+            "ready_s": median("ready_s"),
+            "rss_mb": median("rss_mb"),
+            "max_rss_mb": median("max_rss_mb"),
+            "heavy_modules": sorted({m for run in warm for m in run["heavy_modules"]}),
+            "health_status": sorted({run["health_status"] for run in warm}),
+        },
+    }
+
+
+def print_report(results: dict):
+    print(f"\nDémarrage — {results['runs']} lancements ({results['python']})\n")
+    print(f"{'':<6}{'prêt (s)':>10}{'import (s)':>12}{'RSS (Mo)':>10}{'pic (Mo)':>10}  modules lourds")
+    for label in ("cold", "warm"):
+        r = results[label]
+        print(
+            f"{label:<6}{r['ready_s']:>10.3f}{r['import_s']:>12.3f}"
+            f"{r['rss_mb']:>10.1f}{r['max_rss_mb']:>10.1f}  {', '.join(r['heavy_modules']) or '-'}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="lancements à chaud")
+    parser.add_argument("--output", type=Path, help="fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    results = run_startup_benchmark(runs=args.runs)
+    print_report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Service multi-workers (pré-fork) :
+
+    gunicorn main:app -c gunicorn.conf.py
+
+- l'application (modèles compris) est chargée une seule fois dans le
+  process parent (preload_app) puis partagée en copy-on-write par les
+  workers ; les scoreurs compacts sont en plus projetés en mémoire
+  depuis le registre (pages du cache disque communes à tous les process)
+- gc.freeze() avant les forks : le ramasse-miettes des workers ne touche
+  plus aux objets hérités, qui restent partagés
+- aucun thread dans le parent : journaux et scrutation du registre sont
+  démarrés dans chaque worker (post_fork puis lifespan)
+- WEB_CONCURRENCY : nombre de workers (1 par défaut). Le cache des
+  prédictions, /metrics, /cache/stats et /drift restent propres à chaque
+  worker : au-delà d'un worker, chaque réponse ne reflète que le process
+  qui l'a servie
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY") or 1)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    # Appelé dans le parent, après le chargement de l'application et avant
+    # le lancement des workers
+    gc.freeze()
+    server.log.info("Application préchargée, %s workers", workers)
+
+
+def post_fork(server, worker):
+    # Appelé dans chaque worker juste après le fork ; les threads du
+    # process sont ensuite démarrés par le lifespan de l'application
+    import main
+
+    main.after_fork()
@@ -1,35 +1,74 @@
 from fastapi import FastAPI, HTTPException, Request
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+from typing import List
 import pandas as pd
-import joblib
 from pathlib import Path
 from loguru import logger
 import sys
 from middleware.audit_middleware import audit_requests
-from modules.retraining import retrain_model
+from modules.bulk_io import (
+    BulkFormatError,
+    bulk_format,
+    iter_bulk_frames,
+    ndjson_line,
+    predictions_payload,
+)
+from modules.drift import DriftMonitors
+from modules.explanations import explain_columns, explain_one, explain_rows
+from modules.feature_store import FeatureStore, FeatureStoreError
+from modules.ingestion import CsvSchemaError, read_training_csv
+from modules.metrics import (
+    INFERENCE_LATENCY,
+    MODEL_INFO,
+    MODEL_LOAD_DURATION,
+    MODEL_LOADED_AT,
+    PREDICTION_LOG_WRITE,
+    REGISTRY as METRICS,
+)
+from modules.micro_batching import MicroBatcher
+from modules.model_registry import (
+    MODEL_FILES,
+    ModelRegistry,
+    ModelStore,
+    UnknownModelVersion,
+)
+from modules.prediction_cache import PredictionCache
+from modules.prediction_log import PredictionLogWriter
+from modules.prediction_store import (
+    GRANULARITIES,
+    MAX_PAGE_SIZE,
+    MAX_STATS_BUCKETS,
+    ROLLUP_COUNTERS,
+    PredictionStore,
+    bucket_start,
+)
+from modules.retrain_jobs import RetrainJobManager
+from modules.tracing import Tracer, mark_since_start, span
+from modules.training_cache import TrainingCache
 
 from fastapi import UploadFile, File, Form
-import tempfile
-import shutil
-import uuid
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import partial
+import os
+import tempfile
+import time
 
 # -------------------------------------------------------------------
 # Configuration des chemins
 # -------------------------------------------------------------------
 
 BASE_DIR = Path(__file__).resolve().parent
-MODELS_DIR = BASE_DIR / "models"
+MODELS_DIR = Path(os.getenv("MODELS_DIR", BASE_DIR / "models"))
 DATA_DIR = BASE_DIR / "data"
-LOGS_DIR = BASE_DIR / "logs"
+LOGS_DIR = Path(os.getenv("LOGS_DIR", BASE_DIR / "logs"))
 
 MODELS_DIR.mkdir(exist_ok=True)
 DATA_DIR.mkdir(exist_ok=True)
 LOGS_DIR.mkdir(exist_ok=True)
 
-MODEL_WITH_G2_PATH = MODELS_DIR / "model_with_g2.pkl"
-MODEL_WITHOUT_G2_PATH = MODELS_DIR / "model_without_g2.pkl"
-
 # -------------------------------------------------------------------
 # Configuration Loguru
 # -------------------------------------------------------------------
@@ -55,14 +94,32 @@ logger.add(
     format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {module} | {message}"
 )
 
-# Fichier dédié pour les logs de prédiction
-PREDICTION_LOG = Path("/app/logs/predictions.jsonl")
+# Fichier dédié pour les logs de prédiction : événements compacts écrits
+# par lots depuis un thread dédié (hors du chemin de la requête)
+PREDICTION_LOG = Path(os.getenv("PREDICTION_LOG", "/app/logs/predictions.jsonl"))
 
-logger.add(
+# Historique indexé (SQLite, WAL) alimenté par le même writer
+PREDICTION_DB = Path(os.getenv("PREDICTION_DB", "/app/logs/predictions.db"))
+prediction_store = PredictionStore(PREDICTION_DB)
+
+prediction_log = PredictionLogWriter(
     PREDICTION_LOG,
-    level="INFO",
-    serialize=True,   # Pour générer sous format JSON
-    filter=lambda record: record["extra"].get("event") == "prediction"
+    store=prediction_store,
+    max_bytes=int(os.getenv("PREDICTION_LOG_MAX_BYTES", 10 * 1024 * 1024))
+)
+
+# Étapes de chaque requête : en-tête Server-Timing (SERVER_TIMING=0 pour le
+# retirer) et traces complètes d'une proportion TRACE_SAMPLE_RATE des
+# requêtes, écrites en OTLP/JSON dans TRACE_LOG (une ligne par requête)
+trace_log = PredictionLogWriter(
+    Path(os.getenv("TRACE_LOG", LOGS_DIR / "traces.jsonl")),
+    max_bytes=int(os.getenv("TRACE_LOG_MAX_BYTES", 10 * 1024 * 1024)),
+    flush_metric=None
+)
+tracer = Tracer(
+    writer=trace_log,
+    sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0")),
+    server_timing=os.getenv("SERVER_TIMING", "1") != "0"
 )
 
 # -------------------------------------------------------------------
@@ -70,22 +127,140 @@ logger.add(
 # -------------------------------------------------------------------
 
 logger.info("Chargement des modèles...")
-model_with_g2 = joblib.load(MODEL_WITH_G2_PATH)
-model_without_g2 = joblib.load(MODEL_WITHOUT_G2_PATH)
+
+# Registre versionné (les modèles livrés servent de version initiale)
+registry = ModelRegistry(MODELS_DIR)
+registry.bootstrap()
+
+# Cache LRU des prédictions (PREDICTION_CACHE_SIZE=0 pour le désactiver)
+prediction_cache = PredictionCache(
+    maxsize=int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+)
+
+# Micro-batching des prédictions unitaires concurrentes (opt-in) :
+# MICROBATCH_MAX_SIZE prédictions au plus par lot (0 = désactivé), fenêtre
+# adaptative d'au plus MICROBATCH_MAX_WAIT_MS millisecondes
+micro_batcher = MicroBatcher(
+    max_size=int(os.getenv("MICROBATCH_MAX_SIZE", "0")),
+    max_wait=float(os.getenv("MICROBATCH_MAX_WAIT_MS", "2")) / 1000
+)
+
+# Dérive des entrées par modèle : fenêtre glissante (DRIFT_WINDOW_SECONDS)
+# découpée en segments (DRIFT_SEGMENT_SECONDS), propre à chaque worker
+drift_monitors = DriftMonitors(
+    window_seconds=float(os.getenv("DRIFT_WINDOW_SECONDS", "3600")),
+    segment_seconds=float(os.getenv("DRIFT_SEGMENT_SECONDS", "60"))
+)
+
+
+def on_model_swap(model):
+    prediction_cache.invalidate(model.name, model.version)
+    drift_monitors.reset(model.name, model.version, model.reference_profile)
+    MODEL_INFO.set(
+        (model.name, model.version, str(model.scorer.compiled).lower()), 1,
+        replace_prefix=1
+    )
+    MODEL_LOADED_AT.set((model.name,), time.time())
+    MODEL_LOAD_DURATION.set((model.name,), model.load_seconds)
+
+
+# Modèles servis, avec scoreur compilé (rechargeables à chaud)
+models = ModelStore(registry, on_swap=on_model_swap)
+models.reload_all()
 logger.info("Modèles chargés avec succès")
 
+# -------------------------------------------------------------------
+# Jobs de ré-entraînement (pool de process séparé)
+# -------------------------------------------------------------------
+
+def on_models_updated(names: list):
+    for name in names:
+        models.reload(name)
+
+
+# Cache des entraînements : un même jeu de données ré-uploadé n'est pas
+# ré-entraîné (TRAINING_CACHE_ENTRIES=0 pour le désactiver)
+TRAINING_CACHE_ENTRIES = int(os.getenv("TRAINING_CACHE_ENTRIES", "20"))
+training_cache = None
+if TRAINING_CACHE_ENTRIES > 0:
+    training_cache = TrainingCache(
+        MODELS_DIR / "training-cache",
+        max_entries=TRAINING_CACHE_ENTRIES,
+        max_bytes=int(os.getenv("TRAINING_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+    )
+
+# Feature store local : lignes d'entraînement validées, accumulées par
+# cohorte (Parquet) ; un ré-entraînement peut partir d'un snapshot
+feature_store = FeatureStore(
+    Path(os.getenv("FEATURE_STORE_DIR", DATA_DIR / "feature-store"))
+)
+
+retrain_jobs = RetrainJobManager(
+    registry=registry,
+    max_workers=int(os.getenv("RETRAIN_WORKERS", "1")),
+    n_jobs=int(os.getenv("RETRAIN_N_JOBS", "1")),
+    on_models_updated=on_models_updated,
+    training_cache=training_cache
+)
+
+# -------------------------------------------------------------------
+# Services propres à chaque process (démarrés au lancement de chaque worker)
+# -------------------------------------------------------------------
+
+# Scrutation du registre : une promotion faite par un autre worker est
+# servie ici au plus tard après MODEL_POLL_INTERVAL secondes (0 = désactivé)
+MODEL_POLL_INTERVAL = float(os.getenv("MODEL_POLL_INTERVAL", "1.0"))
+
+
+def start_process_services():
+    """
+    Threads du process (journaux, scrutation du registre), démarrés par le
+    lifespan : jamais à l'import, qui a lieu dans le parent gunicorn
+    (preload_app) avant les forks.
+    """
+    prediction_log.start()
+    if tracer.sample_rate > 0:
+        trace_log.start()
+    models.start_watching(MODEL_POLL_INTERVAL)
+
+
+def after_fork():
+    """
+    Worker pré-forké (hook post_fork de gunicorn.conf.py) : les modèles
+    chargés par le parent restent partagés en copy-on-write ; seuls les
+    connexions, verrous et fenêtres sont recréés, et les versions promues
+    depuis le chargement du parent sont rechargées.
+    """
+    for component in (
+        registry, prediction_store, prediction_log, trace_log, models, retrain_jobs,
+        drift_monitors
+    ):
+        component.after_fork()
+    models.reload_all()
+
 # -------------------------------------------------------------------
 # Initialisation FastAPI
 # -------------------------------------------------------------------
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_process_services()
+    yield
+    models.stop_watching()
+    retrain_jobs.shutdown()
+    prediction_log.close()
+    trace_log.close()
+
+
 app = FastAPI(
     title="API Prédiction Réussite Scolaire",
     description="API de prédiction avec ou sans note du second trimestre (G2)",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Journalisation des requêtes HTTP
-app.middleware("http")(audit_requests)
+# Journalisation et instrumentation des requêtes HTTP
+app.middleware("http")(partial(audit_requests, tracer=tracer))
 
 # -------------------------------------------------------------------
 # Schémas d'entrée
@@ -117,30 +292,237 @@ class RetrainRequest(BaseModel):
 # Méthodes
 # -------------------------------------------------------------------
 
-def run_prediction(
+def interpret(prediction: int) -> str:
+    return "Réussite probable" if prediction == 1 else "Risque d’échec"
+
+
+def explanation_header(scorer) -> dict:
+    """Partie commune des explications d'un lot (None si modèle non linéaire)."""
+    if not scorer.explainable:
+        return None
+    return {"base": round(scorer.base_score, 4), "features": scorer.features}
+
+
+def lookup_prediction(model_name: str, model, student) -> tuple:
+    """
+    (clé de cache, prédiction déjà calculée ou None) ; l'entrée est
+    comptée dans le suivi de dérive.
+    """
+    # Profil déjà scoré : ni DataFrame ni inférence
+    cache_key = None
+    prediction = None
+    if prediction_cache.enabled:
+        cache_key = prediction_cache.make_key(model_name, model.version, student)
+        prediction = prediction_cache.get(cache_key)
+
+    drift_monitors.observe(model_name, student)
+    return cache_key, prediction
+
+
+def prediction_response(
     *,
     request: Request,
+    model_name: str,
     model,
-    student_dict: dict,
-    model_name: str
-):
-    df = pd.DataFrame([student_dict])
-    prediction = model.predict(df)[0]
-
-    logger.bind(
-        event="prediction",
-        timestamp=datetime.utcnow().isoformat(),
-        session_id=request.headers.get("X-Session-ID"),
-        endpoint=request.url.path,
-        model=model_name,
-        prediction=int(prediction)
-    ).info("prediction")
+    student,
+    prediction: int,
+    explain: bool
+) -> dict:
+    """Journalisation de la prédiction et corps de la réponse."""
+    start = time.perf_counter()
+    with span("log"):
+        prediction_log.write({
+            "event": "prediction",
+            "timestamp": datetime.utcnow().isoformat(),
+            "session_id": request.headers.get("X-Session-ID"),
+            "endpoint": request.url.path,
+            "model": model_name,
+            "model_version": model.version,
+            "prediction": prediction
+        })
+    PREDICTION_LOG_WRITE.observe((), time.perf_counter() - start)
 
-    return {
+    response = {
         "prediction": int(prediction),
         "mode": model_name,
-        "interpretation": "Réussite probable" if prediction == 1 else "Risque d’échec"
+        "model_version": model.version,
+        "interpretation": interpret(prediction)
+    }
+    if explain:
+        with span("explain"):
+            response["explanation"] = explain_one(model.scorer, student)
+    return response
+
+
+def run_prediction(
+    *,
+    request: Request,
+    model_name: str,
+    student,
+    explain: bool = False
+):
+    # Référence unique pour toute la requête (rechargement à chaud possible)
+    model = models.get(model_name)
+    with span("lookup"):
+        cache_key, prediction = lookup_prediction(model_name, model, student)
+
+    if prediction is None:
+        start = time.perf_counter()
+        with span("inference"):
+            prediction = int(model.scorer.predict_one(student))
+        INFERENCE_LATENCY.observe((model_name, "single"), time.perf_counter() - start)
+        if cache_key is not None:
+            prediction_cache.put(cache_key, prediction)
+
+    return prediction_response(
+        request=request,
+        model_name=model_name,
+        model=model,
+        student=student,
+        prediction=prediction,
+        explain=explain
+    )
+
+
+async def run_prediction_batched(
+    *,
+    request: Request,
+    model_name: str,
+    student,
+    explain: bool = False
+):
+    """Comme run_prediction, l'inférence passant par le micro-batcher."""
+    model = models.get(model_name)
+    with span("lookup"):
+        cache_key, prediction = lookup_prediction(model_name, model, student)
+
+    if prediction is None:
+        with span("microbatch"):
+            prediction = int(await micro_batcher.predict(model, student))
+        if cache_key is not None:
+            prediction_cache.put(cache_key, prediction)
+
+    return prediction_response(
+        request=request,
+        model_name=model_name,
+        model=model,
+        student=student,
+        prediction=prediction,
+        explain=explain
+    )
+
+
+async def predict_single(**kwargs):
+    """
+    Prédiction unitaire : micro-batching si activé (dans la boucle
+    asyncio), sinon chemin synchrone dans le threadpool.
+    """
+    mark_since_start("validate")
+    if micro_batcher.enabled:
+        return await run_prediction_batched(**kwargs)
+    return await run_in_threadpool(run_prediction, **kwargs)
+
+
+def validate_records(records: list, schema) -> tuple:
+    """
+    Valide chaque enregistrement individuellement avec le schéma Pydantic :
+    - les lignes valides sont conservées (avec leur position d'origine)
+    - les lignes invalides produisent une erreur détaillée, sans bloquer le lot
+    """
+    valid_indices, valid_rows, errors = [], [], {}
+
+    for index, record in enumerate(records):
+        try:
+            student = schema.model_validate(record)
+        except ValidationError as e:
+            errors[index] = e.errors(
+                include_url=False, include_context=False, include_input=False
+            )
+            continue
+        valid_indices.append(index)
+        valid_rows.append(student.model_dump())
+
+    return valid_indices, valid_rows, errors
+
+
+def run_batch_prediction(
+    *,
+    request: Request,
+    model_name: str,
+    records: list,
+    schema,
+    explain: bool = False
+):
+    """
+    Prédiction vectorisée sur un lot d'élèves :
+    - un seul DataFrame et un seul appel à model.predict
+    - résultats restitués dans l'ordre d'entrée, erreurs de validation par ligne
+    - une seule entrée dans le journal des prédictions pour tout le lot
+    - avec `explain`, contributions des features de chaque ligne (une passe)
+    """
+    model = models.get(model_name)
+    with span("validate"):
+        valid_indices, valid_rows, errors = validate_records(records, schema)
+
+    with span("drift"):
+        drift_monitors.observe_many(model_name, valid_rows)
+
+    explained = explain and model.scorer.explainable
+    predictions, contributions = {}, {}
+    if valid_rows:
+        start = time.perf_counter()
+        with span("dataframe"):
+            df = pd.DataFrame(valid_rows, columns=list(schema.model_fields))
+        with span("inference"):
+            predictions = dict(zip(valid_indices, model.scorer.predict(df).tolist()))
+        INFERENCE_LATENCY.observe((model_name, "batch"), time.perf_counter() - start)
+        if explained:
+            with span("explain"):
+                contributions = dict(zip(valid_indices, explain_rows(model.scorer, df)))
+
+    n_positive = sum(1 for p in predictions.values() if p == 1)
+
+    start = time.perf_counter()
+    with span("log"):
+        prediction_log.write({
+            "event": "prediction_batch",
+            "timestamp": datetime.utcnow().isoformat(),
+            "session_id": request.headers.get("X-Session-ID"),
+            "endpoint": request.url.path,
+            "model": model_name,
+            "model_version": model.version,
+            "batch_size": len(predictions),
+            "n_errors": len(errors),
+            "n_positive": n_positive
+        })
+    PREDICTION_LOG_WRITE.observe((), time.perf_counter() - start)
+
+    results = []
+    for index in range(len(records)):
+        if index in errors:
+            results.append({"index": index, "errors": errors[index]})
+        else:
+            prediction = int(predictions[index])
+            result = {
+                "index": index,
+                "prediction": prediction,
+                "interpretation": interpret(prediction)
+            }
+            if explained:
+                result["contributions"] = contributions[index]
+            results.append(result)
+
+    response = {
+        "mode": model_name,
+        "model_version": model.version,
+        "n_rows": len(records),
+        "n_predictions": len(predictions),
+        "n_errors": len(errors),
+        "results": results
     }
+    if explain:
+        response["explanation"] = explanation_header(model.scorer)
+    return response
 
 
 # -------------------------------------------------------------------
@@ -153,107 +535,682 @@ def root():
     return {"message": "API OK"}
 
 
+@app.get("/predictions")
+def list_predictions(
+    model: str = None,
+    since: str = None,
+    session_id: str = None,
+    limit: int = 50,
+    cursor: int = None
+):
+    """
+    Historique des prédictions, du plus récent au plus ancien.
+    `next_cursor` permet de demander la page suivante.
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"limit doit être compris entre 1 et {MAX_PAGE_SIZE}"
+        )
+    return prediction_store.query(
+        model=model,
+        since=since,
+        session_id=session_id,
+        limit=limit,
+        cursor=cursor
+    )
+
+
+STATS_GROUPS = {"model", "endpoint", "session"}
+
+# Fenêtre par défaut de /stats (sans `since`), par granularité
+STATS_DEFAULT_BUCKETS = {"minute": 60, "hour": 48, "day": 30}
+
+
+@app.get("/stats")
+def prediction_stats(
+    granularity: str = "hour",
+    since: str = None,
+    until: str = None,
+    group_by: str = None,
+    model: str = None,
+    endpoint: str = None,
+    session_id: str = None
+):
+    """
+    Statistiques des prédictions par tranche de temps (minute, heure, jour),
+    lues dans les agrégats maintenus à l'écriture : coût proportionnel au
+    nombre de tranches, pas au nombre de prédictions.
+
+    `group_by` : model, endpoint ou session (agrégats journaliers).
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"Granularité inconnue : {granularity}")
+    if group_by is not None and group_by not in STATS_GROUPS:
+        raise HTTPException(status_code=400, detail=f"Regroupement inconnu : {group_by}")
+    if (group_by == "session" or session_id is not None) and (
+        granularity != "day" or endpoint is not None or group_by == "endpoint"
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="Les statistiques par session sont journalières et sans filtre d'endpoint."
+        )
+
+    step = GRANULARITIES[granularity][2]
+    try:
+        end = datetime.fromisoformat(until) if until else datetime.utcnow()
+        start = (
+            datetime.fromisoformat(since) if since
+            else end - step * STATS_DEFAULT_BUCKETS[granularity]
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since / until : dates ISO 8601 attendues")
+
+    # Tranches entières couvrant [since, until]
+    first = bucket_start(start.isoformat(), granularity)
+    last = datetime.fromisoformat(bucket_start(end.isoformat(), granularity)) + step
+    if (last - datetime.fromisoformat(first)) / step > MAX_STATS_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Intervalle trop long : {MAX_STATS_BUCKETS} tranches au plus"
+        )
+
+    rows = prediction_store.stats(
+        granularity,
+        since=first,
+        until=last.isoformat(),
+        group_by=group_by,
+        model=model,
+        endpoint=endpoint,
+        session_id=session_id
+    )
+
+    def with_share(item):
+        item["risk_share"] = (
+            round(item["n_risk"] / item["predictions"], 4) if item["predictions"] else None
+        )
+        return item
+
+    series, totals = [], {}
+    for row in rows:
+        counts = {counter: row[counter] for counter in ROLLUP_COUNTERS}
+        series.append(with_share({"bucket": row["bucket"], "group": row["grp"], **counts}))
+        total = totals.setdefault(
+            row["grp"], {"group": row["grp"], **dict.fromkeys(ROLLUP_COUNTERS, 0)}
+        )
+        for counter, value in counts.items():
+            total[counter] += value
+
+    return {
+        "granularity": granularity,
+        "since": first,
+        "until": last.isoformat(),
+        "group_by": group_by,
+        "series": series,
+        "totals": [with_share(total) for total in totals.values()],
+    }
+
+
+@app.get("/drift")
+def drift(model: str = None):
+    """
+    Dérive des entrées servies par rapport aux données d'entraînement, par
+    feature et par modèle, sur la fenêtre glissante : PSI (toutes features),
+    KS (numériques), part de modalités inconnues (catégorielles).
+    """
+    names = list(MODEL_FILES) if model is None else [model]
+    unknown = [name for name in names if name not in MODEL_FILES]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Modèle inconnu : {unknown[0]}")
+    return {name: drift_monitors.report(name) for name in names}
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return prediction_cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Métriques au format texte Prometheus."""
+    return PlainTextResponse(
+        METRICS.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/health")
 def health():
-    logger.debug("Healthcheck OK")
-    return {"status": "ok"}
+    """
+    Sonde de disponibilité : 200 seulement si les deux modèles sont chargés
+    et préchauffés et si le journal des prédictions tourne, 503 sinon.
+    """
+    serving = models.all()
+    checks = {
+        "models_loaded": models.ready(),
+        "prediction_log": prediction_log.running,
+    }
+    ready = all(checks.values())
+    if not ready:
+        logger.warning("Healthcheck KO : {}", checks)
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ok" if ready else "unavailable",
+            "checks": checks,
+            "models": {
+                name: {"version": model.version, "compiled": model.scorer.compiled}
+                for name, model in serving.items()
+            },
+        }
+    )
 
 
 @app.post("/predict-with-g2")
-def predict_with_g2(
+async def predict_with_g2(
     student: StudentInputWithG2,
-    request: Request
+    request: Request,
+    explain: bool = False
 ):
-    return run_prediction(
+    return await predict_single(
         request=request,
-        model=model_with_g2,
-        student_dict=student.dict(),
-        model_name="with_g2"
+        model_name="with_g2",
+        student=student,
+        explain=explain
     )
 
 @app.post("/predict-without-g2")
-def predict_without_g2(
+async def predict_without_g2(
     student: StudentInputWithoutG2,
-    request: Request
+    request: Request,
+    explain: bool = False
+):
+    return await predict_single(
+        request=request,
+        model_name="without_g2",
+        student=student,
+        explain=explain
+    )
+
+@app.post("/predict-batch-with-g2")
+def predict_batch_with_g2(
+    students: List[dict],
+    request: Request,
+    explain: bool = False
+):
+    return run_batch_prediction(
+        request=request,
+        model_name="with_g2",
+        records=students,
+        schema=StudentInputWithG2,
+        explain=explain
+    )
+
+
+@app.post("/predict-batch-without-g2")
+def predict_batch_without_g2(
+    students: List[dict],
+    request: Request,
+    explain: bool = False
 ):
-    return run_prediction(
+    return run_batch_prediction(
         request=request,
-        model=model_without_g2,
-        student_dict=student.dict(),
-        model_name="without_g2"
+        model_name="without_g2",
+        records=students,
+        schema=StudentInputWithoutG2,
+        explain=explain
     )
 
-@app.post("/retrain")
-def retrain(file: UploadFile = File(...)):
+
+@app.post("/predict-batch-csv")
+def predict_batch_csv(
+    request: Request,
+    file: UploadFile = File(...),
+    include_g2: bool = Form(True),
+    explain: bool = Form(False)
+):
     """
-    Ré-entraîne automatiquement les modèles de prédiction à partir d'un CSV :
-    - modèle sans G2 (prédiction précoce)
-    - modèle avec G2 (si disponible dans le fichier)
+    Prédiction par lot à partir d'un CSV (`;` comme séparateur),
+    une ligne par élève.
     """
-
-    # ------------------------------------------------------------------
-    # Sauvegarde temporaire du fichier CSV
-    # ------------------------------------------------------------------
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Le fichier doit être un CSV.")
 
-    tmp_filename = f"{uuid.uuid4()}_{file.filename}"
-    tmp_csv_path = DATA_DIR / tmp_filename
+    try:
+        df = pd.read_csv(file.file, sep=";")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Erreur lecture CSV : {e}")
+
+    schema = StudentInputWithG2 if include_g2 else StudentInputWithoutG2
+    columns = list(schema.model_fields)
+
+    missing = set(columns) - set(df.columns)
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Colonnes manquantes : {missing}")
+
+    return run_batch_prediction(
+        request=request,
+        model_name="with_g2" if include_g2 else "without_g2",
+        records=df[columns].to_dict(orient="records"),
+        schema=schema,
+        explain=explain
+    )
+
+
+# -------------------------------------------------------------------
+# Scoring en masse (Arrow IPC / Parquet / NDJSON)
+# -------------------------------------------------------------------
 
+# Corps de requête gardé en mémoire jusqu'à BULK_SPOOL_BYTES, puis sur
+# disque ; au-delà de BULK_MAX_BYTES la requête est refusée (413)
+BULK_SPOOL_BYTES = int(os.getenv("BULK_SPOOL_BYTES", 8 * 1024 * 1024))
+BULK_MAX_BYTES = int(os.getenv("BULK_MAX_BYTES", 512 * 1024 * 1024))
+
+
+def schema_columns(schema) -> tuple:
+    """Colonnes entières et colonnes texte attendues par un schéma d'entrée."""
+    fields = schema.model_fields
+    integer_columns = [name for name, field in fields.items() if field.annotation is int]
+    string_columns = [name for name, field in fields.items() if field.annotation is str]
+    return integer_columns, string_columns
+
+
+async def spool_body(request: Request):
+    """Copie le corps (lu en flux) dans un fichier temporaire relisible."""
+    spool = tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_BYTES)
+    size = 0
     try:
-        with open(tmp_csv_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > BULK_MAX_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Corps trop volumineux (max {BULK_MAX_BYTES} octets)"
+                )
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
 
-        df = pd.read_csv(tmp_csv_path, sep=";")
 
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Erreur lecture CSV : {e}")
+def score_blocks(model, model_name: str, frames, explain: bool = False):
+    """
+    (position, prédictions, explications) pour chaque bloc, dans l'ordre
+    du corps ; explications None sans `explain` ou pour un modèle non linéaire.
+    """
+    explain = explain and model.scorer.explainable
+    offset = 0
+    for df in frames:
+        drift_monitors.observe_frame(model_name, df)
+        start = time.perf_counter()
+        predictions = model.scorer.predict(df)
+        INFERENCE_LATENCY.observe((model_name, "batch"), time.perf_counter() - start)
+        yield offset, predictions, explain_columns(model.scorer, df) if explain else None
+        offset += len(df)
 
-    # ------------------------------------------------------------------
-    # Ré-entrainement des modèles
-    # ------------------------------------------------------------------
-    results = {}
 
+def log_bulk_prediction(request: Request, model, n_predictions: int, n_positive: int):
+    start = time.perf_counter()
+    prediction_log.write({
+        "event": "prediction_batch",
+        "timestamp": datetime.utcnow().isoformat(),
+        "session_id": request.headers.get("X-Session-ID"),
+        "endpoint": request.url.path,
+        "model": model.name,
+        "model_version": model.version,
+        "batch_size": n_predictions,
+        "n_errors": 0,
+        "n_positive": n_positive
+    })
+    PREDICTION_LOG_WRITE.observe((), time.perf_counter() - start)
+
+
+def collect_bulk_predictions(blocks) -> list:
+    return list(blocks)
+
+
+@app.post("/predict-bulk")
+async def predict_bulk(
+    request: Request,
+    include_g2: bool = True,
+    stream: bool = False,
+    explain: bool = False
+):
+    """
+    Prédiction en masse sur un corps colonnaire, selon le Content-Type :
+    Arrow IPC (flux ou fichier), Parquet ou NDJSON (un élève par ligne).
+
+    Le corps est lu bloc par bloc ; chaque bloc est validé par colonne
+    (présence, type, valeurs manquantes) puis scoré directement, sans objet
+    Python par ligne. Un bloc non conforme invalide toute la requête (400).
+
+    Avec `stream=true`, la réponse est en NDJSON : une ligne
+    {"offset", "predictions"} par bloc, dès qu'il est scoré, puis une ligne
+    finale {"done": true, ...} (ou {"error": ...} si un bloc ultérieur est
+    invalide).
+
+    Avec `explain=true`, chaque bloc porte les contributions des features
+    les plus influentes, en colonnes : `top_features` (indices dans
+    `explanation.features`) et `contributions`, une ligne par élève.
+    """
     try:
-        # --------- Modèle SANS G2 (toujours entraîné)
-        results["without_g2"] = retrain_model(
-            df=df,
-            include_g2=False,
-            model_output_path=MODELS_DIR / "model_without_g2.pkl",
-            run_name="retrain_without_g2"
+        fmt = bulk_format(request.headers.get("content-type"))
+    except BulkFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    model_name = "with_g2" if include_g2 else "without_g2"
+    schema = StudentInputWithG2 if include_g2 else StudentInputWithoutG2
+    integer_columns, string_columns = schema_columns(schema)
+
+    # Référence unique pour toute la requête (rechargement à chaud possible)
+    model = models.get(model_name)
+    with span("spool"):
+        spool = await spool_body(request)
+    blocks = score_blocks(
+        model,
+        model_name,
+        iter_bulk_frames(spool, fmt, integer_columns, string_columns),
+        explain=explain
+    )
+
+    if not stream:
+        try:
+            with span("score"):
+                chunks = await run_in_threadpool(collect_bulk_predictions, blocks)
+        except BulkFormatError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        finally:
+            spool.close()
+
+        predictions = [int(p) for _, chunk, _ in chunks for p in chunk.tolist()]
+        n_positive = sum(1 for p in predictions if p == 1)
+        log_bulk_prediction(request, model, len(predictions), n_positive)
+        response = {
+            "mode": model_name,
+            "model_version": model.version,
+            "n_rows": len(predictions),
+            "n_predictions": len(predictions),
+            "n_positive": n_positive,
+            "predictions": predictions
+        }
+        if explain:
+            response["explanation"] = explanation_header(model.scorer)
+            if response["explanation"] is not None:
+                for key in ("top_features", "contributions"):
+                    response["explanation"][key] = [
+                        row for _, _, explanation in chunks for row in explanation[key]
+                    ]
+        return JSONResponse(response)
+
+    # Premier bloc lu avant de répondre : un corps illisible ou un schéma
+    # non conforme donne encore un 400
+    try:
+        first = await run_in_threadpool(next, blocks, None)
+    except BulkFormatError as e:
+        spool.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def lines():
+        n_predictions, n_positive = 0, 0
+        try:
+            block = first
+            while block is not None:
+                offset, predictions, explanation = block
+                n_predictions += len(predictions)
+                n_positive += int((predictions == 1).sum())
+                payload = predictions_payload(offset, predictions)
+                if explanation is not None:
+                    payload.update(explanation)
+                yield ndjson_line(payload)
+                block = next(blocks, None)
+            done = {
+                "done": True,
+                "mode": model_name,
+                "model_version": model.version,
+                "n_predictions": n_predictions,
+                "n_positive": n_positive
+            }
+            if explain:
+                done["explanation"] = explanation_header(model.scorer)
+            yield ndjson_line(done)
+        except BulkFormatError as e:
+            yield ndjson_line({"error": str(e), "offset": n_predictions})
+        finally:
+            spool.close()
+            log_bulk_prediction(request, model, n_predictions, n_positive)
+
+    # Itérateur synchrone : Starlette le consomme dans le pool de threads
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+RETRAIN_MODES = {"full", "incremental"}
+
+# Budget (secondes) de la recherche d'hyperparamètres, par scénario
+RETRAIN_TUNE_BUDGET = float(os.getenv("RETRAIN_TUNE_BUDGET", "60"))
+
+
+@app.post("/retrain", status_code=202)
+def retrain(
+    file: UploadFile = File(None),
+    mode: str = Form("full"),
+    tune: bool = Form(False),
+    tune_budget: float = Form(None),
+    tune_extra_estimators: bool = Form(False),
+    cohort: str = Form(None),
+    snapshot: int = Form(None),
+    cohorts: str = Form(None),
+    since: datetime = Form(None),
+    until: datetime = Form(None)
+):
+    """
+    Soumet un job de ré-entraînement des modèles à partir d'un CSV ou du
+    feature store :
+    - modèle sans G2 (prédiction précoce)
+    - modèle avec G2 (si disponible dans les données)
+
+    Sources des données :
+    - fichier seul : entraînement sur le fichier
+    - fichier + cohort : lignes ajoutées au feature store, puis (mode full)
+      entraînement sur le store ; l'upload ne porte que les nouvelles lignes
+    - sans fichier : entraînement sur le store
+    La sélection dans le store porte sur un snapshot (dernière version par
+    défaut), des cohortes (séparées par des virgules) et une période
+    d'ingestion [since, until).
+
+    mode="full" ré-entraîne from scratch ; mode="incremental" met à jour les
+    modèles actifs avec les nouvelles lignes uniquement. Un modèle actif non
+    incrémental (modèle livré, ré-entraînement full) n'est remplacé qu'à
+    partir du feature store (requête sans fichier) : avec un fichier, la
+    requête est rejetée plutôt que d'initialiser un modèle sur le seul lot.
+
+    tune=true (mode full) ajoute une recherche d'hyperparamètres limitée à
+    tune_budget secondes par scénario (RETRAIN_TUNE_BUDGET par défaut) ;
+    tune_extra_estimators=true y ajoute RidgeClassifier et SGDClassifier.
+
+    La réponse est immédiate (identifiant de job) ; l'avancement et les
+    résultats sont consultables via GET /retrain/{job_id}.
+    """
+    if file is not None and not file.filename.endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Le fichier doit être un CSV.")
+    if file is None and cohort is not None:
+        raise HTTPException(status_code=400, detail="cohort nécessite un fichier CSV.")
+    if mode not in RETRAIN_MODES:
+        raise HTTPException(status_code=400, detail=f"Mode inconnu : {mode}")
+    if tune and mode != "full":
+        raise HTTPException(
+            status_code=400,
+            detail="La recherche d'hyperparamètres n'est disponible qu'en mode full."
         )
+    if tune_extra_estimators and not tune:
+        raise HTTPException(status_code=400, detail="tune_extra_estimators nécessite tune=true.")
+    tune_budget = RETRAIN_TUNE_BUDGET if tune_budget is None else tune_budget
+    if tune_budget <= 0:
+        raise HTTPException(status_code=400, detail="tune_budget doit être positif.")
+    if mode == "incremental" and file is not None:
+        non_incremental = retrain_jobs.non_incremental_models()
+        if non_incremental:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"Modèles actifs non incrémentaux ({', '.join(non_incremental)}) : "
+                    "initialiser le mode incremental depuis le feature store "
+                    "(requête sans fichier) ou ré-entraîner en mode full."
+                )
+            )
+
+    store_response = {}
+    if file is not None:
+        # Lecture par blocs, typée et projetée ; schéma vérifié dès l'en-tête
+        try:
+            df, digest = read_training_csv(file.file)
+        except CsvSchemaError as e:
+            raise HTTPException(status_code=400, detail=f"Erreur lecture CSV : {e}")
+        filename = file.filename
+
+        if cohort is not None:
+            try:
+                store_response["ingested"] = feature_store.ingest(df, cohort, source=filename)
+            except FeatureStoreError as e:
+                raise HTTPException(status_code=400, detail=str(e))
 
-        # --------- Modèle AVEC G2 (si disponible)
-        if "G2" in df.columns:
-            results["with_g2"] = retrain_model(
-                df=df,
-                include_g2=True,
-                model_output_path=MODELS_DIR / "model_with_g2.pkl",
-                run_name="retrain_with_g2"
+    if file is None or (cohort is not None and mode == "full"):
+        try:
+            selection = feature_store.select(
+                snapshot=snapshot,
+                cohorts=[c.strip() for c in cohorts.split(",")] if cohorts else None,
+                since=since,
+                until=until
             )
-        else:
-            results["with_g2"] = {
-                "status": "skipped",
-                "reason": "Colonne G2 absente du fichier CSV"
-            }
+        except FeatureStoreError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        n_rows = selection.count()
+        if n_rows == 0:
+            raise HTTPException(
+                status_code=400, detail="Aucune ligne sélectionnée dans le feature store."
+            )
+        # Lecture des Parquet dans le process de ré-entraînement
+        df, digest = selection, selection.digest()
+        filename = f"feature-store@{selection.snapshot}"
+        store_response["selection"] = {**selection.describe(), "n_rows": n_rows}
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    job, coalesced = retrain_jobs.submit(
+        df,
+        digest,
+        filename,
+        mode=mode,
+        tune=tune,
+        tune_budget=tune_budget,
+        tune_extra_estimators=tune_extra_estimators
+    )
+
+    response = {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "coalesced": coalesced,
+        "status_url": f"/retrain/{job['job_id']}"
+    }
+    if store_response:
+        response["feature_store"] = store_response
+    return response
+
+
+@app.get("/retrain/{job_id}")
+def retrain_status(job_id: str):
+    job = retrain_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job inconnu.")
+    return job
 
-    finally:
-        # Nettoyage du fichier temporaire
-        if tmp_csv_path.exists():
-            tmp_csv_path.unlink()
 
-    # ------------------------------------------------------------------
-    # Réponse API
-    # ------------------------------------------------------------------
+@app.delete("/retrain/{job_id}")
+def retrain_cancel(job_id: str):
+    job = retrain_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job inconnu.")
+    return job
+
+
+# -------------------------------------------------------------------
+# Feature store (données d'entraînement)
+# -------------------------------------------------------------------
+
+@app.get("/feature-store")
+def feature_store_manifest():
+    """Manifeste : version, lignes par cohorte, fichiers et leurs SHA-256."""
+    return feature_store.manifest()
+
+
+@app.post("/feature-store/rows")
+def feature_store_ingest(
+    file: UploadFile = File(...),
+    cohort: str = Form(...)
+):
+    """
+    Ajoute les lignes d'un CSV (`;`, même format que /retrain) à une
+    cohorte ; les lignes déjà présentes dans la cohorte sont ignorées.
+    """
+    if not file.filename.endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Le fichier doit être un CSV.")
+
+    try:
+        df, _ = read_training_csv(file.file)
+        entry = feature_store.ingest(df, cohort, source=file.filename)
+    except CsvSchemaError as e:
+        raise HTTPException(status_code=400, detail=f"Erreur lecture CSV : {e}")
+    except FeatureStoreError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    manifest = feature_store.manifest()
     return {
-        "status": "success",
-        "models_trained": list(results.keys()),
-        "results": results
+        **entry,
+        "store_version": manifest["version"],
+        "store_rows": manifest["n_rows"],
+    }
+
+
+# -------------------------------------------------------------------
+# Registre de modèles (versions, promotion, retour arrière)
+# -------------------------------------------------------------------
+
+def check_model_name(name: str):
+    if name not in MODEL_FILES:
+        raise HTTPException(status_code=404, detail=f"Modèle inconnu : {name}")
+
+
+@app.get("/models")
+def list_models():
+    serving = models.all()
+    return {
+        name: {
+            "active_version": registry.active_version(name),
+            "serving_version": serving[name].version if name in serving else None,
+            # Profils de référence : voir GET /drift
+            "versions": [
+                {k: v for k, v in meta.items() if k != "reference_profile"}
+                for meta in registry.versions(name)
+            ]
+        }
+        for name in MODEL_FILES
     }
 
 
+@app.post("/models/{name}/promote/{version}")
+def promote_model(name: str, version: str):
+    check_model_name(name)
+    try:
+        registry.promote(name, version)
+    except UnknownModelVersion:
+        raise HTTPException(status_code=404, detail=f"Version inconnue : {version}")
+    return {"name": name, "serving_version": models.reload(name).version}
 
 
+@app.post("/models/{name}/rollback")
+def rollback_model(name: str):
+    check_model_name(name)
+    try:
+        registry.rollback(name)
+    except UnknownModelVersion as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"name": name, "serving_version": models.reload(name).version}
@@ -3,25 +3,87 @@ import uuid
 from fastapi import Request
 from loguru import logger
 
+from modules.metrics import (
+    HTTP_ERRORS,
+    HTTP_IN_FLIGHT,
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+)
+from modules.tracing import span
 
-async def audit_requests(request: Request, call_next):
+
+def route_label(request: Request) -> str:
+    # Gabarit de la route (/retrain/{job_id}) plutôt que le chemin réel :
+    # cardinalité bornée pour les métriques
+    route = request.scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+def finish_trace(tracer, trace, token, request: Request, status: int) -> str:
+    route = route_label(request)
+    return tracer.finish(
+        trace,
+        token,
+        name=f"{request.method} {route}",
+        attributes={
+            "http.request.method": request.method,
+            "http.route": route,
+            "url.path": request.url.path,
+            "http.response.status_code": status,
+        },
+        status=status
+    )
+
+
+async def audit_requests(request: Request, call_next, tracer=None):
     # Génération d’un ID de session (ou récupération future)
     session_id = request.headers.get("X-Session-ID", str(uuid.uuid4()))
+    method = request.method
 
-    start_time = time.time()
+    # Étapes de la requête (Server-Timing, traces échantillonnées)
+    trace = None
+    if tracer is not None and tracer.enabled:
+        trace, token = tracer.start(request.headers)
 
-    response = await call_next(request)
+    HTTP_IN_FLIGHT.inc((method,))
+    start_time = time.perf_counter()
 
-    duration_ms = (time.time() - start_time) * 1000
+    try:
+        response = await call_next(request)
+    except Exception:
+        labels = (method, route_label(request), "500")
+        HTTP_REQUESTS.inc(labels)
+        HTTP_ERRORS.inc(labels)
+        HTTP_LATENCY.observe(labels, time.perf_counter() - start_time)
+        if trace is not None:
+            finish_trace(tracer, trace, token, request, 500)
+        raise
+    finally:
+        HTTP_IN_FLIGHT.dec((method,))
 
-    logger.info(
-        "REQUEST | session={session} | method={method} | path={path} | "
-        "status={status} | duration={duration:.2f}ms",
-        session=session_id,
-        method=request.method,
-        path=request.url.path,
-        status=response.status_code,
-        duration=duration_ms
-    )
+    duration = time.perf_counter() - start_time
+    status = response.status_code
+
+    labels = (method, route_label(request), str(status))
+    HTTP_REQUESTS.inc(labels)
+    HTTP_LATENCY.observe(labels, duration)
+    if status >= 500:
+        HTTP_ERRORS.inc(labels)
+
+    with span("audit_log"):
+        logger.info(
+            "REQUEST | session={session} | method={method} | path={path} | "
+            "status={status} | duration={duration:.2f}ms",
+            session=session_id,
+            method=method,
+            path=request.url.path,
+            status=status,
+            duration=duration * 1000
+        )
+
+    if trace is not None:
+        server_timing = finish_trace(tracer, trace, token, request, status)
+        if server_timing:
+            response.headers["Server-Timing"] = server_timing
 
     return response
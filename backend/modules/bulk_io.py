@@ -0,0 +1,135 @@
+import json
+
+import numpy as np
+
+# -------------------------------------------------------------------
+# Formats acceptés par /predict-bulk (en-tête Content-Type)
+# -------------------------------------------------------------------
+
+BULK_FORMATS = {
+    "application/vnd.apache.arrow.stream": "arrow-stream",
+    "application/vnd.apache.arrow.file": "arrow-file",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-parquet": "parquet",
+    "application/x-ndjson": "ndjson",
+}
+
+# Lignes par bloc : un bloc est validé, scoré et renvoyé avant le suivant
+BULK_BATCH_SIZE = 8192
+
+
+class BulkFormatError(ValueError):
+    """Corps illisible ou colonnes non conformes au schéma d'entrée."""
+
+
+def bulk_format(content_type: str) -> str:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in BULK_FORMATS:
+        raise BulkFormatError(
+            f"Content-Type non supporté : {media_type or '(absent)'} "
+            f"(attendu : {', '.join(sorted(BULK_FORMATS))})"
+        )
+    return BULK_FORMATS[media_type]
+
+
+# -------------------------------------------------------------------
+# Lecture par blocs (pyarrow importé à la première requête)
+# -------------------------------------------------------------------
+
+def _record_batches(source, fmt: str, columns: list, batch_size: int):
+    import pyarrow as pa
+
+    if fmt == "arrow-stream":
+        yield from pa.ipc.open_stream(source)
+    elif fmt == "arrow-file":
+        reader = pa.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            yield reader.get_batch(index)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(source)
+        missing = set(columns) - set(parquet.schema_arrow.names)
+        if missing:
+            raise BulkFormatError(f"Colonnes manquantes : {sorted(missing)}")
+        # Seules les colonnes utiles sont décodées
+        yield from parquet.iter_batches(batch_size=batch_size, columns=columns)
+    else:
+        import pyarrow.json as pj
+
+        yield from pj.open_json(
+            source, read_options=pj.ReadOptions(block_size=1 << 20)
+        )
+
+
+def _check_types(schema, integer_columns: list, string_columns: list):
+    import pyarrow as pa
+
+    missing = set(integer_columns + string_columns) - set(schema.names)
+    if missing:
+        raise BulkFormatError(f"Colonnes manquantes : {sorted(missing)}")
+
+    for name in integer_columns:
+        if not pa.types.is_integer(schema.field(name).type):
+            raise BulkFormatError(f"{name} : entiers attendus ({schema.field(name).type})")
+    for name in string_columns:
+        field_type = schema.field(name).type
+        if pa.types.is_dictionary(field_type):
+            field_type = field_type.value_type
+        if not (pa.types.is_string(field_type) or pa.types.is_large_string(field_type)):
+            raise BulkFormatError(f"{name} : chaînes attendues ({schema.field(name).type})")
+
+
+def iter_bulk_frames(
+    source,
+    fmt: str,
+    integer_columns: list,
+    string_columns: list,
+    batch_size: int = BULK_BATCH_SIZE
+):
+    """
+    Blocs de lignes validés, en DataFrame colonnaire : entiers en tableaux
+    numpy, chaînes en `category` (codes + modalités distinctes). Aucun
+    objet Python par ligne ; un seul bloc en mémoire à la fois.
+
+    La validation porte sur les colonnes (présence, type Arrow, absence de
+    valeurs manquantes) : un bloc non conforme lève BulkFormatError.
+    """
+    import pyarrow as pa
+
+    columns = integer_columns + string_columns
+    checked = False
+    offset = 0
+    try:
+        for batch in _record_batches(source, fmt, columns, batch_size):
+            if not checked:
+                _check_types(batch.schema, integer_columns, string_columns)
+                checked = True
+            batch = batch.select(columns)
+            for name, column in zip(columns, batch.columns):
+                if column.null_count:
+                    raise BulkFormatError(
+                        f"{name} : {column.null_count} valeur(s) manquante(s) "
+                        f"(lignes {offset} à {offset + batch.num_rows - 1})"
+                    )
+            # Découpage des gros record batches (Arrow IPC : taille choisie
+            # par le client) pour borner la mémoire et le délai par bloc
+            for start in range(0, batch.num_rows, batch_size):
+                chunk = batch.slice(start, batch_size)
+                offset += chunk.num_rows
+                yield chunk.to_pandas(strings_to_categorical=True)
+    except pa.ArrowInvalid as e:
+        raise BulkFormatError(f"Corps illisible ({fmt}) : {e}")
+
+
+# -------------------------------------------------------------------
+# Réponse NDJSON
+# -------------------------------------------------------------------
+
+def ndjson_line(payload: dict) -> bytes:
+    return (json.dumps(payload, separators=(",", ":")) + "\n").encode()
+
+
+def predictions_payload(offset: int, predictions) -> dict:
+    """Un bloc de prédictions : position de la première ligne + valeurs."""
+    return {"offset": offset, "predictions": np.asarray(predictions).astype(int).tolist()}
@@ -19,6 +19,18 @@ FEATURES_WITHOUT_G2 = [
 
 FEATURES_WITH_G2 = FEATURES_WITHOUT_G2 + ["G2"]
 
+# Variables catégorielles (les autres features sont des entiers)
+CATEGORICAL_FEATURES = ["source", "famsize", "activities", "higher", "internet"]
+
+# Modalités connues (jeu de données UCI "Student Performance")
+CATEGORY_VALUES = {
+    "source": ["mat", "por"],
+    "famsize": ["GT3", "LE3"],
+    "activities": ["no", "yes"],
+    "higher": ["no", "yes"],
+    "internet": ["no", "yes"],
+}
+
 
 def prepare_dataset(
     df: pd.DataFrame,
@@ -48,3 +60,35 @@ def prepare_dataset(
     y = df["target"]
 
     return X, y
+
+
+def prepare_training_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Typage unique des données d'entraînement, partagé entre scénarios :
+    - projection sur les features utiles (G2 si présente) + cible
+    - variables catégorielles en `category`, entiers réduits au plus petit type
+    """
+    features = FEATURES_WITH_G2 if "G2" in df.columns else FEATURES_WITHOUT_G2
+
+    missing = set(features) - set(df.columns)
+    if missing:
+        raise ValueError(f"Colonnes manquantes : {missing}")
+
+    if "target" in df.columns:
+        target = df["target"]
+    elif "G3" in df.columns:
+        target = (df["G3"] >= 10).astype(int)
+    else:
+        raise ValueError("Colonne 'G3' absente pour créer la cible")
+
+    typed = pd.DataFrame({
+        column: (
+            df[column].astype("category")
+            if column in CATEGORICAL_FEATURES
+            else pd.to_numeric(df[column], downcast="integer")
+        )
+        for column in features
+    })
+    typed["target"] = target.astype("int8").to_numpy()
+
+    return typed
@@ -0,0 +1,307 @@
+import math
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Au-delà de ce nombre de valeurs distinctes, une variable numérique est
+# découpée en quantiles ; sinon chaque valeur observée a sa propre classe
+MAX_DISCRETE_VALUES = 20
+QUANTILE_BINS = 10
+
+# Seuils usuels du PSI : < 0.1 stable, < 0.25 à surveiller, au-delà dérive
+PSI_WARNING = 0.1
+PSI_ALERT = 0.25
+
+# Observations minimales dans la fenêtre avant de calculer des scores
+MIN_OBSERVATIONS = 30
+
+# Lissage des classes vides (évite log(0) dans le PSI)
+EPSILON = 1e-4
+
+
+# -------------------------------------------------------------------
+# Profil de référence (calculé au ré-entraînement)
+# -------------------------------------------------------------------
+
+def build_profile(X: pd.DataFrame) -> dict:
+    """
+    Distribution de chaque feature des données d'entraînement :
+    - numérique : bornes de classes (`cuts`) et fréquences par classe
+    - catégorielle : fréquence de chaque modalité
+    Quelques centaines d'octets par feature, stockés dans les métadonnées
+    de la version du modèle.
+    """
+    features = {}
+    for column in X.columns:
+        values = X[column]
+        if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == object \
+                or pd.api.types.is_string_dtype(values.dtype):
+            frequencies = values.astype(str).value_counts(normalize=True).sort_index()
+            features[column] = {
+                "type": "categorical",
+                "categories": frequencies.index.tolist(),
+                "frequencies": [round(f, 6) for f in frequencies.tolist()],
+            }
+            continue
+
+        values = values.to_numpy(dtype=float)
+        distinct = np.unique(values)
+        if len(distinct) <= MAX_DISCRETE_VALUES:
+            # Une classe par valeur : coupures à mi-chemin entre valeurs
+            cuts = ((distinct[:-1] + distinct[1:]) / 2).tolist()
+        else:
+            quantiles = np.quantile(values, np.linspace(0, 1, QUANTILE_BINS + 1)[1:-1])
+            cuts = np.unique(quantiles).tolist()
+
+        counts = np.bincount(np.searchsorted(cuts, values, side="right"), minlength=len(cuts) + 1)
+        features[column] = {
+            "type": "numeric",
+            "cuts": [round(c, 6) for c in cuts],
+            "frequencies": [round(f, 6) for f in (counts / len(values)).tolist()],
+        }
+
+    return {"n_samples": int(len(X)), "features": features}
+
+
+# -------------------------------------------------------------------
+# Scores
+# -------------------------------------------------------------------
+
+def psi(expected: list, actual: list) -> float:
+    """Population Stability Index entre deux distributions (mêmes classes)."""
+    total = 0.0
+    for e, a in zip(expected, actual):
+        e, a = max(e, EPSILON), max(a, EPSILON)
+        total += (a - e) * math.log(a / e)
+    return total
+
+
+def ks(expected: list, actual: list) -> float:
+    """Statistique de Kolmogorov-Smirnov sur les fonctions de répartition par classe."""
+    distance, cdf_e, cdf_a = 0.0, 0.0, 0.0
+    for e, a in zip(expected, actual):
+        cdf_e += e
+        cdf_a += a
+        distance = max(distance, abs(cdf_a - cdf_e))
+    return distance
+
+
+def drift_status(value: float) -> str:
+    if value < PSI_WARNING:
+        return "stable"
+    return "warning" if value < PSI_ALERT else "drift"
+
+
+# -------------------------------------------------------------------
+# Suivi en flux (chemin de la requête)
+# -------------------------------------------------------------------
+
+class DriftMonitor:
+    """
+    Distribution des entrées d'un modèle sur une fenêtre glissante :
+    - chaque classe de chaque feature a un compteur, dans un tableau plat
+    - la fenêtre est découpée en segments de `segment_seconds` ; le segment
+      le plus ancien est abandonné quand il sort de la fenêtre
+    Coût par requête : une recherche de classe par feature (quelques
+    comparaisons) et un incrément ; mémoire bornée par
+    (fenêtre / segment) × nombre total de classes, quel que soit le trafic.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        profile: dict,
+        window_seconds: float = 3600.0,
+        segment_seconds: float = 60.0
+    ):
+        self.version = version
+        self.profile = profile
+        self.window_seconds = window_seconds
+        self.segment_seconds = segment_seconds
+
+        # (feature, type, décalage dans le tableau, bornes ou index des modalités)
+        self._layout = []
+        offset = 0
+        for name, feature in profile["features"].items():
+            if feature["type"] == "numeric":
+                self._layout.append((name, "numeric", offset, feature["cuts"]))
+                offset += len(feature["cuts"]) + 1
+            else:
+                index = {category: i for i, category in enumerate(feature["categories"])}
+                self._layout.append((name, "categorical", offset, index))
+                # Dernière case : modalité absente de l'entraînement
+                offset += len(index) + 1
+        self._size = offset
+
+        self._lock = threading.Lock()
+        self._segments = deque()
+        self._current = None
+        self._current_start = None
+
+    def _roll(self, now: float):
+        if self._current is None or now - self._current_start >= self.segment_seconds:
+            self._current = [0] * (self._size + 1)
+            self._current_start = now
+            self._segments.append((now, self._current))
+        while self._segments and now - self._segments[0][0] >= self.window_seconds:
+            self._segments.popleft()
+
+    def _slots(self, record) -> list:
+        values = record if type(record) is dict else vars(record)
+        slots = []
+        for name, kind, offset, spec in self._layout:
+            value = values.get(name)
+            if value is None:
+                continue
+            if kind == "numeric":
+                slots.append(offset + bisect_right(spec, value))
+            else:
+                slots.append(offset + spec.get(str(value), len(spec)))
+        return slots
+
+    def observe(self, record):
+        """Ajoute une entrée (dict ou modèle Pydantic) à la fenêtre courante."""
+        slots = self._slots(record)
+        with self._lock:
+            self._roll(time.monotonic())
+            current = self._current
+            for slot in slots:
+                current[slot] += 1
+            current[-1] += 1
+
+    def observe_many(self, records: list):
+        slots = [self._slots(record) for record in records]
+        with self._lock:
+            self._roll(time.monotonic())
+            current = self._current
+            for record_slots in slots:
+                for slot in record_slots:
+                    current[slot] += 1
+            current[-1] += len(records)
+
+    def observe_frame(self, df):
+        """Ajoute un bloc de lignes (DataFrame), compté par colonne (vectorisé)."""
+        increments = {}
+        for name, kind, offset, spec in self._layout:
+            if name not in df.columns:
+                continue
+            values = df[name]
+            if kind == "numeric":
+                bins = np.searchsorted(spec, values.to_numpy(dtype=float), side="right")
+            else:
+                if not isinstance(values.dtype, pd.CategoricalDtype):
+                    values = values.astype(str).astype("category")
+                # Modalités distinctes du bloc → case de la référence
+                mapping = np.array(
+                    [spec.get(str(c), len(spec)) for c in values.cat.categories] + [len(spec)]
+                )
+                bins = mapping[values.cat.codes.to_numpy()]
+            for index, count in enumerate(np.bincount(bins, minlength=len(spec) + 1)):
+                if count:
+                    increments[offset + index] = int(count)
+
+        with self._lock:
+            self._roll(time.monotonic())
+            current = self._current
+            for slot, count in increments.items():
+                current[slot] += count
+            current[-1] += len(df)
+
+    def report(self) -> dict:
+        with self._lock:
+            self._roll(time.monotonic())
+            totals = [sum(column) for column in zip(*(counts for _, counts in self._segments))]
+
+        n_observations = totals[-1] if totals else 0
+        features = {}
+        for name, kind, offset, spec in self._layout:
+            reference = self.profile["features"][name]
+            width = len(spec) + 1
+            counts = totals[offset:offset + width] if totals else [0] * width
+            observed = sum(counts)
+
+            expected = list(reference["frequencies"])
+            if kind == "categorical":
+                expected.append(0.0)
+
+            entry = {"type": kind, "n_observations": observed, "psi": None, "ks": None, "status": None}
+            if kind == "categorical":
+                entry["unseen_share"] = round(counts[-1] / observed, 4) if observed else None
+
+            if observed >= MIN_OBSERVATIONS:
+                actual = [count / observed for count in counts]
+                entry["psi"] = round(psi(expected, actual), 4)
+                if kind == "numeric":
+                    entry["ks"] = round(ks(expected, actual), 4)
+                entry["status"] = drift_status(entry["psi"])
+            features[name] = entry
+
+        scored = [f["psi"] for f in features.values() if f["psi"] is not None]
+        return {
+            "version": self.version,
+            "window_seconds": self.window_seconds,
+            "n_observations": n_observations,
+            "reference_samples": self.profile["n_samples"],
+            "max_psi": max(scored) if scored else None,
+            "status": drift_status(max(scored)) if scored else None,
+            "features": features,
+        }
+
+
+class DriftMonitors:
+    """Un DriftMonitor par modèle servi, remplacé à chaque changement de version."""
+
+    def __init__(self, window_seconds: float = 3600.0, segment_seconds: float = 60.0):
+        self.window_seconds = window_seconds
+        self.segment_seconds = segment_seconds
+        self._monitors = {}
+        self._versions = {}
+
+    def reset(self, name: str, version: str, profile: dict = None):
+        """Nouvelle version servie : fenêtre vidée, référence remplacée."""
+        self._versions[name] = version
+        if profile is None:
+            self._monitors.pop(name, None)
+        else:
+            self._monitors[name] = DriftMonitor(
+                version, profile, self.window_seconds, self.segment_seconds
+            )
+
+    def after_fork(self):
+        """Dans un worker issu d'un fork : fenêtres et verrous propres au process."""
+        for name, monitor in list(self._monitors.items()):
+            self.reset(name, monitor.version, monitor.profile)
+
+    def observe(self, name: str, record):
+        monitor = self._monitors.get(name)
+        if monitor is not None:
+            monitor.observe(record)
+
+    def observe_many(self, name: str, records: list):
+        monitor = self._monitors.get(name)
+        if monitor is not None and records:
+            monitor.observe_many(records)
+
+    def observe_frame(self, name: str, df):
+        monitor = self._monitors.get(name)
+        if monitor is not None and len(df):
+            monitor.observe_frame(df)
+
+    def report(self, name: str) -> dict:
+        monitor = self._monitors.get(name)
+        if monitor is None:
+            # Version sans profil de référence (modèle livré, pas encore ré-entraîné)
+            return {
+                "version": self._versions.get(name),
+                "window_seconds": self.window_seconds,
+                "n_observations": 0,
+                "reference_samples": None,
+                "max_psi": None,
+                "status": None,
+                "features": {},
+            }
+        return monitor.report()
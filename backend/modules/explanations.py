@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+
+# Nombre de features renvoyées par explication (les plus influentes)
+EXPLAIN_TOP_FEATURES = int(os.getenv("EXPLAIN_TOP_FEATURES", "5"))
+
+# Décimales des contributions renvoyées
+PRECISION = 4
+
+
+# -------------------------------------------------------------------
+# Sélection des features les plus influentes
+# -------------------------------------------------------------------
+
+def top_features(matrix: np.ndarray, k: int = EXPLAIN_TOP_FEATURES) -> tuple:
+    """
+    Indices et valeurs des `k` plus fortes contributions (en valeur
+    absolue) de chaque ligne, triées par ordre décroissant, en une passe
+    vectorisée sur toute la matrice.
+    """
+    k = max(1, min(k, matrix.shape[1]))
+    magnitude = np.abs(matrix)
+    if k < matrix.shape[1]:
+        candidates = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(k), matrix.shape)
+    order = np.argsort(-np.take_along_axis(magnitude, candidates, axis=1), axis=1, kind="stable")
+    indices = np.take_along_axis(candidates, order, axis=1)
+    return indices, np.take_along_axis(matrix, indices, axis=1)
+
+
+def contribution_list(features: list, indices, values) -> list:
+    return [{"feature": features[i], "contribution": v} for i, v in zip(indices, values)]
+
+
+# -------------------------------------------------------------------
+# Explications renvoyées par l'API
+# -------------------------------------------------------------------
+
+def explain_one(scorer, student, k: int = EXPLAIN_TOP_FEATURES) -> dict:
+    """
+    Explication d'une prédiction unitaire :
+    {"base", "score", "contributions": [{"feature", "contribution"}, ...]}.
+    None si le modèle servi n'est pas linéaire.
+    """
+    if not scorer.explainable:
+        return None
+
+    contributions = scorer.contributions_one(student)
+    ranked = sorted(range(len(contributions)), key=lambda i: -abs(contributions[i]))[:k]
+    base = scorer.base_score
+    return {
+        "base": round(base, PRECISION),
+        "score": round(base + sum(contributions), PRECISION),
+        "contributions": contribution_list(
+            scorer.features, ranked, [round(contributions[i], PRECISION) for i in ranked]
+        ),
+    }
+
+
+def explain_rows(scorer, df, k: int = EXPLAIN_TOP_FEATURES) -> list:
+    """Liste de contributions (format de explain_one) pour chaque ligne de `df`."""
+    indices, values = top_features(scorer.contributions(df), k)
+    features = scorer.features
+    return [
+        contribution_list(features, row_indices, row_values)
+        for row_indices, row_values in zip(indices.tolist(), np.round(values, PRECISION).tolist())
+    ]
+
+
+def explain_columns(scorer, df, k: int = EXPLAIN_TOP_FEATURES) -> dict:
+    """
+    Explications d'un bloc en format colonnaire (scoring en masse) :
+    indices des features les plus influentes et contributions associées,
+    une ligne par élève, sans objet Python par contribution.
+    """
+    indices, values = top_features(scorer.contributions(df), k)
+    return {
+        "top_features": indices.tolist(),
+        "contributions": np.round(values, PRECISION).tolist(),
+    }
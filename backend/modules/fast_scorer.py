@@ -0,0 +1,395 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from modules.tracing import span
+
+# sklearn n'est importé qu'à la compilation d'un pipeline : le service de
+# prédiction charge les scoreurs compacts sans jamais l'importer.
+
+
+def _linear_classifiers() -> tuple:
+    """Classifieurs linéaires dont la décision est exactement coef_ · x + intercept_."""
+    from sklearn.linear_model import (
+        LogisticRegression,
+        Perceptron,
+        RidgeClassifier,
+        SGDClassifier,
+    )
+    from sklearn.svm import LinearSVC
+
+    return (LogisticRegression, SGDClassifier, RidgeClassifier, Perceptron, LinearSVC)
+
+
+class UncompilablePipeline(ValueError):
+    """Le pipeline n'a pas une forme supportée par le scoreur compilé."""
+
+
+# -------------------------------------------------------------------
+# Scoreur compilé (NumPy / Python pur)
+# -------------------------------------------------------------------
+
+class CompiledLinearScorer:
+    """
+    Version "aplatie" d'un pipeline ColumnTransformer
+    (StandardScaler / OneHotEncoder) + classifieur linéaire binaire.
+
+    La standardisation est repliée dans les coefficients :
+        w_i = coef_i / scale_i
+        b   = intercept - Σ coef_i * mean_i / scale_i
+    et chaque modalité catégorielle est remplacée par son coefficient
+    (0 pour une modalité inconnue, comme handle_unknown="ignore").
+    """
+
+    compiled = True
+    explainable = True
+
+    def __init__(
+        self,
+        numeric_features: list,
+        numeric_weights: np.ndarray,
+        numeric_coefs: np.ndarray,
+        numeric_means: np.ndarray,
+        numeric_scales: np.ndarray,
+        categorical_features: list,
+        categories: list,
+        category_weights: list,
+        ignore_unknown: list,
+        intercept: float,
+        classes: np.ndarray,
+    ):
+        self.numeric_features = list(numeric_features)
+        self.numeric_weights = np.asarray(numeric_weights, dtype=float)
+        self.numeric_coefs = np.asarray(numeric_coefs, dtype=float)
+        self.numeric_means = np.asarray(numeric_means, dtype=float)
+        self.numeric_scales = np.asarray(numeric_scales, dtype=float)
+        self.categorical_features = list(categorical_features)
+        self.categories = [np.asarray(c, dtype=object) for c in categories]
+        self.category_weights = [np.asarray(w, dtype=float) for w in category_weights]
+        self.ignore_unknown = list(ignore_unknown)
+        self.intercept = float(intercept)
+        self.classes = np.asarray(classes)
+
+        # Structures Python natives pour le chemin "un seul élève"
+        self._numeric = list(zip(self.numeric_features, self.numeric_weights.tolist()))
+        self._categorical = [
+            (feature, dict(zip(cats.tolist(), weights.tolist())), ignore)
+            for feature, cats, weights, ignore in zip(
+                self.categorical_features,
+                self.categories,
+                self.category_weights,
+                self.ignore_unknown,
+            )
+        ]
+        self._negative, self._positive = self.classes.tolist()
+        self._offsets = self.numeric_coefs * self.numeric_means / self.numeric_scales
+        self._numeric_terms = list(zip(
+            self.numeric_features, self.numeric_weights.tolist(), self._offsets.tolist()
+        ))
+        self._base_score = self.intercept + float(self._offsets.sum())
+
+    @property
+    def features(self) -> list:
+        return self.numeric_features + self.categorical_features
+
+    # ------------------------------------------------------------------
+    # Un seul élève
+    # ------------------------------------------------------------------
+
+    def decision_one(self, student) -> float:
+        """Score linéaire d'un élève (dict ou modèle Pydantic)."""
+        values = student if type(student) is dict else vars(student)
+
+        score = self.intercept
+        for feature, weight in self._numeric:
+            score += weight * values[feature]
+        for feature, table, ignore in self._categorical:
+            value = values[feature]
+            if value in table:
+                score += table[value]
+            elif not ignore:
+                raise ValueError(f"Modalité inconnue pour {feature} : {value!r}")
+        return score
+
+    def predict_one(self, student):
+        return self._positive if self.decision_one(student) > 0 else self._negative
+
+    def predict_many(self, students: list) -> list:
+        """
+        Prédictions d'une liste d'élèves (micro-batching). En dessous de
+        quelques centaines de lignes, la boucle Python reste plus rapide
+        que la construction d'un DataFrame.
+        """
+        return [self.predict_one(student) for student in students]
+
+    # ------------------------------------------------------------------
+    # Lot d'élèves (vectorisé)
+    # ------------------------------------------------------------------
+
+    def _category_codes(self, df: pd.DataFrame) -> list:
+        codes = []
+        for feature, cats, ignore in zip(
+            self.categorical_features, self.categories, self.ignore_unknown
+        ):
+            values = df[feature]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Colonne déjà encodée (Arrow, données d'entraînement) : seules
+                # les modalités distinctes sont recherchées
+                mapping = np.append(pd.Index(cats).get_indexer(values.cat.categories), -1)
+                feature_codes = mapping[values.cat.codes.to_numpy()]
+            else:
+                feature_codes = pd.Index(cats).get_indexer(values)
+            if not ignore and (feature_codes < 0).any():
+                raise ValueError(f"Modalité inconnue pour {feature}")
+            codes.append(feature_codes)
+        return codes
+
+    def decision_function(self, df: pd.DataFrame) -> np.ndarray:
+        scores = np.full(len(df), self.intercept)
+        if self.numeric_features:
+            scores += df[self.numeric_features].to_numpy(dtype=float) @ self.numeric_weights
+
+        for weights, codes in zip(self.category_weights, self._category_codes(df)):
+            # code -1 (modalité inconnue) → dernier élément, contribution nulle
+            scores += np.append(weights, 0.0)[codes]
+        return scores
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        return self.classes[(self.decision_function(df) > 0).astype(int)]
+
+    # ------------------------------------------------------------------
+    # Contributions par feature (explications)
+    # ------------------------------------------------------------------
+    #
+    # Score = base_score + Σ contributions, avec pour chaque feature
+    # d'origine :
+    #   numérique    : coef_i × (x_i - mean_i) / scale_i
+    #   catégorielle : coefficient de la colonne one-hot active
+    #                  (colonnes de la feature repliées, 0 si inconnue)
+
+    @property
+    def base_score(self) -> float:
+        """Score d'un élève dont toutes les contributions sont nulles (intercept_)."""
+        return self._base_score
+
+    def contributions_one(self, student) -> list:
+        """Contributions d'un élève, dans l'ordre de `features`."""
+        values = student if type(student) is dict else vars(student)
+
+        contributions = [
+            weight * values[feature] - offset
+            for feature, weight, offset in self._numeric_terms
+        ]
+        for feature, table, _ in self._categorical:
+            contributions.append(table.get(values[feature], 0.0))
+        return contributions
+
+    def contributions(self, df: pd.DataFrame) -> np.ndarray:
+        """Matrice (lignes × features), colonnes dans l'ordre de `features`."""
+        matrix = np.empty((len(df), len(self.features)))
+        n = len(self.numeric_features)
+        if n:
+            matrix[:, :n] = (
+                df[self.numeric_features].to_numpy(dtype=float) * self.numeric_weights
+                - self._offsets
+            )
+        for column, (weights, codes) in enumerate(
+            zip(self.category_weights, self._category_codes(df)), start=n
+        ):
+            matrix[:, column] = np.append(weights, 0.0)[codes]
+        return matrix
+
+    # ------------------------------------------------------------------
+    # Format compact (sans sklearn ni pickle)
+    # ------------------------------------------------------------------
+
+    def sample(self) -> dict:
+        """Élève fictif valide (warm-up) : 0 et première modalité connue."""
+        values = {feature: 0 for feature in self.numeric_features}
+        for feature, cats in zip(self.categorical_features, self.categories):
+            values[feature] = cats[0] if len(cats) else ""
+        return values
+
+    def save(self, path: Path) -> dict:
+        """
+        Écrit tous les paramètres numériques dans un seul tableau .npy
+        (projetable en mémoire) et retourne la description JSON-sérialisable
+        nécessaire pour le relire avec load().
+        """
+        blocks = [
+            self.numeric_weights,
+            self.numeric_coefs,
+            self.numeric_means,
+            self.numeric_scales,
+            *self.category_weights,
+        ]
+        with open(path, "wb") as f:
+            np.save(f, np.concatenate(blocks) if blocks else np.empty(0))
+
+        return {
+            "format": "linear-v1",
+            "numeric_features": self.numeric_features,
+            "categorical_features": self.categorical_features,
+            "categories": [c.tolist() for c in self.categories],
+            "ignore_unknown": self.ignore_unknown,
+            "intercept": self.intercept,
+            "classes": self.classes.tolist(),
+        }
+
+    @classmethod
+    def load(cls, path: Path, layout: dict, mmap: bool = True) -> "CompiledLinearScorer":
+        params = np.load(path, mmap_mode="r" if mmap else None)
+        n = len(layout["numeric_features"])
+
+        category_weights, offset = [], 4 * n
+        for cats in layout["categories"]:
+            category_weights.append(params[offset:offset + len(cats)])
+            offset += len(cats)
+
+        return cls(
+            numeric_features=layout["numeric_features"],
+            numeric_weights=params[0:n],
+            numeric_coefs=params[n:2 * n],
+            numeric_means=params[2 * n:3 * n],
+            numeric_scales=params[3 * n:4 * n],
+            categorical_features=layout["categorical_features"],
+            categories=layout["categories"],
+            category_weights=category_weights,
+            ignore_unknown=layout["ignore_unknown"],
+            intercept=layout["intercept"],
+            classes=np.asarray(layout["classes"]),
+        )
+
+
+# -------------------------------------------------------------------
+# Repli : pipeline sklearn complet
+# -------------------------------------------------------------------
+
+class PipelineScorer:
+    """Même interface que le scoreur compilé, en passant par le pipeline."""
+
+    compiled = False
+    explainable = False
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    def predict_one(self, student):
+        values = student if type(student) is dict else vars(student)
+        with span("dataframe"):
+            df = pd.DataFrame([values])
+        with span("predict"):
+            return self.pipeline.predict(df)[0]
+
+    def predict_many(self, students: list) -> list:
+        rows = [student if type(student) is dict else vars(student) for student in students]
+        return self.pipeline.predict(pd.DataFrame(rows)).tolist()
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        return self.pipeline.predict(df)
+
+
+# -------------------------------------------------------------------
+# Compilation
+# -------------------------------------------------------------------
+
+def compile_pipeline(pipeline) -> CompiledLinearScorer:
+    """
+    Extrait les paramètres appris d'un pipeline produit par
+    modules/retraining.py. Lève UncompilablePipeline pour toute forme
+    non supportée.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    if not isinstance(pipeline, Pipeline) or len(pipeline.steps) != 2:
+        raise UncompilablePipeline("Pipeline à deux étapes attendu")
+
+    preprocessor, classifier = (step for _, step in pipeline.steps)
+
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise UncompilablePipeline("ColumnTransformer attendu en première étape")
+    if not isinstance(classifier, _linear_classifiers()):
+        raise UncompilablePipeline(f"Classifieur non linéaire : {type(classifier).__name__}")
+    if classifier.coef_.shape[0] != 1 or len(classifier.classes_) != 2:
+        raise UncompilablePipeline("Seule la classification binaire est supportée")
+
+    coef = classifier.coef_[0]
+    offset = 0
+
+    numeric = {"features": [], "coefs": [], "means": [], "scales": []}
+    categorical = {"features": [], "categories": [], "weights": [], "ignore": []}
+
+    for _, transformer, columns in preprocessor.transformers_:
+        if transformer == "drop" or len(columns) == 0:
+            continue
+        if not all(isinstance(c, str) for c in columns):
+            raise UncompilablePipeline("Colonnes désignées par nom attendues")
+
+        if isinstance(transformer, StandardScaler):
+            width = len(columns)
+            n = transformer.n_features_in_
+            # with_mean=False : mean_ est appris mais jamais soustrait
+            if transformer.with_mean and transformer.mean_ is not None:
+                means = transformer.mean_
+            else:
+                means = np.zeros(n)
+            if transformer.with_std and transformer.scale_ is not None:
+                scales = transformer.scale_
+            else:
+                scales = np.ones(n)
+
+            numeric["features"] += list(columns)
+            numeric["coefs"] += coef[offset:offset + width].tolist()
+            numeric["means"] += means.tolist()
+            numeric["scales"] += scales.tolist()
+
+        elif isinstance(transformer, OneHotEncoder):
+            if transformer.drop_idx_ is not None:
+                raise UncompilablePipeline("OneHotEncoder(drop=...) non supporté")
+            if getattr(transformer, "_infrequent_enabled", False):
+                raise UncompilablePipeline("Modalités rares regroupées non supportées")
+
+            width = 0
+            for column, cats in zip(columns, transformer.categories_):
+                categorical["features"].append(column)
+                categorical["categories"].append(cats)
+                categorical["weights"].append(coef[offset + width:offset + width + len(cats)])
+                categorical["ignore"].append(transformer.handle_unknown != "error")
+                width += len(cats)
+
+        else:
+            raise UncompilablePipeline(f"Transformeur non supporté : {type(transformer).__name__}")
+
+        offset += width
+
+    if offset != coef.shape[0]:
+        raise UncompilablePipeline("Dimensions incohérentes entre préprocesseur et modèle")
+
+    coefs = np.asarray(numeric["coefs"], dtype=float)
+    means = np.asarray(numeric["means"], dtype=float)
+    scales = np.asarray(numeric["scales"], dtype=float)
+
+    return CompiledLinearScorer(
+        numeric_features=numeric["features"],
+        numeric_weights=coefs / scales,
+        numeric_coefs=coefs,
+        numeric_means=means,
+        numeric_scales=scales,
+        categorical_features=categorical["features"],
+        categories=categorical["categories"],
+        category_weights=categorical["weights"],
+        ignore_unknown=categorical["ignore"],
+        intercept=classifier.intercept_[0] - float(np.sum(coefs * means / scales)),
+        classes=classifier.classes_,
+    )
+
+
+def make_scorer(pipeline):
+    """Scoreur compilé si possible, pipeline complet sinon."""
+    try:
+        return compile_pipeline(pipeline)
+    except (UncompilablePipeline, AttributeError):
+        return PipelineScorer(pipeline)
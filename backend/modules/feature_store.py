@@ -0,0 +1,339 @@
+import hashlib
+import json
+import os
+import re
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from modules.data_preparation import (
+    CATEGORICAL_FEATURES,
+    CATEGORY_VALUES,
+    FEATURES_WITH_G2,
+    FEATURES_WITHOUT_G2,
+)
+from modules.model_registry import atomic_write_json, file_lock, file_sha256
+
+# Colonnes d'une ligne d'entraînement (G2 facultative, nulle si absente)
+STORE_COLUMNS = FEATURES_WITH_G2 + ["target"]
+REQUIRED_COLUMNS = FEATURES_WITHOUT_G2 + ["target"]
+
+# Nom de cohorte utilisable comme nom de partition (répertoire cohort=<nom>)
+COHORT_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+
+class FeatureStoreError(ValueError):
+    """Lignes non conformes, cohorte invalide ou sélection impossible."""
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    fields = []
+    for column in FEATURES_WITH_G2:
+        if column in CATEGORICAL_FEATURES:
+            fields.append(pa.field(column, pa.dictionary(pa.int8(), pa.string()), nullable=False))
+        else:
+            fields.append(pa.field(column, pa.int16(), nullable=column == "G2"))
+    fields += [
+        pa.field("target", pa.int8(), nullable=False),
+        pa.field("row_hash", pa.uint64(), nullable=False),
+        pa.field("ingested_at", pa.timestamp("us", tz="UTC"), nullable=False),
+    ]
+    return pa.schema(fields)
+
+
+# -------------------------------------------------------------------
+# Validation et identité des lignes
+# -------------------------------------------------------------------
+
+def validate_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Lignes d'entraînement typées (features + `target`), comme produites par
+    modules/ingestion.py. Lève FeatureStoreError pour une colonne manquante,
+    une valeur manquante, une modalité inconnue ou une cible hors {0, 1}.
+    """
+    missing = set(REQUIRED_COLUMNS) - set(df.columns)
+    if missing:
+        raise FeatureStoreError(f"Colonnes manquantes : {sorted(missing)}")
+
+    rows = pd.DataFrame(index=range(len(df)))
+    for column in STORE_COLUMNS:
+        if column not in df.columns:
+            # G2 absente du fichier : colonne nulle
+            rows[column] = pd.array([pd.NA] * len(df), dtype="Int16")
+            continue
+
+        values = df[column].reset_index(drop=True)
+        if values.isna().any():
+            raise FeatureStoreError(f"{column} : {int(values.isna().sum())} valeur(s) manquante(s)")
+
+        if column in CATEGORICAL_FEATURES:
+            unknown = set(values.astype(str).unique()) - set(CATEGORY_VALUES[column])
+            if unknown:
+                raise FeatureStoreError(f"{column} : modalité(s) inconnue(s) {sorted(unknown)}")
+            rows[column] = pd.Categorical(values.astype(str), categories=CATEGORY_VALUES[column])
+        elif column == "target":
+            if not values.isin([0, 1]).all():
+                raise FeatureStoreError("target : 0 ou 1 attendu")
+            rows[column] = values.astype("int8")
+        else:
+            rows[column] = values.astype("Int16" if column == "G2" else "int16")
+
+    return rows
+
+
+def row_hashes(rows: pd.DataFrame, cohort: str) -> np.ndarray:
+    """
+    Identité de chaque ligne : contenu, cohorte et rang d'occurrence du
+    même contenu dans le lot. Deux élèves identiques d'un même fichier sont
+    conservés ; un fichier renvoyé (ou un export qui en recouvre un autre)
+    ne ré-ajoute pas les lignes déjà présentes.
+    """
+    content = pd.util.hash_pandas_object(rows[STORE_COLUMNS], index=False)
+    occurrence = content.groupby(content.to_numpy()).cumcount()
+    identity = pd.DataFrame({
+        "content": content.to_numpy(),
+        "occurrence": occurrence.to_numpy(),
+        "cohort": cohort,
+    })
+    return pd.util.hash_pandas_object(identity, index=False).to_numpy()
+
+
+# -------------------------------------------------------------------
+# Store
+# -------------------------------------------------------------------
+
+class FeatureStore:
+    """
+    Lignes d'entraînement validées, en Parquet, partitionnées par cohorte :
+
+        <root>/cohort=<cohorte>/part-<version>-<id>.parquet
+        <root>/manifest.json
+
+    Append-only : chaque ingestion écrit un nouveau fichier (les lignes
+    déjà présentes dans la cohorte sont écartées) et incrémente la version
+    du manifeste. Le manifeste liste les fichiers avec leur version, leur
+    nombre de lignes et leur SHA-256 : une version (snapshot) désigne un
+    ensemble de fichiers figé, relisible à l'identique. Écritures
+    sérialisées entre process (verrou sur <root>/store.lock).
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    def manifest(self) -> dict:
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except FileNotFoundError:
+            return {"version": 0, "n_rows": 0, "cohorts": {}, "parts": [], "updated_at": None}
+
+    def _lock(self):
+        return file_lock(self.root / "store.lock")
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def _existing_hashes(self, manifest: dict, cohort: str) -> np.ndarray:
+        import pyarrow.parquet as pq
+
+        hashes = [
+            pq.read_table(self.root / part["path"], columns=["row_hash"])["row_hash"].to_numpy()
+            for part in manifest["parts"]
+            if part["cohort"] == cohort
+        ]
+        return np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64)
+
+    def ingest(self, df: pd.DataFrame, cohort: str, source: str = None) -> dict:
+        """
+        Valide et ajoute des lignes à une cohorte. Retourne l'entrée du
+        manifeste (lignes ajoutées, doublons écartés, version) ; sans ligne
+        nouvelle, aucun fichier n'est écrit et la version est inchangée.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not COHORT_PATTERN.match(cohort or ""):
+            raise FeatureStoreError(f"Nom de cohorte invalide : {cohort!r}")
+
+        rows = validate_rows(df)
+        hashes = row_hashes(rows, cohort)
+        ingested_at = datetime.now(timezone.utc)
+
+        with self._lock():
+            manifest = self.manifest()
+            new = ~np.isin(hashes, self._existing_hashes(manifest, cohort))
+            rows, hashes = rows[new], hashes[new]
+
+            entry = {
+                "version": manifest["version"],
+                "cohort": cohort,
+                "path": None,
+                "n_rows": int(new.sum()),
+                "n_duplicates": int(len(new) - new.sum()),
+                "sha256": None,
+                "source": source,
+                "ingested_at": ingested_at.isoformat(),
+            }
+            if not len(rows):
+                return entry
+
+            version = manifest["version"] + 1
+            partition = self.root / f"cohort={cohort}"
+            partition.mkdir(exist_ok=True)
+            path = partition / f"part-{version:06d}-{uuid.uuid4().hex[:8]}.parquet"
+
+            rows = rows.assign(row_hash=hashes, ingested_at=pd.Timestamp(ingested_at))
+            table = pa.Table.from_pandas(rows, schema=_arrow_schema(), preserve_index=False)
+            tmp = path.with_suffix(".tmp")
+            pq.write_table(table, tmp)
+            os.replace(tmp, path)
+
+            entry.update(
+                version=version,
+                path=str(path.relative_to(self.root)),
+                sha256=file_sha256(path),
+            )
+            manifest["parts"].append(entry)
+            manifest["version"] = version
+            manifest["n_rows"] += entry["n_rows"]
+            manifest["cohorts"][cohort] = manifest["cohorts"].get(cohort, 0) + entry["n_rows"]
+            manifest["updated_at"] = ingested_at.isoformat()
+            atomic_write_json(self.manifest_path, manifest)
+
+        logger.info(
+            "Feature store : {} ligne(s) ajoutée(s) à {} ({} doublon(s)), version {}",
+            entry["n_rows"], cohort, entry["n_duplicates"], version
+        )
+        return entry
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def select(
+        self,
+        snapshot: int = None,
+        cohorts: list = None,
+        since: datetime = None,
+        until: datetime = None
+    ) -> "StoreSelection":
+        """Sélection figée sur une version (la dernière par défaut)."""
+        version = self.manifest()["version"]
+        if version == 0:
+            raise FeatureStoreError("Feature store vide")
+        snapshot = version if snapshot is None else snapshot
+        if not 1 <= snapshot <= version:
+            raise FeatureStoreError(f"Snapshot inconnu : {snapshot} (dernière version : {version})")
+        return StoreSelection(self.root, snapshot, cohorts, since, until)
+
+    def verify(self) -> list:
+        """Fichiers du manifeste absents ou dont le SHA-256 ne correspond plus."""
+        problems = []
+        for part in self.manifest()["parts"]:
+            path = self.root / part["path"]
+            if not path.exists():
+                problems.append(f"{part['path']} : absent")
+            elif file_sha256(path) != part["sha256"]:
+                problems.append(f"{part['path']} : SHA-256 différent")
+        return problems
+
+
+class StoreSelection:
+    """
+    Lignes d'une version du store, filtrées par cohorte et par date
+    d'ingestion (`since` inclus, `until` exclu). Objet léger et picklable :
+    transmis tel quel au process de ré-entraînement, qui ne lit que les
+    fichiers et les colonnes utiles.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        snapshot: int,
+        cohorts: list = None,
+        since: datetime = None,
+        until: datetime = None
+    ):
+        self.root = Path(root)
+        self.snapshot = snapshot
+        self.cohorts = sorted(cohorts) if cohorts else None
+        self.since = since
+        self.until = until
+
+    def parts(self) -> list:
+        """Entrées du manifeste retenues (élagage sans lire les données)."""
+        manifest = json.loads((self.root / "manifest.json").read_text())
+        parts = []
+        for part in manifest["parts"]:
+            ingested_at = datetime.fromisoformat(part["ingested_at"])
+            if part["version"] > self.snapshot:
+                continue
+            if self.cohorts is not None and part["cohort"] not in self.cohorts:
+                continue
+            if self.since is not None and ingested_at < _as_utc(self.since):
+                continue
+            if self.until is not None and ingested_at >= _as_utc(self.until):
+                continue
+            parts.append(part)
+        return parts
+
+    def count(self) -> int:
+        return sum(part["n_rows"] for part in self.parts())
+
+    def digest(self) -> str:
+        """Identité du contenu sélectionné (fichiers et leurs SHA-256)."""
+        payload = [(part["path"], part["sha256"]) for part in self.parts()]
+        return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+    def describe(self) -> dict:
+        return {
+            "snapshot": self.snapshot,
+            "cohorts": self.cohorts,
+            "since": self.since.isoformat() if self.since else None,
+            "until": self.until.isoformat() if self.until else None,
+        }
+
+    def load(self, columns: list = None) -> pd.DataFrame:
+        """
+        Lignes sélectionnées, limitées à `columns` (features + target par
+        défaut). G2 est retirée si elle manque pour une partie des lignes :
+        seul le scénario sans G2 peut alors être entraîné.
+        """
+        import pyarrow.dataset as ds
+
+        columns = list(columns or STORE_COLUMNS)
+        parts = self.parts()
+        if not parts:
+            raise FeatureStoreError("Aucune ligne sélectionnée dans le feature store")
+
+        dataset = ds.dataset(
+            [str(self.root / part["path"]) for part in parts],
+            schema=_arrow_schema(),
+            format="parquet",
+        )
+        df = dataset.to_table(columns=columns).to_pandas()
+
+        if "G2" in df.columns and df["G2"].isna().any():
+            logger.warning(
+                "Feature store : G2 absente pour {} ligne(s), colonne ignorée",
+                int(df["G2"].isna().sum())
+            )
+            df = df.drop(columns="G2")
+        elif "G2" in df.columns:
+            df["G2"] = df["G2"].astype("int16")
+        return df
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,124 @@
+import hashlib
+import io
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from modules.data_preparation import (
+    CATEGORICAL_FEATURES,
+    FEATURES_WITH_G2,
+    FEATURES_WITHOUT_G2,
+)
+
+# Colonnes conservées à la lecture (G2 facultative)
+TRAINING_COLUMNS = FEATURES_WITH_G2 + ["G3"]
+REQUIRED_COLUMNS = FEATURES_WITHOUT_G2 + ["G3"]
+
+# Types explicites : pas d'inférence, pas de colonnes object larges
+TRAINING_DTYPES = {
+    column: "category" if column in CATEGORICAL_FEATURES else "int16"
+    for column in TRAINING_COLUMNS
+}
+
+
+class CsvSchemaError(ValueError):
+    """Fichier non conforme au schéma d'entraînement."""
+
+
+class _HashingReader(io.RawIOBase):
+    """
+    Flux en lecture seule qui calcule le SHA-256 du contenu lu et
+    restitue d'abord les octets déjà consommés (ligne d'en-tête).
+    """
+
+    def __init__(self, stream, prefix: bytes = b"", sha256=None):
+        self.stream = stream
+        self.prefix = prefix
+        self.sha256 = sha256 if sha256 is not None else hashlib.sha256()
+        self.sha256.update(prefix)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self.prefix:
+            n = min(len(buffer), len(self.prefix))
+            buffer[:n] = self.prefix[:n]
+            self.prefix = self.prefix[n:]
+            return n
+
+        data = self.stream.read(len(buffer))
+        self.sha256.update(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _check_header(header: bytes, sep: str) -> list:
+    columns = [
+        c.strip().strip('"') for c in header.decode("utf-8-sig").rstrip("\r\n").split(sep)
+    ]
+    missing = set(REQUIRED_COLUMNS) - set(columns)
+    if missing:
+        raise CsvSchemaError(f"Colonnes manquantes : {missing}")
+    return columns
+
+
+def iter_training_chunks(
+    stream,
+    sep: str = ";",
+    chunksize: int = 50_000,
+    sha256=None
+):
+    """
+    Lecture par blocs d'un CSV d'entraînement depuis un flux binaire :
+    - en-tête vérifié avant de lire le reste du fichier
+    - projection sur les features + G3 pendant la lecture
+    - types explicites (category, entiers réduits), cible calculée par bloc
+
+    Générateur de DataFrames typés (avec `target`). Si `sha256` (objet
+    hashlib) est fourni, il est mis à jour avec le contenu brut lu.
+    """
+    header = stream.readline()
+    columns = _check_header(header, sep)
+    wanted = [c for c in TRAINING_COLUMNS if c in columns]
+
+    reader = _HashingReader(stream, prefix=header, sha256=sha256)
+    chunks = pd.read_csv(
+        io.BufferedReader(reader),
+        sep=sep,
+        usecols=wanted,
+        dtype={c: TRAINING_DTYPES[c] for c in wanted},
+        chunksize=chunksize
+    )
+
+    try:
+        for chunk in chunks:
+            chunk["target"] = (chunk["G3"] >= 10).astype("int8")
+            yield chunk.drop(columns="G3")
+    except (ValueError, TypeError) as e:
+        raise CsvSchemaError(f"Données non conformes : {e}")
+
+
+def read_training_csv(stream, sep: str = ";", chunksize: int = 50_000) -> tuple:
+    """
+    Lecture complète (par blocs) d'un CSV d'entraînement.
+    Retourne (DataFrame typé avec `target`, SHA-256 du contenu brut).
+    """
+    sha256 = hashlib.sha256()
+    chunks = list(iter_training_chunks(stream, sep=sep, chunksize=chunksize, sha256=sha256))
+
+    if not chunks:
+        raise CsvSchemaError("Fichier CSV vide")
+
+    # Catégories propres à chaque bloc → union avant concaténation
+    for column in CATEGORICAL_FEATURES:
+        union = union_categoricals([chunk[column] for chunk in chunks]).categories
+        for chunk in chunks:
+            chunk[column] = chunk[column].cat.set_categories(union)
+
+    df = pd.concat(chunks, ignore_index=True)
+    for column in df.columns:
+        if column not in CATEGORICAL_FEATURES:
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+
+    return df, sha256.hexdigest()
@@ -0,0 +1,237 @@
+import threading
+from bisect import bisect_left
+
+# Bornes (secondes) des histogrammes de latence
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+# Bornes des histogrammes de taille de lot (micro-batching)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _ShardedMetric:
+    """
+    Métrique répartie en un fragment par thread : chaque thread écrit dans
+    son propre dictionnaire, sans verrou ; l'agrégation se fait à la lecture
+    (GET /metrics).
+    """
+
+    type = None
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_ShardedMetric):
+    type = "counter"
+
+    def inc(self, labels: tuple = (), value: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + value
+
+    def collect(self) -> dict:
+        totals = {}
+        for shard in list(self._shards):
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def render(self) -> list:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in sorted(self.collect().items())
+        ]
+
+
+class Gauge(Counter):
+    """Jauge incrémentale (ex. requêtes en cours) : somme des fragments."""
+
+    type = "gauge"
+
+    def dec(self, labels: tuple = (), value: float = 1):
+        self.inc(labels, -value)
+
+
+class InfoGauge:
+    """Jauge à valeurs fixées (rarement mise à jour : versions de modèles)."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, labels: tuple, value: float, replace_prefix: int = 0):
+        """Fixe une valeur ; `replace_prefix` supprime d'abord les séries
+        partageant les `replace_prefix` premiers labels (ancienne version)."""
+        with self._lock:
+            if replace_prefix:
+                for key in [k for k in self._values if k[:replace_prefix] == labels[:replace_prefix]]:
+                    del self._values[key]
+            self._values[labels] = value
+
+    def render(self) -> list:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"] + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in values
+        ]
+
+
+class Histogram(_ShardedMetric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: tuple, value: float):
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            # [compteurs par intervalle..., +Inf, somme]
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def collect(self) -> dict:
+        totals = {}
+        for shard in list(self._shards):
+            for labels, state in list(shard.items()):
+                total = totals.setdefault(labels, [0] * len(state))
+                for i, value in enumerate(state):
+                    total[i] += value
+        return totals
+
+    def render(self) -> list:
+        lines = self.header()
+        for labels, state in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), state[:-1]):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {state[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+# -------------------------------------------------------------------
+# Métriques de l'API
+# -------------------------------------------------------------------
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total",
+    "Requêtes HTTP traitées",
+    ("method", "route", "status")
+))
+HTTP_ERRORS = REGISTRY.register(Counter(
+    "http_request_errors_total",
+    "Requêtes HTTP en erreur (statut >= 500 ou exception)",
+    ("method", "route", "status")
+))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "Durée de traitement des requêtes HTTP",
+    ("method", "route", "status")
+))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight",
+    "Requêtes HTTP en cours de traitement",
+    ("method",)
+))
+INFERENCE_LATENCY = REGISTRY.register(Histogram(
+    "model_inference_duration_seconds",
+    "Durée de l'inférence (hors cache)",
+    ("model", "kind")
+))
+PREDICTION_LOG_WRITE = REGISTRY.register(Histogram(
+    "prediction_log_write_duration_seconds",
+    "Durée d'écriture d'un événement dans le journal des prédictions (requête)",
+    ()
+))
+PREDICTION_LOG_FLUSH = REGISTRY.register(Histogram(
+    "prediction_log_flush_duration_seconds",
+    "Durée d'écriture d'un lot du journal des prédictions (thread dédié)",
+    ()
+))
+MODEL_INFO = REGISTRY.register(InfoGauge(
+    "model_info",
+    "Version servie de chaque modèle",
+    ("model", "version", "compiled")
+))
+MODEL_LOADED_AT = REGISTRY.register(InfoGauge(
+    "model_loaded_timestamp_seconds",
+    "Horodatage du chargement du modèle servi",
+    ("model",)
+))
+MODEL_LOAD_DURATION = REGISTRY.register(InfoGauge(
+    "model_load_duration_seconds",
+    "Durée du dernier chargement du modèle",
+    ("model",)
+))
+MICROBATCH_SIZE = REGISTRY.register(Histogram(
+    "microbatch_size",
+    "Nombre de prédictions unitaires regroupées par lot (micro-batching)",
+    ("model",),
+    buckets=BATCH_SIZE_BUCKETS
+))
+MICROBATCH_WAIT = REGISTRY.register(Histogram(
+    "microbatch_queue_wait_seconds",
+    "Attente d'une prédiction unitaire avant l'envoi de son lot (micro-batching)",
+    ("model",)
+))
@@ -0,0 +1,205 @@
+import asyncio
+import contextvars
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from modules.metrics import INFERENCE_LATENCY, MICROBATCH_SIZE, MICROBATCH_WAIT
+
+# Lissage de l'intervalle moyen entre deux arrivées (moyenne exponentielle)
+GAP_SMOOTHING = 0.2
+
+# Intervalle retenu après une période sans requête (et au démarrage)
+IDLE_GAP = 1.0
+
+# Fenêtre réduite de moitié après chaque attente qui n'a regroupé aucune
+# requête (clients séquentiels), annulée sous 1/64 de max_wait
+BACKOFF_FLOOR = 1 / 64
+
+
+def score_batch(model, students: list) -> list:
+    """
+    Prédictions d'un lot d'élèves en un seul appel. Si le lot échoue (élève
+    invalide), chaque élève est scoré seul : seule la requête fautive reçoit
+    l'exception.
+    """
+    start = time.perf_counter()
+    try:
+        predictions = model.scorer.predict_many(students)
+    except Exception:
+        predictions = []
+        for student in students:
+            try:
+                predictions.append(model.scorer.predict_one(student))
+            except Exception as e:
+                predictions.append(e)
+    INFERENCE_LATENCY.observe((model.name, "microbatch"), time.perf_counter() - start)
+    return predictions
+
+
+class _ModelQueue:
+    """Requêtes en attente pour une version de modèle."""
+
+    def __init__(self, model):
+        self.model = model
+        self.pending = []  # (élève, future, instant d'arrivée)
+        self.timer = None
+        self.in_flight = 0
+        self.last_arrival = None
+        self.gap = IDLE_GAP
+        # Part de la fenêtre estimée effectivement attendue (1 : toute)
+        self.scale = 1.0
+        self.waited = False
+
+    def arrived(self, now: float):
+        if self.pending or self.in_flight:
+            # Requêtes réellement concurrentes : attendre peut regrouper
+            self.scale = 1.0
+        if self.last_arrival is not None:
+            gap = min(now - self.last_arrival, IDLE_GAP)
+            self.gap += GAP_SMOOTHING * (gap - self.gap)
+        self.last_arrival = now
+
+
+class MicroBatcher:
+    """
+    Regroupe les prédictions unitaires concurrentes d'un même modèle :
+    les requêtes arrivées dans une courte fenêtre (ou jusqu'à `max_size`)
+    sont scorées en un seul appel, puis chaque résultat est rendu à la
+    requête qui l'attend.
+
+    Pipeline sklearn (un `predict` coûte quelques ms, quelle que soit la
+    taille du lot) : le premier élève part seul et sans attente ; les
+    requêtes arrivées pendant son scoring forment le lot suivant, envoyé
+    dès la fin du précédent (au plus un lot en cours par modèle : un
+    passage par le threadpool et un `predict` par lot). La taille des lots suit ainsi la charge. Au repos, la
+    fenêtre d'attente s'adapte au trafic : temps estimé pour remplir le
+    lot (intervalle moyen entre arrivées × places restantes), borné par
+    `max_wait` ; nulle si la requête suivante n'est pas attendue avant
+    `max_wait`, et réduite de moitié après chaque attente qui n'a rien
+    regroupé (clients séquentiels) : à faible trafic, aucune latence
+    n'est ajoutée.
+
+    Scoreur compilé (quelques µs par élève) : rien à gagner à regrouper ni
+    à attendre ; chaque élève est scoré à son arrivée, directement dans la
+    boucle asyncio, sans passage par le threadpool.
+
+    Un objet par worker, utilisé depuis la boucle asyncio uniquement.
+    """
+
+    def __init__(self, max_size: int = 0, max_wait: float = 0.002):
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._queues = {}
+        self._tasks = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def window(self, queue: _ModelQueue) -> float:
+        """Attente avant l'envoi d'un lot qui commence (secondes)."""
+        if queue.model.scorer.compiled or queue.gap >= self.max_wait \
+                or queue.scale < BACKOFF_FLOOR:
+            return 0.0
+        estimate = queue.gap * (self.max_size - len(queue.pending))
+        return min(self.max_wait, estimate) * queue.scale
+
+    def _queue(self, model) -> _ModelQueue:
+        key = (model.name, model.version)
+        queue = self._queues.get(key)
+        if queue is None:
+            # Nouvelle version servie : les files inactives du modèle sont libérées
+            for other in [k for k, q in self._queues.items() if k[0] == model.name]:
+                stale = self._queues[other]
+                if not stale.pending and not stale.in_flight:
+                    del self._queues[other]
+            queue = self._queues[key] = _ModelQueue(model)
+        return queue
+
+    async def predict(self, model, student):
+        """Prédiction d'un élève, scorée dans le prochain lot du modèle."""
+        loop = asyncio.get_running_loop()
+        queue = self._queue(model)
+        now = time.perf_counter()
+        queue.arrived(now)
+
+        future = loop.create_future()
+        queue.pending.append((student, future, now))
+
+        # Au plus un lot en cours par file : pendant son scoring, les
+        # requêtes s'accumulent et le lot suivant part à sa fin
+        if queue.in_flight:
+            return await future
+
+        if len(queue.pending) >= self.max_size:
+            self._dispatch(queue)
+        elif len(queue.pending) == 1:
+            wait = self.window(queue)
+            if wait > 0:
+                queue.waited = True
+                queue.timer = loop.call_later(wait, self._dispatch, queue)
+            else:
+                self._dispatch(queue)
+
+        return await future
+
+    # ------------------------------------------------------------------
+    # Envoi des lots
+    # ------------------------------------------------------------------
+
+    def _dispatch(self, queue: _ModelQueue):
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+
+        batch = queue.pending[:self.max_size]
+        queue.pending = queue.pending[self.max_size:]
+        if queue.waited and len(batch) == 1:
+            queue.scale /= 2
+        queue.waited = False
+        # Requêtes abandonnées entre-temps (client déconnecté)
+        batch = [item for item in batch if not item[1].cancelled()]
+        if not batch:
+            return
+
+        now = time.perf_counter()
+        labels = (queue.model.name,)
+        MICROBATCH_SIZE.observe(labels, len(batch))
+        for _, _, arrived_at in batch:
+            MICROBATCH_WAIT.observe(labels, now - arrived_at)
+
+        students = [student for student, _, _ in batch]
+        if queue.model.scorer.compiled:
+            self._resolve(batch, score_batch(queue.model, students))
+        else:
+            queue.in_flight += 1
+            # Contexte vide : le lot n'appartient à la trace d'aucune requête
+            task = asyncio.get_running_loop().create_task(
+                self._score_in_threadpool(queue, batch, students),
+                context=contextvars.Context()
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _score_in_threadpool(self, queue: _ModelQueue, batch: list, students: list):
+        try:
+            predictions = await run_in_threadpool(score_batch, queue.model, students)
+        except Exception as e:
+            predictions = [e] * len(batch)
+        finally:
+            queue.in_flight -= 1
+
+        self._resolve(batch, predictions)
+        if queue.pending and queue.timer is None:
+            self._dispatch(queue)
+
+    @staticmethod
+    def _resolve(batch: list, predictions: list):
+        for (_, future, _), prediction in zip(batch, predictions):
+            if future.done():
+                continue
+            if isinstance(prediction, Exception):
+                future.set_exception(prediction)
+            else:
+                future.set_result(prediction)
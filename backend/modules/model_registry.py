@@ -0,0 +1,405 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import pandas as pd
+from loguru import logger
+
+from modules.fast_scorer import (
+    CompiledLinearScorer,
+    PipelineScorer,
+    UncompilablePipeline,
+    compile_pipeline,
+)
+
+# Fichiers historiques (modèles livrés avec l'image) : point de départ du registre
+MODEL_FILES = {
+    "without_g2": "model_without_g2.pkl",
+    "with_g2": "model_with_g2.pkl",
+}
+
+
+class UnknownModelVersion(KeyError):
+    """Version absente du registre."""
+
+
+# -------------------------------------------------------------------
+# Écritures atomiques
+# -------------------------------------------------------------------
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Écriture dans un fichier temporaire du même répertoire puis rename."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def atomic_copy(source: Path, target: Path):
+    tmp = target.with_name(f".{target.name}.tmp")
+    shutil.copyfile(source, tmp)
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, target)
+
+
+def atomic_write_json(path: Path, payload: dict):
+    atomic_write_bytes(path, json.dumps(payload, indent=2).encode())
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Verrou exclusif entre process (flock), libéré à la sortie du bloc."""
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def file_sha256(path: Path) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+# -------------------------------------------------------------------
+# Registre versionné (sur disque)
+# -------------------------------------------------------------------
+
+class ModelRegistry:
+    """
+    Registre de modèles versionnés sous MODELS_DIR/registry :
+
+        registry/<nom>/<version>.pkl         modèle sérialisé (pipeline sklearn)
+        registry/<nom>/<version>.scorer.npy  scoreur compact (paramètres, mmap)
+        registry/<nom>/<version>.json        métadonnées (hash, date, métriques,
+                                             description du scoreur compact)
+        registry/<nom>/active.json           version active + historique
+
+    Toutes les écritures passent par un fichier temporaire renommé
+    atomiquement : un lecteur ne voit jamais de fichier à moitié écrit.
+    Elles sont sérialisées entre threads et entre process (workers de
+    l'API) par registry/registry.lock.
+    """
+
+    def __init__(self, models_dir: Path):
+        self.models_dir = Path(models_dir)
+        self.root = self.models_dir / "registry"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, file_lock(self.root / "registry.lock"):
+            yield
+
+    def after_fork(self):
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def _dir(self, name: str) -> Path:
+        if name not in MODEL_FILES:
+            raise UnknownModelVersion(name)
+        path = self.root / name
+        path.mkdir(exist_ok=True)
+        return path
+
+    def _read_pointer(self, name: str) -> dict:
+        pointer = self._dir(name) / "active.json"
+        if not pointer.exists():
+            return {"version": None, "history": []}
+        return json.loads(pointer.read_text())
+
+    def active_version(self, name: str):
+        return self._read_pointer(name)["version"]
+
+    def metadata(self, name: str, version: str) -> dict:
+        path = self._dir(name) / f"{version}.json"
+        if not path.exists():
+            raise UnknownModelVersion(f"{name}:{version}")
+        return json.loads(path.read_text())
+
+    def versions(self, name: str) -> list:
+        return sorted(
+            (json.loads(p.read_text()) for p in self._dir(name).glob("*.json")
+             if p.name != "active.json"),
+            key=lambda meta: meta["created_at"]
+        )
+
+    def model_path(self, name: str, version: str) -> Path:
+        return self._dir(name) / f"{version}.pkl"
+
+    def scorer_path(self, name: str, version: str) -> Path:
+        return self._dir(name) / f"{version}.scorer.npy"
+
+    def _resolve(self, name: str, version: str = None) -> str:
+        version = version or self.active_version(name)
+        if version is None:
+            raise UnknownModelVersion(f"{name}: aucune version active")
+        return version
+
+    def load(self, name: str, version: str = None) -> tuple:
+        """Retourne (pipeline, métadonnées) de la version demandée (active par défaut)."""
+        version = self._resolve(name, version)
+        metadata = self.metadata(name, version)
+        return joblib.load(self.model_path(name, version)), metadata
+
+    def load_scorer(self, name: str, version: str = None) -> tuple:
+        """
+        Retourne (scoreur, métadonnées) pour le service de prédiction :
+        - scoreur compact projeté en mémoire, sans sklearn ni pickle
+        - pipeline complet (mmap joblib) si le modèle n'est pas compilable
+        Les versions enregistrées avant le format compact sont exportées
+        au premier chargement.
+        """
+        version = self._resolve(name, version)
+        metadata = self.metadata(name, version)
+
+        if "scorer" not in metadata:
+            with self._locked():
+                metadata = self.metadata(name, version)
+                if "scorer" not in metadata:
+                    metadata["scorer"] = self._export_scorer(name, version)
+                    atomic_write_json(self._dir(name) / f"{version}.json", metadata)
+
+        if metadata["scorer"] is None:
+            pipeline = joblib.load(self.model_path(name, version), mmap_mode="r")
+            return PipelineScorer(pipeline), metadata
+
+        scorer = CompiledLinearScorer.load(
+            self.scorer_path(name, version), metadata["scorer"]
+        )
+        return scorer, metadata
+
+    def _export_scorer(self, name: str, version: str):
+        """Écrit le scoreur compact d'une version ; None si non compilable."""
+        try:
+            scorer = compile_pipeline(joblib.load(self.model_path(name, version)))
+        except (UncompilablePipeline, AttributeError):
+            return None
+
+        target = self.scorer_path(name, version)
+        tmp = target.with_name(f".{target.name}.tmp")
+        layout = scorer.save(tmp)
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+        return layout
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def save(self, name: str, source_path: Path, **metadata) -> dict:
+        """
+        Enregistre un fichier modèle comme nouvelle version (non active).
+        Un contenu déjà enregistré (même hash) renvoie la version existante.
+        """
+        source_path = Path(source_path)
+        sha256 = file_sha256(source_path)
+
+        with self._locked():
+            for existing in self.versions(name):
+                if existing["sha256"] == sha256:
+                    return existing
+
+            created_at = datetime.utcnow()
+            version = f"{created_at:%Y%m%dT%H%M%S%f}-{sha256[:8]}"
+            target = self.model_path(name, version)
+            atomic_copy(source_path, target)
+
+            meta = {
+                "name": name,
+                "version": version,
+                "sha256": sha256,
+                "size_bytes": target.stat().st_size,
+                "created_at": created_at.isoformat(),
+                "scorer": self._export_scorer(name, version),
+                **metadata,
+            }
+            atomic_write_json(self._dir(name) / f"{version}.json", meta)
+
+        logger.info("Modèle {} enregistré en version {}", name, version)
+        return meta
+
+    def promote(self, name: str, version: str) -> dict:
+        self.metadata(name, version)  # vérifie l'existence
+
+        with self._locked():
+            pointer = self._read_pointer(name)
+            if pointer["version"] != version:
+                pointer["history"].append(version)
+                pointer["version"] = version
+                pointer["promoted_at"] = datetime.utcnow().isoformat()
+                atomic_write_json(self._dir(name) / "active.json", pointer)
+
+        logger.info("Modèle {} : version active {}", name, version)
+        return pointer
+
+    def rollback(self, name: str) -> dict:
+        """Réactive la version précédemment active."""
+        with self._locked():
+            pointer = self._read_pointer(name)
+            if len(pointer["history"]) < 2:
+                raise UnknownModelVersion(f"{name}: aucune version précédente")
+            pointer["history"].pop()
+            pointer["version"] = pointer["history"][-1]
+            pointer["promoted_at"] = datetime.utcnow().isoformat()
+            atomic_write_json(self._dir(name) / "active.json", pointer)
+
+        logger.info("Modèle {} : retour à la version {}", name, pointer["version"])
+        return pointer
+
+    def bootstrap(self):
+        """Importe les modèles livrés (model_*.pkl) si le registre est vide."""
+        for name, filename in MODEL_FILES.items():
+            legacy = self.models_dir / filename
+            if self.active_version(name) is None and legacy.exists():
+                meta = self.save(name, legacy, source=filename)
+                self.promote(name, meta["version"])
+
+
+# -------------------------------------------------------------------
+# Modèles servis (en mémoire, remplacés par référence)
+# -------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ServingModel:
+    name: str
+    version: str
+    scorer: object = field(repr=False)
+    loaded_at: str
+    load_seconds: float = 0.0
+    # Distribution des données d'entraînement (None : modèle livré)
+    reference_profile: dict = field(default=None, repr=False)
+
+
+def warm_up(scorer):
+    """
+    Prédiction fictive (élève seul + lot d'une ligne) avant de servir le
+    modèle : pages projetées et chemins pandas chargés hors requête.
+    """
+    if not scorer.compiled:
+        return
+    sample = scorer.sample()
+    scorer.predict_one(sample)
+    scorer.predict(pd.DataFrame([sample]))
+
+
+class ModelStore:
+    """
+    Modèles actifs en mémoire. Un rechargement construit le nouveau modèle
+    à part puis remplace la référence : les prédictions en cours gardent
+    l'ancien objet, aucune n'est bloquée.
+
+    Avec plusieurs workers, chacun surveille le registre (start_watching) :
+    une promotion faite par n'importe quel process est servie partout
+    au plus tard après un intervalle de scrutation.
+    """
+
+    def __init__(self, registry: ModelRegistry, on_swap=None):
+        self.registry = registry
+        self.on_swap = on_swap
+        self._models = {}
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def get(self, name: str) -> ServingModel:
+        return self._models[name]
+
+    def all(self) -> dict:
+        return dict(self._models)
+
+    def reload(self, name: str) -> ServingModel:
+        with self._reload_lock:
+            version = self.registry.active_version(name)
+            current = self._models.get(name)
+            if current is not None and current.version == version:
+                return current
+
+            start = time.perf_counter()
+            scorer, metadata = self.registry.load_scorer(name, version)
+            warm_up(scorer)
+            model = ServingModel(
+                name=name,
+                version=metadata["version"],
+                scorer=scorer,
+                loaded_at=datetime.utcnow().isoformat(),
+                load_seconds=time.perf_counter() - start,
+                reference_profile=metadata.get("reference_profile"),
+            )
+            self._models = {**self._models, name: model}
+
+        if self.on_swap is not None:
+            self.on_swap(model)
+
+        logger.info(
+            "Modèle {} servi en version {} (compilé : {})",
+            name, model.version, model.scorer.compiled
+        )
+        return model
+
+    def reload_all(self):
+        for name in MODEL_FILES:
+            self.reload(name)
+
+    # ------------------------------------------------------------------
+    # Surveillance du registre (rechargements coordonnés entre workers)
+    # ------------------------------------------------------------------
+
+    def start_watching(self, interval: float = 1.0):
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="model-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._stop.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                # reload() ne recharge que si la version active a changé
+                self.reload_all()
+            except Exception as e:
+                logger.error("Rechargement des modèles impossible : {}", e)
+
+    def after_fork(self):
+        """Dans un worker issu d'un fork : les threads du parent n'existent plus."""
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def ready(self) -> bool:
+        """Tous les modèles sont chargés (et préchauffés)."""
+        return all(name in self._models for name in MODEL_FILES)
@@ -0,0 +1,81 @@
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Cache LRU borné des prédictions, indexé sur :
+        (modèle, version, valeurs des features dans l'ordre du schéma)
+
+    La version fait partie de la clé : un modèle rechargé ne peut jamais
+    servir une prédiction de l'ancienne version. invalidate() libère en
+    plus immédiatement les entrées devenues inutiles.
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    @staticmethod
+    def make_key(model_name: str, model_version: str, student) -> tuple:
+        # Entrées validées par Pydantic : types normalisés, ordre du schéma
+        values = student if type(student) is dict else vars(student)
+        return (model_name, model_version, *values.values())
+
+    def get(self, key: tuple):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, model_name: str, keep_version: str = None):
+        """Supprime les entrées d'un modèle (sauf celles de keep_version)."""
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if key[0] == model_name and key[1] != keep_version
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,194 @@
+import fcntl
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from modules.metrics import PREDICTION_LOG_FLUSH
+
+# Sentinelle de fin de flux (arrêt du writer)
+_STOP = object()
+
+
+class PredictionLogWriter:
+    """
+    Journal des prédictions (JSONL) écrit hors du chemin de la requête :
+    - write() dépose un événement compact dans une file mémoire (non bloquant)
+    - un thread dédié écrit les événements par lots (taille ou délai)
+    - rotation par taille : predictions.jsonl → predictions.jsonl.1 → ...
+      (rotation et écriture sous verrou flock : plusieurs workers peuvent
+      partager le même journal)
+    - chaque lot est aussi inséré dans l'historique indexé (store), si fourni
+    - close() vide la file avant de rendre la main
+
+    Aussi utilisé pour le journal des traces (modules/tracing.py), sans
+    historique ni métrique d'écriture.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        store=None,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        max_queue: int = 100_000,
+        flush_metric=PREDICTION_LOG_FLUSH
+    ):
+        self.path = Path(path)
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_metric = flush_metric
+
+        self.max_queue = max_queue
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+
+    # ------------------------------------------------------------------
+    # Côté requête
+    # ------------------------------------------------------------------
+
+    def write(self, event: dict):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Le service prime sur la journalisation : l'événement est compté
+            self.dropped += 1
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(
+                target=self._run, name="prediction-log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def after_fork(self):
+        """Dans un worker issu d'un fork : nouvelle file, thread à relancer."""
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def close(self, timeout: float = 10.0):
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        if self.dropped:
+            logger.warning("{} événements de prédiction non journalisés", self.dropped)
+
+    # ------------------------------------------------------------------
+    # Thread d'écriture
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                event = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                event = None
+
+            if event is _STOP:
+                # Vidage de ce qui reste en file avant l'arrêt
+                while True:
+                    try:
+                        event = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if event is not _STOP:
+                        batch.append(event)
+                self._flush(batch)
+                return
+
+            if event is not None:
+                batch.append(event)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch: list):
+        if not batch:
+            return
+        start = time.perf_counter()
+        data = "".join(
+            json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for event in batch
+        ).encode()
+
+        try:
+            f = self._open_locked()
+            try:
+                size = os.fstat(f.fileno()).st_size
+                if size and size + len(data) > self.max_bytes:
+                    # Le fichier verrouillé devient l'archive .1 : verrou
+                    # conservé jusqu'à l'écriture dans le nouveau fichier
+                    self._rotate()
+                    with self._open_locked() as current:
+                        current.write(data)
+                else:
+                    f.write(data)
+            finally:
+                f.close()
+        except OSError as e:
+            logger.error("Écriture du journal des prédictions impossible : {}", e)
+
+        if self.store is not None:
+            try:
+                self.store.insert_many(batch)
+            except Exception as e:
+                logger.error("Insertion dans l'historique des prédictions impossible : {}", e)
+
+        self.written += len(batch)
+        self.flushes += 1
+        if self.flush_metric is not None:
+            self.flush_metric.observe((), time.perf_counter() - start)
+
+    def _open_locked(self):
+        """
+        Ouvre le journal en ajout sous verrou exclusif (flock). Si un autre
+        process l'a archivé entre l'ouverture et le verrou, on rouvre le
+        nouveau fichier.
+        """
+        while True:
+            f = open(self.path, "ab")
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                if os.fstat(f.fileno()).st_ino == os.stat(self.path).st_ino:
+                    return f
+            except FileNotFoundError:
+                pass
+            f.close()
+
+    def _rotate(self):
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backup_count > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
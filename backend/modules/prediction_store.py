@@ -0,0 +1,317 @@
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    event         TEXT    NOT NULL,
+    timestamp     TEXT    NOT NULL,
+    session_id    TEXT,
+    endpoint      TEXT,
+    model         TEXT,
+    model_version TEXT,
+    prediction    INTEGER,
+    batch_size    INTEGER NOT NULL DEFAULT 1,
+    n_errors      INTEGER,
+    n_positive    INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_model ON predictions (model, id);
+CREATE INDEX IF NOT EXISTS idx_predictions_session ON predictions (session_id, id);
+"""
+
+# Agrégats par tranche de temps, mis à jour à chaque insertion : une requête
+# de statistiques lit un nombre de lignes proportionnel au nombre de
+# tranches, quel que soit le volume d'événements
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prediction_rollups (
+    granularity TEXT    NOT NULL,
+    bucket      TEXT    NOT NULL,
+    model       TEXT    NOT NULL,
+    endpoint    TEXT    NOT NULL,
+    requests    INTEGER NOT NULL,
+    predictions INTEGER NOT NULL,
+    n_success   INTEGER NOT NULL,
+    n_risk      INTEGER NOT NULL,
+    n_errors    INTEGER NOT NULL,
+    PRIMARY KEY (granularity, bucket, model, endpoint)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS session_rollups (
+    bucket      TEXT    NOT NULL,
+    session_id  TEXT    NOT NULL,
+    model       TEXT    NOT NULL,
+    requests    INTEGER NOT NULL,
+    predictions INTEGER NOT NULL,
+    n_success   INTEGER NOT NULL,
+    n_risk      INTEGER NOT NULL,
+    n_errors    INTEGER NOT NULL,
+    PRIMARY KEY (bucket, session_id, model)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_session_rollups_session ON session_rollups (session_id, bucket);
+"""
+
+COLUMNS = (
+    "event",
+    "timestamp",
+    "session_id",
+    "endpoint",
+    "model",
+    "model_version",
+    "prediction",
+    "batch_size",
+    "n_errors",
+    "n_positive",
+)
+
+MAX_PAGE_SIZE = 500
+
+# Tranches de temps : préfixe de l'horodatage ISO conservé, complété pour
+# former le début de la tranche
+GRANULARITIES = {
+    "minute": (16, ":00", timedelta(minutes=1)),
+    "hour": (13, ":00:00", timedelta(hours=1)),
+    "day": (10, "T00:00:00", timedelta(days=1)),
+}
+
+# Durée de conservation des agrégats (None : illimitée). Les agrégats par
+# session sont journaliers.
+ROLLUP_RETENTION = {
+    "minute": timedelta(days=2),
+    "hour": timedelta(days=90),
+    "day": None,
+}
+
+MAX_STATS_BUCKETS = 5000
+
+ROLLUP_COUNTERS = ("requests", "predictions", "n_success", "n_risk", "n_errors")
+
+
+def bucket_start(timestamp: str, granularity: str) -> str:
+    """Début de la tranche contenant `timestamp` (ISO 8601, UTC)."""
+    length, suffix, _ = GRANULARITIES[granularity]
+    return timestamp[:length] + suffix
+
+
+def event_counts(event: dict) -> tuple:
+    """(requests, predictions, n_success, n_risk, n_errors) d'un événement."""
+    if event.get("event") == "prediction_batch":
+        predictions = event.get("batch_size") or 0
+        n_success = event.get("n_positive") or 0
+        return 1, predictions, n_success, predictions - n_success, event.get("n_errors") or 0
+    success = int(event.get("prediction") == 1)
+    return 1, 1, success, 1 - success, 0
+
+
+def aggregate_rollups(events: list) -> tuple:
+    """
+    Agrégation en mémoire d'un lot d'événements :
+    ({(granularity, bucket, model, endpoint): compteurs},
+     {(bucket, session_id, model): compteurs}).
+    """
+    rollups = defaultdict(lambda: [0] * len(ROLLUP_COUNTERS))
+    sessions = defaultdict(lambda: [0] * len(ROLLUP_COUNTERS))
+
+    for event in events:
+        counts = event_counts(event)
+        model = event.get("model") or ""
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(event["timestamp"], granularity),
+                   model, event.get("endpoint") or "")
+            rollups[key] = [a + b for a, b in zip(rollups[key], counts)]
+        if event.get("session_id"):
+            key = (bucket_start(event["timestamp"], "day"), event["session_id"], model)
+            sessions[key] = [a + b for a, b in zip(sessions[key], counts)]
+
+    return rollups, sessions
+
+
+class PredictionStore:
+    """
+    Historique des prédictions dans SQLite (mode WAL) :
+    - insertion par lots depuis le writer du journal
+    - lectures concurrentes sans bloquer l'écriture
+    - pagination par curseur (id décroissant) : coût d'une page
+      indépendant du volume total de l'historique
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            rollups_exist = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'prediction_rollups'"
+            ).fetchone()
+            conn.executescript(ROLLUP_SCHEMA)
+
+        # Historique antérieur aux agrégats : reconstruction unique
+        if not rollups_exist:
+            self.rebuild_rollups()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Une connexion par thread (sqlite3 n'autorise pas le partage)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def after_fork(self):
+        # Les connexions SQLite ne doivent pas traverser un fork
+        self._local = threading.local()
+
+    def insert_many(self, events: list):
+        rows = [
+            (
+                event.get("event", "prediction"),
+                event["timestamp"],
+                event.get("session_id"),
+                event.get("endpoint"),
+                event.get("model"),
+                event.get("model_version"),
+                event.get("prediction"),
+                event.get("batch_size", 1),
+                event.get("n_errors"),
+                event.get("n_positive"),
+            )
+            for event in events
+        ]
+        rollups, sessions = aggregate_rollups(events)
+
+        # Événements et agrégats dans la même transaction (cohérents entre
+        # workers : les compteurs sont incrémentés, pas remplacés)
+        with self._connection() as conn:
+            conn.executemany(
+                f"INSERT INTO predictions ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                rows
+            )
+            self._upsert_rollups(conn, rollups, sessions)
+            self._prune_rollups(conn, max(event["timestamp"] for event in events))
+
+    # ------------------------------------------------------------------
+    # Agrégats par tranche de temps
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _upsert_rollups(conn, rollups: dict, sessions: dict):
+        increments = ", ".join(f"{c} = {c} + excluded.{c}" for c in ROLLUP_COUNTERS)
+        placeholders = ", ".join("?" for _ in ROLLUP_COUNTERS)
+        conn.executemany(
+            f"INSERT INTO prediction_rollups VALUES (?, ?, ?, ?, {placeholders}) "
+            f"ON CONFLICT (granularity, bucket, model, endpoint) DO UPDATE SET {increments}",
+            [(*key, *counts) for key, counts in rollups.items()]
+        )
+        conn.executemany(
+            f"INSERT INTO session_rollups VALUES (?, ?, ?, {placeholders}) "
+            f"ON CONFLICT (bucket, session_id, model) DO UPDATE SET {increments}",
+            [(*key, *counts) for key, counts in sessions.items()]
+        )
+
+    @staticmethod
+    def _prune_rollups(conn, now: str):
+        now = datetime.fromisoformat(now)
+        for granularity, retention in ROLLUP_RETENTION.items():
+            if retention is not None:
+                conn.execute(
+                    "DELETE FROM prediction_rollups WHERE granularity = ? AND bucket < ?",
+                    (granularity, (now - retention).isoformat())
+                )
+
+    def rebuild_rollups(self, batch_size: int = 10_000):
+        """Recalcule les agrégats depuis la table des événements."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM prediction_rollups")
+            conn.execute("DELETE FROM session_rollups")
+            cursor = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM predictions ORDER BY id"
+            )
+            while True:
+                events = [dict(row) for row in cursor.fetchmany(batch_size)]
+                if not events:
+                    break
+                self._upsert_rollups(conn, *aggregate_rollups(events))
+
+    def stats(
+        self,
+        granularity: str,
+        since: str,
+        until: str,
+        group_by: str = None,
+        model: str = None,
+        endpoint: str = None,
+        session_id: str = None
+    ) -> list:
+        """
+        Compteurs par tranche [since, until[, éventuellement par modèle,
+        endpoint ou session (`group_by`). Les filtres et regroupements par
+        session lisent les agrégats journaliers.
+        """
+        by_session = group_by == "session" or session_id is not None
+        if by_session:
+            table, clauses, params = "session_rollups", [], []
+            group_columns = {"model": "model", "session": "session_id"}
+        else:
+            table, clauses, params = "prediction_rollups", ["granularity = ?"], [granularity]
+            group_columns = {"model": "model", "endpoint": "endpoint"}
+
+        clauses += ["bucket >= ?", "bucket < ?"]
+        params += [since, until]
+        for column, value in (("model", model), ("endpoint", endpoint), ("session_id", session_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        group = group_columns[group_by] if group_by else "NULL"
+        sums = ", ".join(f"SUM({c}) AS {c}" for c in ROLLUP_COUNTERS)
+        rows = self._connection().execute(
+            f"SELECT bucket, {group} AS grp, {sums} FROM {table} "
+            f"WHERE {' AND '.join(clauses)} GROUP BY bucket, grp ORDER BY bucket, grp",
+            params
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def query(
+        self,
+        model: str = None,
+        since: str = None,
+        session_id: str = None,
+        limit: int = 50,
+        cursor: int = None
+    ) -> dict:
+        """Page d'événements, du plus récent au plus ancien."""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        clauses, params = [], []
+
+        if model is not None:
+            clauses.append("model = ?")
+            params.append(model)
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if cursor is not None:
+            clauses.append("id < ?")
+            params.append(cursor)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT id, {', '.join(COLUMNS)} FROM predictions {where} "
+            "ORDER BY id DESC LIMIT ?",
+            (*params, limit + 1)
+        ).fetchall()
+
+        items = [dict(row) for row in rows[:limit]]
+        next_cursor = items[-1]["id"] if len(rows) > limit else None
+
+        return {"items": items, "next_cursor": next_cursor}
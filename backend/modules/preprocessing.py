@@ -12,8 +12,9 @@ def make_preprocessor(X: pd.DataFrame) -> ColumnTransformer:
     - standardisation des variables numériques
     - encodage one-hot des variables catégorielles
     """
-    cat_features = X.select_dtypes(include="object").columns.tolist()
-    num_features = X.select_dtypes(exclude="object").columns.tolist()
+    cat_dtypes = ["object", "string", "category"]
+    cat_features = X.select_dtypes(include=cat_dtypes).columns.tolist()
+    num_features = X.select_dtypes(exclude=cat_dtypes).columns.tolist()
 
     return ColumnTransformer(
         transformers=[
@@ -0,0 +1,465 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from loguru import logger
+
+from modules.model_registry import (
+    MODEL_FILES,
+    ModelRegistry,
+    atomic_write_json,
+    file_lock,
+)
+
+TERMINAL_STATUSES = {"succeeded", "failed", "cancelled"}
+
+
+class JobCancelled(Exception):
+    """Annulation demandée pendant l'exécution du job."""
+
+
+# -------------------------------------------------------------------
+# Exécution dans le process worker
+# -------------------------------------------------------------------
+
+def _write_progress(staging_dir: Path, **progress):
+    tmp = staging_dir / "progress.json.tmp"
+    tmp.write_text(json.dumps(progress))
+    os.replace(tmp, staging_dir / "progress.json")
+
+
+def _check_cancelled(staging_dir: Path):
+    if (staging_dir / "cancel").exists():
+        raise JobCancelled()
+
+
+def run_retrain_job(
+    df,
+    staging_dir: str,
+    n_jobs: int = 1,
+    mode: str = "full",
+    base_model_paths: dict = None,
+    tune: bool = False,
+    tune_budget: float = 60.0,
+    tune_extra_estimators: bool = False,
+    cache=None
+) -> dict:
+    """
+    Point d'entrée exécuté dans le pool de process :
+    ré-entraînement des deux scénarios sur les données déjà typées,
+    écriture des modèles dans un répertoire de staging (jamais dans MODELS_DIR).
+
+    mode="incremental" : mise à jour des modèles actifs (base_model_paths)
+    avec le nouveau lot, sans rejouer l'historique.
+    tune=True (mode full) : recherche d'hyperparamètres limitée à
+    tune_budget secondes par scénario, étendue à Ridge / SGD avec
+    tune_extra_estimators=True.
+    cache (mode full) : cache des entraînements (TrainingCache).
+    """
+    import joblib
+    from modules.retraining import retrain_models, retrain_models_incremental
+
+    staging_dir = Path(staging_dir)
+    _check_cancelled(staging_dir)
+
+    def on_progress(step, completed):
+        _check_cancelled(staging_dir)
+        _write_progress(staging_dir, step=step, completed=completed, total=2)
+
+    if mode == "incremental":
+        base_models = {
+            name: joblib.load(path) for name, path in (base_model_paths or {}).items()
+        }
+        result = retrain_models_incremental(
+            df,
+            output_dir=staging_dir,
+            base_models=base_models,
+            on_progress=on_progress
+        )
+    else:
+        result = retrain_models(
+            df,
+            output_dir=staging_dir,
+            n_jobs=n_jobs,
+            on_progress=on_progress,
+            tune=tune,
+            tune_budget=tune_budget,
+            tune_extra_estimators=tune_extra_estimators,
+            cache=cache
+        )
+
+    _write_progress(staging_dir, step="terminé", completed=2, total=2)
+    return result
+
+
+# -------------------------------------------------------------------
+# Gestionnaire de jobs (process API)
+# -------------------------------------------------------------------
+
+class RetrainJobManager:
+    """
+    File de jobs de ré-entraînement exécutés dans un pool de process :
+    - soumission non bloquante (identifiant de job immédiat)
+    - fusion des soumissions identiques en cours (même contenu)
+    - annulation (avant ou pendant l'exécution)
+    - un seul job à la fois publie les modèles dans le registre
+
+    L'état public de chaque job est aussi écrit dans jobs/<job_id>.json :
+    avec plusieurs workers, n'importe lequel peut répondre au suivi, à
+    l'annulation et à la fusion des soumissions (jobs/digests/).
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        max_workers: int = 1,
+        n_jobs: int = 1,
+        max_history: int = 100,
+        on_models_updated=None,
+        training_cache=None
+    ):
+        self.registry = registry
+        self.jobs_dir = registry.models_dir / "jobs"
+        self.digests_dir = self.jobs_dir / "digests"
+        self.digests_dir.mkdir(parents=True, exist_ok=True)
+
+        self.max_workers = max_workers
+        self.n_jobs = n_jobs
+        self.max_history = max_history
+        self.on_models_updated = on_models_updated
+        self.training_cache = training_cache
+
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._lock = threading.RLock()
+        # Un seul job à la fois publie de nouvelles versions (threads du
+        # process, puis tous les workers via jobs/promote.lock)
+        self._write_lock = threading.Lock()
+
+    def after_fork(self):
+        """Dans un worker issu d'un fork : pool et verrous propres au process."""
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # Pool démarré à la première soumission ("spawn" : pas de fork
+        # d'un process API multi-threadé)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    def submit(
+        self,
+        df,
+        digest: str,
+        filename: str,
+        mode: str = "full",
+        tune: bool = False,
+        tune_budget: float = 60.0,
+        tune_extra_estimators: bool = False
+    ) -> tuple:
+        """
+        Soumet les données typées `df` ; `digest` (hash du fichier source)
+        sert à fusionner les soumissions identiques. Retourne (job, coalesced).
+        """
+        options = "default"
+        if tune:
+            options = f"tune={tune_budget:g}" + (",extra" if tune_extra_estimators else "")
+        digest = f"{mode}:{options}:{digest}"
+
+        with self._lock, file_lock(self.jobs_dir / "jobs.lock"):
+            active = self._active_for_digest(digest)
+            if active is not None:
+                return active, True
+
+            job_id = uuid.uuid4().hex
+            staging_dir = self.jobs_dir / job_id
+            staging_dir.mkdir()
+
+            job = {
+                "job_id": job_id,
+                "filename": filename,
+                "mode": mode,
+                "tune": tune,
+                "digest": digest,
+                "status": "queued",
+                "submitted_at": datetime.utcnow().isoformat(),
+                "finished_at": None,
+                "result": None,
+                "error": None,
+                "staging_dir": staging_dir,
+                "future": None,
+            }
+            self._jobs[job_id] = job
+            self._digest_marker(digest).write_text(job_id)
+            self._save_state(job)
+            self._trim_history()
+
+            base_model_paths = {}
+            if mode == "incremental":
+                for name in MODEL_FILES:
+                    version = self.registry.active_version(name)
+                    if version is not None:
+                        base_model_paths[name] = str(self.registry.model_path(name, version))
+
+            job["future"] = self.executor.submit(
+                run_retrain_job,
+                df,
+                str(staging_dir),
+                self.n_jobs,
+                mode,
+                base_model_paths,
+                tune,
+                tune_budget,
+                tune_extra_estimators,
+                self.training_cache
+            )
+
+        job["future"].add_done_callback(lambda future: self._on_done(job_id))
+        logger.info("Job de ré-entraînement {} soumis ({})", job_id, filename)
+
+        return self._public(job), False
+
+    def non_incremental_models(self) -> list:
+        """
+        Modèles actifs qui ne se mettent pas à jour lot par lot (modèle
+        livré, ré-entraînement full) : en mode incremental, ils seraient
+        remplacés par un modèle initialisé sur les seules données envoyées.
+        """
+        import joblib
+        from modules.retraining import is_incremental
+
+        names = []
+        for name in MODEL_FILES:
+            version = self.registry.active_version(name)
+            if version is None:
+                continue
+            if not is_incremental(joblib.load(self.registry.model_path(name, version))):
+                names.append(name)
+        return names
+
+    def get(self, job_id: str):
+        job = self._jobs.get(job_id)
+        if job is None:
+            # Job soumis à un autre worker
+            return self._load_state(job_id)
+        return self._public(job)
+
+    def cancel(self, job_id: str):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return self._cancel_remote(job_id)
+
+        with self._lock:
+            if job["status"] in TERMINAL_STATUSES:
+                return self._public(job)
+
+            if not job["future"].cancel():
+                # Job déjà pris par un worker : arrêt au prochain point de
+                # contrôle, modèles non publiés (sinon _on_done finalise)
+                (job["staging_dir"] / "cancel").touch()
+                job["status"] = "cancelling"
+                self._save_state(job)
+
+        return self._public(job)
+
+    def _cancel_remote(self, job_id: str):
+        """Annulation d'un job exécuté par un autre worker (fichier "cancel")."""
+        state = self._load_state(job_id)
+        if state is None or state["status"] in TERMINAL_STATUSES:
+            return state
+        staging_dir = self.jobs_dir / job_id
+        if staging_dir.exists():
+            (staging_dir / "cancel").touch()
+        return self._load_state(job_id)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Interne
+    # ------------------------------------------------------------------
+
+    def _state_path(self, job_id: str) -> Path:
+        return self.jobs_dir / f"{job_id}.json"
+
+    def _digest_marker(self, digest: str) -> Path:
+        return self.digests_dir / hashlib.sha256(digest.encode()).hexdigest()
+
+    def _save_state(self, job: dict):
+        atomic_write_json(self._state_path(job["job_id"]), self._public(job))
+
+    def _load_state(self, job_id: str):
+        if len(job_id) != 32 or not job_id.isalnum():
+            return None
+        try:
+            state = json.loads(self._state_path(job_id).read_text())
+        except (OSError, ValueError):
+            return None
+        staging_dir = self.jobs_dir / job_id
+        if state["status"] not in TERMINAL_STATUSES:
+            state["progress"] = self._progress(staging_dir)
+            if (staging_dir / "cancel").exists():
+                state["status"] = "cancelling"
+            elif state["status"] == "queued" and state["progress"] is not None:
+                state["status"] = "running"
+        return state
+
+    def _active_for_digest(self, digest: str):
+        """Job en cours (de n'importe quel worker) pour ce contenu, sinon None."""
+        marker = self._digest_marker(digest)
+        try:
+            job_id = marker.read_text()
+        except OSError:
+            return None
+        state = self.get(job_id)
+        if state is None or state["status"] in TERMINAL_STATUSES:
+            marker.unlink(missing_ok=True)
+            return None
+        return state
+
+    @staticmethod
+    def _progress(staging_dir: Path):
+        progress_file = staging_dir / "progress.json"
+        if not progress_file.exists():
+            return None
+        try:
+            return json.loads(progress_file.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _public(self, job: dict) -> dict:
+        status = job["status"]
+        if status == "queued" and job["future"] is not None and job["future"].running():
+            status = "running"
+
+        progress = None
+        if status not in TERMINAL_STATUSES:
+            progress = self._progress(job["staging_dir"])
+            if (job["staging_dir"] / "cancel").exists():
+                status = "cancelling"
+
+        return {
+            "job_id": job["job_id"],
+            "filename": job["filename"],
+            "mode": job["mode"],
+            "tune": job["tune"],
+            "status": status,
+            "submitted_at": job["submitted_at"],
+            "finished_at": job["finished_at"],
+            "progress": progress,
+            "result": job["result"],
+            "error": job["error"],
+        }
+
+    def _finish(self, job: dict, status: str, result=None, error=None):
+        job["status"] = status
+        job["result"] = result
+        job["error"] = error
+        job["finished_at"] = datetime.utcnow().isoformat()
+        shutil.rmtree(job["staging_dir"], ignore_errors=True)
+        self._save_state(job)
+
+        marker = self._digest_marker(job["digest"])
+        try:
+            if marker.read_text() == job["job_id"]:
+                marker.unlink()
+        except OSError:
+            pass
+
+    def _on_done(self, job_id: str):
+        job = self._jobs[job_id]
+        future = job["future"]
+
+        if future.cancelled():
+            with self._lock:
+                if job["status"] not in TERMINAL_STATUSES:
+                    self._finish(job, "cancelled")
+            return
+
+        error = future.exception()
+        cancel_requested = (job["staging_dir"] / "cancel").exists()
+
+        if isinstance(error, JobCancelled) or (error is None and cancel_requested):
+            with self._lock:
+                self._finish(job, "cancelled")
+            logger.info("Job de ré-entraînement {} annulé", job_id)
+            return
+
+        if error is not None:
+            with self._lock:
+                self._finish(job, "failed", error=str(error))
+            logger.error("Job de ré-entraînement {} en échec : {}", job_id, error)
+            return
+
+        result = future.result()
+        updated = self._promote(job, result)
+
+        # Modèles rechargés avant de publier le statut : "succeeded"
+        # signifie que les nouvelles versions sont servies par ce worker
+        if self.on_models_updated is not None and updated:
+            try:
+                self.on_models_updated(updated)
+            except Exception as e:
+                logger.error("Rechargement des modèles après le job {} : {}", job_id, e)
+
+        with self._lock:
+            self._finish(job, "succeeded", result=result)
+        logger.info("Job de ré-entraînement {} terminé ({})", job_id, updated)
+
+    def _promote(self, job: dict, result: dict) -> list:
+        """Enregistrement et activation des modèles produits (un job à la fois)."""
+        updated = []
+        with self._write_lock, file_lock(self.jobs_dir / "promote.lock"):
+            for name, filename in MODEL_FILES.items():
+                staged = job["staging_dir"] / filename
+                if not staged.exists():
+                    continue
+                metrics = result["results"][name]
+                # Profil de référence : métadonnées de la version, pas résultat
+                # du job. Une mise à jour incrémentale garde celui de la
+                # version active.
+                profile = metrics.pop("reference_profile", None)
+                active = self.registry.active_version(name)
+                if profile is None and active is not None:
+                    profile = self.registry.metadata(name, active).get("reference_profile")
+                meta = self.registry.save(
+                    name,
+                    staged,
+                    source="retrain",
+                    job_id=job["job_id"],
+                    training_file=job["filename"],
+                    metrics={k: v for k, v in metrics.items() if k != "model_path"},
+                    reference_profile=profile
+                )
+                self.registry.promote(name, meta["version"])
+                metrics["model_version"] = meta["version"]
+                updated.append(name)
+        return updated
+
+    def _trim_history(self):
+        while len(self._jobs) > self.max_history:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest["status"] not in TERMINAL_STATUSES:
+                break
+            self._jobs.pop(oldest_id)
+            self._state_path(oldest_id).unlink(missing_ok=True)
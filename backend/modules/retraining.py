@@ -1,21 +1,53 @@
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import time
 import joblib
-import mlflow
-import mlflow.sklearn
 
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import cross_validate
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import f1_score, recall_score
+from sklearn.model_selection import StratifiedKFold, cross_validate
 from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
-from modules.data_preparation import prepare_dataset
+from modules.data_preparation import (
+    CATEGORICAL_FEATURES,
+    CATEGORY_VALUES,
+    FEATURES_WITH_G2,
+    FEATURES_WITHOUT_G2,
+    prepare_dataset,
+    prepare_training_frame,
+)
+from modules.feature_store import StoreSelection
+from modules.ingestion import iter_training_chunks
+from modules.model_registry import MODEL_FILES
+from modules.drift import build_profile
 from modules.preprocessing import make_preprocessor
+from modules.tracking import get_tracker
+
+
+def load_training_data(df, columns: list):
+    """
+    Données d'entraînement : DataFrame tel quel, ou lecture d'une sélection
+    du feature store (StoreSelection) limitée aux colonnes utiles.
+    """
+    if isinstance(df, StoreSelection):
+        return df.load(columns=columns)
+    return df
 
 
 def retrain_model(
     df,
     include_g2: bool,
     model_output_path: Path,
-    run_name: str
+    run_name: str,
+    cv_splits: list = None,
+    n_jobs: int = None,
+    tune: bool = False,
+    tune_budget: float = 60.0,
+    tune_extra_estimators: bool = False,
+    cache=None
 ) -> dict:
     """
     Ré-entraîne un modèle de régression logistique pour un scénario donné
@@ -23,39 +55,112 @@ def retrain_model(
 
     Le modèle est entraîné from scratch afin de garantir cohérence,
     reproductibilité et alignement avec le notebook.
+
+    `cv_splits` permet de réutiliser les mêmes plis entre scénarios et
+    `n_jobs` de répartir les plis de validation croisée sur plusieurs cœurs.
+
+    `tune=True` ajoute une recherche d'hyperparamètres (halving successif,
+    `tune_budget` secondes au plus, cf. modules/tuning.py) ; la meilleure
+    configuration est ensuite évaluée et ré-entraînée sur les mêmes plis.
+
+    `cache` (TrainingCache, modules/training_cache.py) : un entraînement
+    identique (mêmes données normalisées, features, configuration et
+    versions des bibliothèques) renvoie les métriques mises en cache et
+    recopie le modèle déjà entraîné, sans validation croisée ni MLflow.
+
+    `df` peut aussi être une sélection du feature store (snapshot, cohortes,
+    dates d'ingestion) : seules les colonnes du scénario sont lues.
     """
+    timings = {}
+    start = time.perf_counter()
 
     # ------------------------------------------------------------------
     # Préparation des données (logique métier centralisée)
     # ------------------------------------------------------------------
+    features = FEATURES_WITH_G2 if include_g2 else FEATURES_WITHOUT_G2
+    df = load_training_data(df, features + ["target"])
     X, y = prepare_dataset(df, include_g2=include_g2)
+    timings["prepare"] = time.perf_counter() - start
 
     if len(X) < 5:
         raise ValueError(
             "Nombre d'observations insuffisant pour effectuer un ré-entrainement."
         )
 
+    # Validation croisée (adaptative si petit dataset)
+    cv = cv_splits if cv_splits is not None else min(5, len(X))
+    n_folds = len(cv_splits) if cv_splits is not None else cv
+
+    # ------------------------------------------------------------------
+    # Cache des entraînements (adressé par contenu)
+    # ------------------------------------------------------------------
+    cache_key = None
+    if cache is not None:
+        step = time.perf_counter()
+        cache_key = cache.key(X, y, {
+            "include_g2": include_g2,
+            "pipeline": joblib.hash(Pipeline(steps=[
+                ("preprocessor", make_preprocessor(X)),
+                ("classifier", LogisticRegression(max_iter=1000))
+            ])),
+            "cv": joblib.hash(cv_splits) if cv_splits is not None else n_folds,
+            "tuning": {
+                "budget": tune_budget,
+                "extra_estimators": tune_extra_estimators,
+            } if tune else None,
+        })
+        cached = cache.get(cache_key, model_output_path)
+        timings["cache_lookup"] = time.perf_counter() - step
+
+        if cached is not None:
+            timings["total"] = time.perf_counter() - start
+            return {
+                **cached,
+                "model_path": model_output_path.name,
+                "cache_hit": True,
+                "timings": {phase: round(seconds, 4) for phase, seconds in timings.items()},
+            }
+
+    # ------------------------------------------------------------------
+    # Recherche d'hyperparamètres (optionnelle)
+    # ------------------------------------------------------------------
+    search = None
+    classifier = LogisticRegression(max_iter=1000)
+    if tune:
+        from modules.tuning import make_estimator, search_space, successive_halving
+
+        if cv_splits is None:
+            cv_splits = cv = list(StratifiedKFold(n_splits=n_folds).split(X, y))
+
+        step = time.perf_counter()
+        search = successive_halving(
+            X,
+            y,
+            preprocessor=make_preprocessor(X),
+            cv_splits=cv_splits,
+            candidates=search_space(extra_estimators=tune_extra_estimators),
+            time_budget=tune_budget,
+            n_jobs=n_jobs or 1
+        )
+        classifier = make_estimator(search["best_params"])
+        timings["search"] = time.perf_counter() - step
+
     # ------------------------------------------------------------------
     # Pipeline (préprocessing + modèle)
     # ------------------------------------------------------------------
     pipeline = Pipeline(
         steps=[
             ("preprocessor", make_preprocessor(X)),
-            ("classifier", LogisticRegression(max_iter=1000))
+            ("classifier", classifier)
         ]
     )
 
-    # Validation croisée (adaptative si petit dataset)
-    cv = min(5, len(X))
-
     # ------------------------------------------------------------------
-    # Entraînement + monitoring MLflow
+    # Entraînement + monitoring MLflow (écrit en fin de run, cf. tracking.py)
     # ------------------------------------------------------------------
-    mlflow.set_tracking_uri("file:///app/mlruns")
-    mlflow.set_experiment("student-success")
-
-    with mlflow.start_run(run_name=run_name):
+    with get_tracker().start_run(run_name) as run:
 
+        step = time.perf_counter()
         scores = cross_validate(
             pipeline,
             X,
@@ -65,51 +170,423 @@ def retrain_model(
                 "f1": "f1",
                 "recall": "recall"
             },
-            return_train_score=False
+            return_train_score=False,
+            n_jobs=n_jobs
         )
+        timings["cross_validation"] = time.perf_counter() - step
 
         # -------------------------
         # Logging paramètres
         # -------------------------
-        mlflow.log_param("model_type", "LogisticRegression")
-        mlflow.log_param("include_g2", include_g2)
-        mlflow.log_param("cv_folds", cv)
-        mlflow.log_param("n_samples", len(X))
-        mlflow.log_param("n_features", X.shape[1])
+        run.log_params({
+            "model_type": type(classifier).__name__,
+            "include_g2": include_g2,
+            "cv_folds": n_folds,
+            "n_samples": len(X),
+            "n_features": X.shape[1],
+            "tuning": tune,
+        })
+
+        if search is not None:
+            run.log_params({
+                f"best_{name}": value for name, value in search["best_params"].items()
+            })
+            run.log_param("search_budget_s", tune_budget)
+            run.log_metrics({
+                "search_time_s": search["search_time"],
+                "search_candidates": search["n_candidates"],
+                "search_fits": search["n_fits"],
+                "search_rounds": len(search["rounds"]),
+            })
+            if search["best_score"] is not None:
+                run.log_metric("search_best_f1", search["best_score"])
 
         # -------------------------
         # Logging métriques
         # -------------------------
-        mlflow.log_metric("f1_mean", scores["test_f1"].mean())
-        mlflow.log_metric("f1_std", scores["test_f1"].std())
-        mlflow.log_metric("recall_mean", scores["test_recall"].mean())
-        mlflow.log_metric("recall_std", scores["test_recall"].std())
+        run.log_metrics({
+            "f1_mean": scores["test_f1"].mean(),
+            "f1_std": scores["test_f1"].std(),
+            "recall_mean": scores["test_recall"].mean(),
+            "recall_std": scores["test_recall"].std(),
+        })
 
         # -------------------------
         # Entraînement final
         # -------------------------
+        step = time.perf_counter()
         pipeline.fit(X, y)
+        timings["fit"] = time.perf_counter() - step
 
         # Sauvegarde du modèle
+        step = time.perf_counter()
         joblib.dump(pipeline, model_output_path)
+        timings["save"] = time.perf_counter() - step
 
-        # Enregistrement du modèle dans MLflow
-        mlflow.sklearn.log_model(
-            pipeline,
-            name="model"
-        )
+        # Enregistrement du modèle dans MLflow (en arrière-plan)
+        run.log_model(pipeline)
+
+    timings["tracking"] = run.duration
+    timings["total"] = time.perf_counter() - start
 
     # ------------------------------------------------------------------
     # Résumé retourné à l'API
     # ------------------------------------------------------------------
-    return {
+    result = {
         "scenario": "with_g2" if include_g2 else "without_g2",
         "n_samples": len(X),
         "n_features": X.shape[1],
-        "cv_folds": cv,
+        "cv_folds": n_folds,
         "f1_mean": float(scores["test_f1"].mean()),
         "f1_std": float(scores["test_f1"].std()),
         "recall_mean": float(scores["test_recall"].mean()),
         "recall_std": float(scores["test_recall"].std()),
         "model_path": model_output_path.name,
+        "model_type": type(classifier).__name__,
+        "tuning": None if search is None else {
+            "best_params": search["best_params"],
+            "best_score": search["best_score"],
+            "n_candidates": search["n_candidates"],
+            "n_fits": search["n_fits"],
+            "rounds": search["rounds"],
+            "budget_exhausted": search["budget_exhausted"],
+            "search_time": round(search["search_time"], 4),
+        },
+        "cache_hit": False,
+        "timings": {phase: round(seconds, 4) for phase, seconds in timings.items()},
+        # Distribution des features d'entraînement (suivi de dérive, cf. drift.py)
+        "reference_profile": build_profile(X),
+    }
+
+    if cache is not None:
+        cache.put(cache_key, model_output_path, result)
+
+    return result
+
+
+def retrain_models(
+    df,
+    output_dir: Path,
+    n_jobs: int = 1,
+    on_progress=None,
+    tune: bool = False,
+    tune_budget: float = 60.0,
+    tune_extra_estimators: bool = False,
+    cache=None
+) -> dict:
+    """
+    Ré-entraîne les deux scénarios à partir d'un même jeu de données :
+    - typage et plis de validation croisée calculés une seule fois
+    - n_jobs > 1 : scénarios entraînés en parallèle et plis de validation
+      croisée répartis sur les cœurs disponibles
+    - durée de chaque phase dans la réponse
+
+    `on_progress(step, completed)` est appelé avant / après chaque scénario
+    (une exception levée par le callback interrompt le ré-entraînement).
+
+    `cache` : cache des entraînements partagé par les scénarios (chaque
+    résultat indique `cache_hit`).
+
+    `df` : DataFrame ou sélection du feature store (StoreSelection).
+    """
+    output_dir = Path(output_dir)
+    start = time.perf_counter()
+    notify = on_progress or (lambda step, completed: None)
+
+    # Données typées et plis partagés entre scénarios
+    data = prepare_training_frame(load_training_data(df, FEATURES_WITH_G2 + ["target"]))
+    n_folds = min(5, len(data))
+    cv_splits = None
+    if len(data) >= 5:
+        cv_splits = list(
+            StratifiedKFold(n_splits=n_folds).split(data, data["target"])
+        )
+    prepare_time = time.perf_counter() - start
+
+    scenarios = [("without_g2", False)]
+    if "G2" in data.columns:
+        scenarios.append(("with_g2", True))
+
+    def train(name, include_g2):
+        notify(name, 0)
+        return name, retrain_model(
+            df=data,
+            include_g2=include_g2,
+            model_output_path=output_dir / MODEL_FILES[name],
+            run_name=f"retrain_{name}",
+            cv_splits=cv_splits,
+            n_jobs=n_jobs if n_jobs > 1 else None,
+            tune=tune,
+            tune_budget=tune_budget,
+            tune_extra_estimators=tune_extra_estimators,
+            cache=cache
+        )
+
+    results = {}
+    if n_jobs > 1:
+        with ThreadPoolExecutor(max_workers=len(scenarios)) as executor:
+            futures = [executor.submit(train, *scenario) for scenario in scenarios]
+            for future in futures:
+                name, result = future.result()
+                results[name] = result
+                notify(name, len(results))
+    else:
+        for scenario in scenarios:
+            name, result = train(*scenario)
+            results[name] = result
+            notify(name, len(results))
+
+    if "with_g2" not in results:
+        results["with_g2"] = {
+            "status": "skipped",
+            "reason": "Colonne G2 absente des données d'entraînement"
+        }
+
+    return {
+        "status": "success",
+        "models_trained": list(results.keys()),
+        "results": results,
+        "mode": "parallel" if n_jobs > 1 else "sequential",
+        "n_jobs": n_jobs,
+        "timings": {
+            "prepare_shared": round(prepare_time, 4),
+            "total": round(time.perf_counter() - start, 4),
+        },
     }
+
+
+
+# -------------------------------------------------------------------
+# Apprentissage incrémental / out-of-core
+# -------------------------------------------------------------------
+
+def make_incremental_pipeline(X) -> Pipeline:
+    """
+    Pipeline compatible partial_fit : modalités catégorielles fixées
+    à l'avance, standardisation et modèle mis à jour lot par lot.
+    """
+    cat_features = [c for c in X.columns if c in CATEGORICAL_FEATURES]
+    num_features = [c for c in X.columns if c not in CATEGORICAL_FEATURES]
+
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("num", StandardScaler(), num_features),
+            (
+                "cat",
+                OneHotEncoder(
+                    categories=[CATEGORY_VALUES[c] for c in cat_features],
+                    handle_unknown="ignore"
+                ),
+                cat_features
+            ),
+        ]
+    )
+    return Pipeline(
+        steps=[
+            ("preprocessor", preprocessor),
+            ("classifier", SGDClassifier(loss="log_loss", random_state=0))
+        ]
+    )
+
+
+def is_incremental(pipeline) -> bool:
+    return (
+        isinstance(pipeline, Pipeline)
+        and hasattr(pipeline.steps[-1][1], "partial_fit")
+        and isinstance(pipeline.steps[0][1], ColumnTransformer)
+        and hasattr(pipeline.steps[0][1], "transformers_")
+    )
+
+
+def partial_fit_pipeline(pipeline, X, y) -> Pipeline:
+    """Met à jour le pipeline avec un lot étiqueté, sans rejouer l'historique."""
+    if pipeline is None:
+        pipeline = make_incremental_pipeline(X)
+
+    preprocessor = pipeline.steps[0][1]
+    if not hasattr(preprocessor, "transformers_"):
+        preprocessor.fit(X)
+    else:
+        # Moyennes / écarts-types mis à jour en flux
+        num_features = {name: cols for name, _, cols in preprocessor.transformers_}["num"]
+        preprocessor.named_transformers_["num"].partial_fit(X[num_features])
+
+    pipeline.steps[-1][1].partial_fit(
+        preprocessor.transform(X), y, classes=np.array([0, 1])
+    )
+    return pipeline
+
+
+def train_incremental(batches, include_g2: bool, pipeline=None) -> tuple:
+    """
+    Entraînement lot par lot (test-then-train) : chaque lot est d'abord
+    prédit par le modèle courant, puis sert à le mettre à jour.
+    Retourne (pipeline, métriques prequential).
+    """
+    scores = {"f1": [], "recall": []}
+    y_true, y_pred = [], []
+    n_samples = n_batches = 0
+
+    for batch in batches:
+        X, y = prepare_dataset(batch, include_g2=include_g2)
+        if len(X) == 0:
+            continue
+
+        if pipeline is not None and hasattr(pipeline.steps[0][1], "transformers_"):
+            predicted = pipeline.predict(X)
+            scores["f1"].append(f1_score(y, predicted, zero_division=0))
+            scores["recall"].append(recall_score(y, predicted, zero_division=0))
+            y_true.append(np.asarray(y))
+            y_pred.append(predicted)
+
+        pipeline = partial_fit_pipeline(pipeline, X, y)
+        n_samples += len(X)
+        n_batches += 1
+
+    if pipeline is None:
+        raise ValueError("Aucune donnée d'entraînement")
+
+    evaluated = len(y_true) > 0
+    y_true = np.concatenate(y_true) if evaluated else np.array([])
+    y_pred = np.concatenate(y_pred) if evaluated else np.array([])
+
+    return pipeline, {
+        "n_samples": n_samples,
+        "n_batches": n_batches,
+        "n_evaluated": int(len(y_true)),
+        "prequential_f1": float(f1_score(y_true, y_pred, zero_division=0)) if evaluated else None,
+        "prequential_recall": float(recall_score(y_true, y_pred, zero_division=0)) if evaluated else None,
+        "f1_std": float(np.std(scores["f1"])) if scores["f1"] else None,
+        "recall_std": float(np.std(scores["recall"])) if scores["recall"] else None,
+    }
+
+
+def iter_frame_batches(df, batch_size: int):
+    for start in range(0, len(df), batch_size):
+        yield df.iloc[start:start + batch_size]
+
+
+def retrain_incremental(
+    batches,
+    include_g2: bool,
+    model_output_path: Path,
+    run_name: str,
+    base_model=None
+) -> dict:
+    """
+    Mise à jour incrémentale d'un modèle (ou initialisation si `base_model`
+    n'est pas incrémental), avec monitoring MLflow. Les métriques
+    prequential sont loggées à côté des métriques de validation croisée
+    du ré-entraînement complet (même expérience MLflow).
+    """
+    start = time.perf_counter()
+    initialized = not is_incremental(base_model)
+
+    with get_tracker().start_run(run_name) as run:
+        pipeline, metrics = train_incremental(
+            batches,
+            include_g2=include_g2,
+            pipeline=None if initialized else base_model
+        )
+
+        run.log_params({
+            "model_type": "SGDClassifier",
+            "training_mode": "incremental",
+            "include_g2": include_g2,
+            "initialized": initialized,
+            "n_samples": metrics["n_samples"],
+            "n_batches": metrics["n_batches"],
+        })
+
+        for name in ("prequential_f1", "prequential_recall", "f1_std", "recall_std"):
+            if metrics[name] is not None:
+                run.log_metric(name, metrics[name])
+
+        joblib.dump(pipeline, model_output_path)
+        run.log_model(pipeline)
+
+    return {
+        "scenario": "with_g2" if include_g2 else "without_g2",
+        "training_mode": "incremental",
+        "initialized": initialized,
+        "n_samples": metrics["n_samples"],
+        "n_batches": metrics["n_batches"],
+        "n_evaluated": metrics["n_evaluated"],
+        "f1_mean": metrics["prequential_f1"],
+        "f1_std": metrics["f1_std"],
+        "recall_mean": metrics["prequential_recall"],
+        "recall_std": metrics["recall_std"],
+        "model_path": model_output_path.name,
+        "timings": {
+            "tracking": round(run.duration, 4),
+            "total": round(time.perf_counter() - start, 4),
+        },
+    }
+
+
+def retrain_models_incremental(
+    df,
+    output_dir: Path,
+    base_models: dict,
+    batch_size: int = 256,
+    on_progress=None
+) -> dict:
+    """
+    Mise à jour incrémentale des deux scénarios avec un nouveau lot
+    étiqueté (les modèles actifs servent de point de départ) : DataFrame
+    ou sélection du feature store.
+    """
+    output_dir = Path(output_dir)
+    notify = on_progress or (lambda step, completed: None)
+    data = prepare_training_frame(load_training_data(df, FEATURES_WITH_G2 + ["target"]))
+
+    results = {}
+    for name, include_g2 in (("without_g2", False), ("with_g2", True)):
+        if include_g2 and "G2" not in data.columns:
+            results[name] = {
+                "status": "skipped",
+                "reason": "Colonne G2 absente des données d'entraînement"
+            }
+            continue
+
+        notify(name, len(results))
+        results[name] = retrain_incremental(
+            iter_frame_batches(data, batch_size),
+            include_g2=include_g2,
+            model_output_path=output_dir / MODEL_FILES[name],
+            run_name=f"incremental_{name}",
+            base_model=base_models.get(name)
+        )
+        notify(name, len(results))
+
+    return {
+        "status": "success",
+        "mode": "incremental",
+        "models_trained": list(results.keys()),
+        "results": results,
+    }
+
+
+def retrain_incremental_from_csv(
+    csv_path: Path,
+    include_g2: bool,
+    model_output_path: Path,
+    run_name: str,
+    base_model=None,
+    chunksize: int = 10_000
+) -> dict:
+    """
+    Entraînement out-of-core sur un CSV plus grand que la mémoire :
+    seul un bloc de `chunksize` lignes est chargé à la fois.
+
+    Utilisable depuis un script ou un notebook : /retrain lit l'upload en
+    mémoire et passe par retrain_models_incremental.
+    """
+    with open(csv_path, "rb") as stream:
+        return retrain_incremental(
+            iter_training_chunks(stream, chunksize=chunksize),
+            include_g2=include_g2,
+            model_output_path=model_output_path,
+            run_name=run_name,
+            base_model=base_model
+        )
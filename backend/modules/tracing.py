@@ -0,0 +1,232 @@
+import random
+import re
+import time
+from contextvars import ContextVar
+
+# Trace de la requête en cours (None : instrumentation désactivée)
+_current = ContextVar("request_trace", default=None)
+
+# En-tête W3C Trace Context : version-trace_id-parent_id-flags
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# Codes OTLP
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+
+# -------------------------------------------------------------------
+# Étapes d'une requête
+# -------------------------------------------------------------------
+
+class RequestTrace:
+    """
+    Étapes mesurées pendant une requête : (nom, début, fin, parent) en
+    secondes perf_counter, le parent étant l'indice de l'étape englobante
+    (-1 : la requête elle-même).
+    """
+
+    __slots__ = ("start", "start_ns", "spans", "open", "sampled", "trace_id", "parent_id")
+
+    def __init__(self, sampled: bool = False, trace_id: str = None, parent_id: str = None):
+        self.start = time.perf_counter()
+        self.start_ns = time.time_ns()
+        self.spans = []
+        self.open = -1
+        self.sampled = sampled
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+
+    def durations(self) -> dict:
+        """Durée cumulée (secondes) de chaque étape, dans l'ordre d'apparition."""
+        totals = {}
+        for name, start, end, _ in self.spans:
+            if end is not None:
+                totals[name] = totals.get(name, 0.0) + end - start
+        return totals
+
+
+class _Span:
+    __slots__ = ("trace", "name", "index", "parent", "start")
+
+    def __init__(self, trace: RequestTrace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        trace = self.trace
+        self.parent = trace.open
+        self.index = trace.open = len(trace.spans)
+        self.start = time.perf_counter()
+        trace.spans.append((self.name, self.start, None, self.parent))
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.spans[self.index] = (self.name, self.start, time.perf_counter(), self.parent)
+        self.trace.open = self.parent
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str):
+    """
+    Mesure une étape de la requête en cours (bloc `with`). Sans trace
+    active, renvoie un contexte vide partagé : une lecture de ContextVar.
+    """
+    trace = _current.get()
+    if trace is None:
+        return _NO_SPAN
+    return _Span(trace, name)
+
+
+def mark_since_start(name: str):
+    """
+    Étape allant du début de la requête à maintenant : lecture du corps et
+    validation Pydantic, faites par FastAPI avant d'appeler la route.
+    """
+    trace = _current.get()
+    if trace is not None:
+        trace.spans.append((name, trace.start, time.perf_counter(), -1))
+
+
+# -------------------------------------------------------------------
+# Traceur (un par worker)
+# -------------------------------------------------------------------
+
+class Tracer:
+    """
+    Instrumentation des requêtes HTTP :
+    - `server_timing` : durée de chaque étape renvoyée dans l'en-tête
+      Server-Timing (DevTools du navigateur, curl -v)
+    - `sample_rate` : proportion de requêtes dont la trace complète est
+      écrite dans `writer` (échantillonnage décidé en tête de requête ;
+      une requête portant un en-tête `traceparent` suit la décision de
+      l'appelant). Une ligne par requête, au format OTLP/JSON
+      (ExportTraceServiceRequest), écrite hors du chemin de la requête.
+
+    Les deux désactivés : aucune trace n'est créée et chaque étape ne coûte
+    qu'une lecture de ContextVar.
+    """
+
+    def __init__(
+        self,
+        writer=None,
+        sample_rate: float = 0.0,
+        server_timing: bool = True,
+        service_name: str = "student-success-api"
+    ):
+        self.writer = writer
+        self.sample_rate = sample_rate if writer is not None else 0.0
+        self.server_timing = server_timing
+        self.service_name = service_name
+        self.exported = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.server_timing or self.sample_rate > 0
+
+    def start(self, headers) -> tuple:
+        """(trace, jeton ContextVar) pour une requête entrante."""
+        sampled, trace_id, parent_id = False, None, None
+        if self.sample_rate > 0:
+            match = TRACEPARENT.match(headers.get("traceparent", ""))
+            if match:
+                trace_id, parent_id = match.group(1), match.group(2)
+                sampled = bool(int(match.group(3), 16) & 1)
+            else:
+                sampled = random.random() < self.sample_rate
+            if sampled and trace_id is None:
+                trace_id = f"{random.getrandbits(128):032x}"
+
+        trace = RequestTrace(sampled, trace_id, parent_id)
+        return trace, _current.set(trace)
+
+    def finish(self, trace: RequestTrace, token, name: str, attributes: dict, status: int) -> str:
+        """
+        Clôt la trace : export si échantillonnée, valeur de l'en-tête
+        Server-Timing (None si désactivé).
+        """
+        _current.reset(token)
+        end = time.perf_counter()
+
+        if trace.sampled:
+            self.writer.write(self.export(trace, end, name, attributes, status))
+            self.exported += 1
+
+        if not self.server_timing:
+            return None
+        entries = [
+            f"{stage};dur={duration * 1000:.3f}"
+            for stage, duration in trace.durations().items()
+        ]
+        entries.append(f"total;dur={(end - trace.start) * 1000:.3f}")
+        return ", ".join(entries)
+
+    # ------------------------------------------------------------------
+    # Export OTLP/JSON
+    # ------------------------------------------------------------------
+
+    def export(self, trace: RequestTrace, end: float, name: str, attributes: dict, status: int) -> dict:
+        def unix_ns(instant: float) -> str:
+            return str(trace.start_ns + int((instant - trace.start) * 1e9))
+
+        root_id = f"{random.getrandbits(64):016x}"
+        ids = [f"{random.getrandbits(64):016x}" for _ in trace.spans]
+
+        root = {
+            "traceId": trace.trace_id,
+            "spanId": root_id,
+            "name": name,
+            "kind": SPAN_KIND_SERVER,
+            "startTimeUnixNano": unix_ns(trace.start),
+            "endTimeUnixNano": unix_ns(end),
+            "attributes": otlp_attributes(attributes),
+            "status": {"code": STATUS_ERROR if status >= 500 else STATUS_UNSET},
+        }
+        if trace.parent_id:
+            root["parentSpanId"] = trace.parent_id
+
+        spans = [root]
+        for span_id, (stage, start, stop, parent) in zip(ids, trace.spans):
+            spans.append({
+                "traceId": trace.trace_id,
+                "spanId": span_id,
+                "parentSpanId": ids[parent] if parent >= 0 else root_id,
+                "name": stage,
+                "kind": SPAN_KIND_INTERNAL,
+                "startTimeUnixNano": unix_ns(start),
+                "endTimeUnixNano": unix_ns(stop if stop is not None else end),
+            })
+
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{"scope": {"name": "backend"}, "spans": spans}],
+            }]
+        }
+
+
+def otlp_attributes(values: dict) -> list:
+    attributes = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        else:
+            typed = {"stringValue": str(value)}
+        attributes.append({"key": key, "value": typed})
+    return attributes
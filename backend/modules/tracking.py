@@ -0,0 +1,209 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+
+# mlflow (défaut) | memory (tests, benchmarks) | none
+TRACKING_BACKEND = os.getenv("TRACKING_BACKEND", "mlflow")
+TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI", "file:///app/mlruns")
+EXPERIMENT_NAME = os.getenv("MLFLOW_EXPERIMENT_NAME", "student-success")
+
+
+# -------------------------------------------------------------------
+# Run collecté en mémoire
+# -------------------------------------------------------------------
+
+class TrackedRun:
+    """
+    Paramètres, métriques et modèle d'un entraînement, collectés en mémoire
+    pendant le calcul puis transmis au backend en une fois par end().
+    """
+
+    def __init__(self, tracker, run_name: str):
+        self.tracker = tracker
+        self.run_name = run_name
+        self.params = {}
+        self.metrics = {}
+        self.model = None
+        # Durée des écritures synchrones (chemin critique du ré-entraînement)
+        self.duration = 0.0
+
+    def log_param(self, name: str, value):
+        self.params[name] = value
+
+    def log_params(self, params: dict):
+        self.params.update(params)
+
+    def log_metric(self, name: str, value):
+        self.metrics[name] = float(value)
+
+    def log_metrics(self, metrics: dict):
+        for name, value in metrics.items():
+            self.log_metric(name, value)
+
+    def log_model(self, model):
+        """Modèle enregistré comme artefact, en arrière-plan (non modifié ensuite)."""
+        self.model = model
+
+    def end(self):
+        start = time.perf_counter()
+        self.tracker.write(self)
+        self.duration += time.perf_counter() - start
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.end()
+
+
+# -------------------------------------------------------------------
+# Backends
+# -------------------------------------------------------------------
+
+class NullTracker:
+    """Aucun suivi (benchmarks de l'entraînement seul)."""
+
+    def start_run(self, run_name: str) -> TrackedRun:
+        return TrackedRun(self, run_name)
+
+    def write(self, run: TrackedRun):
+        pass
+
+    def flush(self, timeout: float = None) -> bool:
+        return True
+
+
+class MemoryTracker(NullTracker):
+    """Runs conservés en mémoire (tests)."""
+
+    def __init__(self):
+        self.runs = []
+
+    def write(self, run: TrackedRun):
+        self.runs.append({
+            "run_name": run.run_name,
+            "params": dict(run.params),
+            "metrics": dict(run.metrics),
+            "model": run.model,
+        })
+
+
+class MlflowTracker(NullTracker):
+    """
+    Suivi MLflow hors du chemin critique :
+    - paramètres et métriques écrits en un seul appel (log_batch)
+    - modèle (sérialisation + inférence de l'environnement, plusieurs
+      secondes) loggé par un thread d'arrière-plan, après la réponse ;
+      le run est clôturé une fois l'artefact écrit
+    """
+
+    def __init__(self, uri: str = TRACKING_URI, experiment: str = EXPERIMENT_NAME):
+        self.uri = uri
+        self.experiment = experiment
+        self._client = None
+        self._experiment_id = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mlflow-artifacts")
+        self._pending = set()
+
+    def _setup(self):
+        with self._lock:
+            if self._client is None:
+                import mlflow
+                from mlflow.tracking import MlflowClient
+
+                mlflow.set_tracking_uri(self.uri)
+                client = MlflowClient(self.uri)
+                experiment = client.get_experiment_by_name(self.experiment)
+                self._experiment_id = (
+                    experiment.experiment_id if experiment is not None
+                    else client.create_experiment(self.experiment)
+                )
+                self._client = client
+        return self._client
+
+    def write(self, run: TrackedRun):
+        from mlflow.entities import Metric, Param
+
+        client = self._setup()
+        mlflow_run = client.create_run(self._experiment_id, run_name=run.run_name)
+        run_id = mlflow_run.info.run_id
+
+        timestamp = int(time.time() * 1000)
+        client.log_batch(
+            run_id,
+            metrics=[Metric(k, v, timestamp, 0) for k, v in run.metrics.items()],
+            params=[Param(k, str(v)) for k, v in run.params.items()]
+        )
+
+        if run.model is None:
+            client.set_terminated(run_id)
+            return
+
+        future = self._executor.submit(self._log_model, run_id, run.model)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+
+    def _log_model(self, run_id: str, model):
+        import mlflow
+        import mlflow.sklearn
+
+        start = time.perf_counter()
+        status = "FINISHED"
+        try:
+            with mlflow.start_run(run_id=run_id):
+                mlflow.sklearn.log_model(model, name="model")
+        except Exception as e:
+            status = "FAILED"
+            logger.error("MLflow : échec du log du modèle (run {}) : {}", run_id, e)
+        finally:
+            self._client.set_terminated(run_id, status=status)
+        logger.info("MLflow : modèle loggé en {:.2f}s (run {})", time.perf_counter() - start, run_id)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Attend la fin des artefacts en cours ; False si `timeout` est atteint."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for future in list(self._pending):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                future.result(timeout=remaining)
+            except TimeoutError:
+                return False
+        return True
+
+
+# -------------------------------------------------------------------
+# Tracker du process
+# -------------------------------------------------------------------
+
+BACKENDS = {
+    "mlflow": MlflowTracker,
+    "memory": MemoryTracker,
+    "none": NullTracker,
+}
+
+_tracker = None
+
+
+def get_tracker():
+    global _tracker
+    if _tracker is None:
+        if TRACKING_BACKEND not in BACKENDS:
+            raise ValueError(f"TRACKING_BACKEND inconnu : {TRACKING_BACKEND}")
+        _tracker = BACKENDS[TRACKING_BACKEND]()
+    return _tracker
+
+
+def set_tracker(tracker):
+    """Remplace le tracker du process (tests, benchmarks) ; renvoie l'ancien."""
+    global _tracker
+    previous, _tracker = _tracker, tracker
+    return previous
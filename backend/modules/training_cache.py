@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import platform
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from modules.model_registry import atomic_copy, atomic_write_json, file_lock
+
+# Bibliothèques dont la version change le modèle produit (ou son format)
+VERSIONED_LIBRARIES = ("sklearn", "numpy", "pandas", "scipy", "joblib")
+
+
+def library_versions() -> dict:
+    import importlib
+
+    versions = {"python": platform.python_version()}
+    for name in VERSIONED_LIBRARIES:
+        versions[name] = importlib.import_module(name).__version__
+    return versions
+
+
+def frame_digest(X: pd.DataFrame, y: pd.Series) -> str:
+    """
+    Hash du jeu d'entraînement normalisé (après prepare_dataset) : valeurs
+    ligne à ligne (l'ordre compte, il fixe les plis), noms et types des
+    colonnes. Indépendant de l'index et de la mise en forme du CSV source.
+    """
+    sha = hashlib.sha256()
+    sha.update(json.dumps([(c, str(X[c].dtype)) for c in X.columns]).encode())
+    sha.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    sha.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return sha.hexdigest()
+
+
+# -------------------------------------------------------------------
+# Cache adressé par contenu
+# -------------------------------------------------------------------
+
+class TrainingCache:
+    """
+    Résultats d'entraînement indexés par le contenu de ce qui les produit
+    (données normalisées, features, configuration du pipeline, versions
+    des bibliothèques) :
+
+        <root>/<clé>/model.pkl     modèle entraîné
+        <root>/<clé>/result.json   métriques renvoyées par retrain_model
+
+    Un ré-entraînement identique relit le résultat et recopie le modèle au
+    lieu de refaire validation croisée, fit et log MLflow. Éviction LRU
+    (date de dernier accès) au-delà de `max_entries` entrées ou `max_bytes`
+    octets. Partagé entre process (verrou sur <root>/cache.lock).
+    """
+
+    def __init__(self, root: Path, max_entries: int = 20, max_bytes: int = 500 * 1024 * 1024):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(X: pd.DataFrame, y: pd.Series, config: dict) -> str:
+        """`config` : features et paramètres d'entraînement (sérialisables JSON)."""
+        payload = {
+            "data": frame_digest(X, y),
+            "config": config,
+            "versions": library_versions(),
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def _lock(self):
+        return file_lock(self.root / "cache.lock")
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key
+
+    # ------------------------------------------------------------------
+    # Lecture / écriture
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, model_output_path: Path):
+        """
+        Résultat mis en cache (dict) et modèle recopié vers
+        `model_output_path`, ou None si la clé est absente.
+        """
+        entry = self._entry(key)
+        with self._lock():
+            try:
+                result = json.loads((entry / "result.json").read_text())
+                atomic_copy(entry / "model.pkl", Path(model_output_path))
+            except (OSError, ValueError):
+                return None
+            # Date de dernier accès (ordre d'éviction)
+            os.utime(entry / "result.json")
+        return result
+
+    def put(self, key: str, model_path: Path, result: dict):
+        """Enregistre un résultat et son modèle, puis applique l'éviction."""
+        tmp = self.root / f".{key}.{uuid.uuid4().hex}"
+        tmp.mkdir()
+        try:
+            shutil.copyfile(model_path, tmp / "model.pkl")
+            atomic_write_json(tmp / "result.json", result)
+            with self._lock():
+                entry = self._entry(key)
+                if entry.exists():
+                    shutil.rmtree(entry)
+                os.replace(tmp, entry)
+                self._evict(keep=key)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # Éviction
+    # ------------------------------------------------------------------
+
+    def entries(self) -> list:
+        """Entrées (clé, dernier accès, taille en octets), plus récentes d'abord."""
+        entries = []
+        for entry in self.root.iterdir():
+            result = entry / "result.json"
+            if entry.name.startswith(".") or not result.exists():
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir())
+            entries.append((entry.name, result.stat().st_mtime, size))
+        return sorted(entries, key=lambda item: item[1], reverse=True)
+
+    def stats(self) -> dict:
+        entries = self.entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _evict(self, keep: str = None):
+        kept, total = 0, 0
+        for key, _, size in self.entries():
+            if key == keep or (kept < self.max_entries and total + size <= self.max_bytes):
+                kept += 1
+                total += size
+                continue
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            logger.info("Cache d'entraînement : entrée {} évincée", key[:12])
+
+    def clear(self):
+        with self._lock():
+            for key, _, _ in self.entries():
+                shutil.rmtree(self._entry(key), ignore_errors=True)
+
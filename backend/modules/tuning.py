@@ -0,0 +1,179 @@
+import math
+import tempfile
+import time
+
+import numpy as np
+from joblib import Memory, Parallel, delayed
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression, RidgeClassifier, SGDClassifier
+from sklearn.metrics import f1_score
+from sklearn.pipeline import Pipeline
+
+# -------------------------------------------------------------------
+# Espace de recherche
+# -------------------------------------------------------------------
+
+# Régression logistique : force de régularisation, poids des classes, solveur
+LOGISTIC_GRID = [
+    {"estimator": "LogisticRegression", "C": C, "class_weight": class_weight, "solver": solver}
+    for C in (0.01, 0.1, 1.0, 10.0, 100.0)
+    for class_weight in (None, "balanced")
+    for solver in ("lbfgs", "liblinear", "newton-cholesky")
+]
+
+# Autres estimateurs linéaires légers (toujours servis par le scoreur compilé)
+EXTRA_GRID = [
+    {"estimator": "RidgeClassifier", "alpha": alpha, "class_weight": class_weight}
+    for alpha in (0.1, 1.0, 10.0)
+    for class_weight in (None, "balanced")
+] + [
+    {"estimator": "SGDClassifier", "alpha": alpha, "class_weight": class_weight}
+    for alpha in (1e-4, 1e-3, 1e-2)
+    for class_weight in (None, "balanced")
+]
+
+# Configuration par défaut (celle du notebook), retenue si le budget est
+# épuisé avant la fin du premier tour
+DEFAULT_CONFIG = {"estimator": "LogisticRegression", "C": 1.0, "class_weight": None, "solver": "lbfgs"}
+
+
+def search_space(extra_estimators: bool = False) -> list:
+    return LOGISTIC_GRID + (EXTRA_GRID if extra_estimators else [])
+
+
+def make_estimator(config: dict):
+    params = {k: v for k, v in config.items() if k != "estimator"}
+    if config["estimator"] == "LogisticRegression":
+        return LogisticRegression(max_iter=1000, **params)
+    if config["estimator"] == "RidgeClassifier":
+        return RidgeClassifier(**params)
+    if config["estimator"] == "SGDClassifier":
+        return SGDClassifier(loss="log_loss", random_state=0, **params)
+    raise ValueError(f"Estimateur inconnu : {config['estimator']}")
+
+
+# -------------------------------------------------------------------
+# Halving successif sous budget de temps
+# -------------------------------------------------------------------
+
+def _fit_and_score(preprocessor, config, X, y, train_idx, test_idx, memory, deadline):
+    """Score F1 d'un candidat sur un pli ; None si le budget est dépassé."""
+    if time.perf_counter() > deadline:
+        return None
+
+    # memory : le ColumnTransformer ajusté sur ce sous-échantillon de ce pli
+    # est relu depuis le cache par tous les autres candidats
+    pipeline = Pipeline(
+        steps=[("preprocessor", clone(preprocessor)), ("classifier", make_estimator(config))],
+        memory=memory
+    )
+    try:
+        pipeline.fit(X.iloc[train_idx], y.iloc[train_idx])
+    except ValueError:
+        # Sous-échantillon dégénéré (une seule classe) : candidat non classé
+        return float("nan")
+    return f1_score(y.iloc[test_idx], pipeline.predict(X.iloc[test_idx]), zero_division=0)
+
+
+def successive_halving(
+    X,
+    y,
+    preprocessor,
+    cv_splits: list,
+    candidates: list,
+    time_budget: float = 60.0,
+    factor: int = 3,
+    min_resources: int = 50,
+    n_jobs: int = 1,
+    random_state: int = 0
+) -> dict:
+    """
+    Recherche par halving successif (ressource : nombre de lignes
+    d'entraînement par pli) :
+    - tour i : tous les candidats restants évalués en parallèle sur chaque
+      pli, avec un sous-échantillon de plus en plus grand
+    - seuls les 1/factor meilleurs (F1 moyen) passent au tour suivant ;
+      le dernier tour utilise les plis complets
+    - arrêt anticipé quand `time_budget` (secondes) est épuisé : le
+      classement du dernier tour terminé est retenu
+
+    Les plis (cv_splits) sont ceux de la validation croisée finale.
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget
+
+    n_train = min(len(train) for train, _ in cv_splits)
+    n_rounds = max(1, math.ceil(math.log(len(candidates), factor)))
+
+    # Même sous-échantillon pour tous les candidats d'un tour (cache commun)
+    rng = np.random.RandomState(random_state)
+    permuted = [rng.permutation(train) for train, _ in cv_splits]
+
+    remaining = list(candidates)
+    ranking = None
+    rounds = []
+    n_fits = 0
+    exhausted = False
+
+    with tempfile.TemporaryDirectory(prefix="tuning-cache-") as cache_dir:
+        memory = Memory(location=cache_dir, verbose=0)
+
+        with Parallel(n_jobs=n_jobs) as parallel:
+            for i in range(n_rounds):
+                if time.perf_counter() > deadline:
+                    exhausted = True
+                    break
+
+                resources = n_train if i == n_rounds - 1 else max(
+                    min_resources, int(n_train / factor ** (n_rounds - 1 - i))
+                )
+                resources = min(resources, n_train)
+
+                scores = parallel(
+                    delayed(_fit_and_score)(
+                        preprocessor, config, X, y,
+                        train[:resources], test, memory, deadline
+                    )
+                    for config in remaining
+                    for train, (_, test) in zip(permuted, cv_splits)
+                )
+
+                n_folds = len(cv_splits)
+                evaluated = []
+                for k, config in enumerate(remaining):
+                    fold_scores = scores[k * n_folds:(k + 1) * n_folds]
+                    if any(score is None for score in fold_scores):
+                        exhausted = True
+                        continue
+                    n_fits += n_folds
+                    valid = [score for score in fold_scores if not np.isnan(score)]
+                    evaluated.append((float(np.mean(valid)) if valid else float("-inf"), config))
+
+                # Tour interrompu par le budget : classement du tour précédent
+                if not evaluated or (exhausted and ranking is not None):
+                    break
+
+                evaluated.sort(key=lambda item: item[0], reverse=True)
+                ranking = evaluated
+                rounds.append({
+                    "resources": resources,
+                    "n_candidates": len(evaluated),
+                    "best_score": round(evaluated[0][0], 4),
+                })
+
+                if exhausted or len(evaluated) == 1:
+                    break
+                keep = max(1, math.ceil(len(evaluated) / factor))
+                remaining = [config for _, config in evaluated[:keep]]
+
+    best_score, best_config = ranking[0] if ranking else (None, DEFAULT_CONFIG)
+
+    return {
+        "best_params": best_config,
+        "best_score": best_score,
+        "n_candidates": len(candidates),
+        "n_fits": n_fits,
+        "rounds": rounds,
+        "budget_exhausted": exhausted,
+        "search_time": time.perf_counter() - start,
+    }
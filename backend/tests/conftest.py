@@ -1,6 +1,17 @@
+import os
+import shutil
+from pathlib import Path
+
 import pandas as pd
 import pytest
 
+# Suivi des entraînements en mémoire (pas d'écriture dans /app/mlruns),
+# y compris dans les process de ré-entraînement (variable héritée)
+os.environ.setdefault("TRACKING_BACKEND", "memory")
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+SHIPPED_MODELS_DIR = Path(__file__).resolve().parents[1] / "models"
+
 @pytest.fixture
 def dummy_dataset(tmp_path):
     df = pd.DataFrame({
@@ -23,3 +34,52 @@ def dummy_dataset(tmp_path):
     path = tmp_path / "dummy_students.csv"
     df.to_csv(path, sep=";", index=False)
     return path
+
+
+@pytest.fixture(scope="session")
+def models_dir(tmp_path_factory):
+    # Copie des modèles livrés : les tests ne modifient jamais backend/models
+    models_dir = tmp_path_factory.mktemp("models")
+    for model in SHIPPED_MODELS_DIR.glob("*.pkl"):
+        shutil.copy(model, models_dir)
+    return models_dir
+
+
+@pytest.fixture(scope="session")
+def client(models_dir, tmp_path_factory):
+    os.environ["MODELS_DIR"] = str(models_dir)
+    logs_dir = tmp_path_factory.mktemp("logs")
+    os.environ["LOGS_DIR"] = str(logs_dir)
+    os.environ["PREDICTION_LOG"] = str(logs_dir / "predictions.jsonl")
+    os.environ["PREDICTION_DB"] = str(logs_dir / "predictions.db")
+    os.environ["FEATURE_STORE_DIR"] = str(tmp_path_factory.mktemp("feature-store"))
+
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def student_payload():
+    return {
+        "source": "mat",
+        "famsize": "GT3",
+        "studytime": 2,
+        "failures": 0,
+        "activities": "yes",
+        "higher": "yes",
+        "internet": "yes",
+        "famrel": 4,
+        "freetime": 3,
+        "goout": 2,
+        "absences": 3,
+        "G1": 12,
+        "G2": 13,
+    }
+
+
+@pytest.fixture(scope="session")
+def students_concat():
+    return pd.read_csv(DATA_DIR / "students_concat.csv", sep=";")
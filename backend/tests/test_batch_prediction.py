@@ -0,0 +1,50 @@
+import pandas as pd
+
+
+def test_predict_batch_matches_single_predictions(client, student_payload):
+    weak_student = {**student_payload, "G1": 4, "G2": 3, "failures": 3}
+    students = [student_payload, weak_student]
+
+    response = client.post("/predict-batch-with-g2", json=students)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["n_rows"] == 2
+    assert body["n_errors"] == 0
+
+    for student, result in zip(students, body["results"]):
+        single = client.post("/predict-with-g2", json=student).json()
+        assert result["prediction"] == single["prediction"]
+
+
+def test_predict_batch_reports_row_errors_in_order(client, student_payload):
+    without_g2 = {k: v for k, v in student_payload.items() if k != "G2"}
+    invalid = {**without_g2, "studytime": "beaucoup"}
+
+    response = client.post(
+        "/predict-batch-without-g2",
+        json=[without_g2, invalid, without_g2]
+    )
+
+    body = response.json()
+    assert [r["index"] for r in body["results"]] == [0, 1, 2]
+    assert body["n_predictions"] == 2
+    assert body["n_errors"] == 1
+    assert "errors" in body["results"][1]
+    assert "prediction" in body["results"][2]
+
+
+def test_predict_batch_csv(client, dummy_dataset):
+    n_rows = len(pd.read_csv(dummy_dataset, sep=";"))
+
+    with open(dummy_dataset, "rb") as f:
+        response = client.post(
+            "/predict-batch-csv",
+            files={"file": ("students.csv", f, "text/csv")},
+            data={"include_g2": "false"}
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["mode"] == "without_g2"
+    assert body["n_predictions"] == n_rows
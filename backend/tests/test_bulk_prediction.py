@@ -0,0 +1,163 @@
+import asyncio
+import io
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+COLUMNS = [
+    "source", "famsize", "studytime", "failures", "activities", "higher",
+    "internet", "famrel", "freetime", "goout", "absences", "G1", "G2",
+]
+
+
+@pytest.fixture
+def students(students_concat):
+    return students_concat[COLUMNS].head(500)
+
+
+@pytest.fixture
+def expected(client, students):
+    response = client.post("/predict-batch-with-g2", json=students.to_dict(orient="records"))
+    return [r["prediction"] for r in response.json()["results"]]
+
+
+def arrow_stream(df: pd.DataFrame, chunksize: int = None) -> bytes:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=chunksize)
+    return sink.getvalue()
+
+
+def parquet(df: pd.DataFrame) -> bytes:
+    sink = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), sink)
+    return sink.getvalue()
+
+
+def ndjson(df: pd.DataFrame) -> bytes:
+    return df.to_json(orient="records", lines=True).encode()
+
+
+@pytest.mark.parametrize("content_type, encode", [
+    (ARROW_STREAM, arrow_stream),
+    ("application/vnd.apache.parquet", parquet),
+    ("application/x-ndjson", ndjson),
+])
+def test_bulk_matches_json_batch(client, students, expected, content_type, encode):
+    response = client.post(
+        "/predict-bulk", content=encode(students), headers={"Content-Type": content_type}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["mode"] == "with_g2"
+    assert body["n_predictions"] == len(students)
+    assert body["predictions"] == expected
+    assert body["n_positive"] == sum(expected)
+
+
+def test_bulk_ignores_extra_columns_and_order(client, students, expected):
+    df = students[COLUMNS[::-1]].assign(G3=0)
+
+    response = client.post(
+        "/predict-bulk", content=arrow_stream(df), headers={"Content-Type": ARROW_STREAM}
+    )
+
+    assert response.json()["predictions"] == expected
+
+
+def test_bulk_stream_returns_one_line_per_block(client, students, expected):
+    response = client.post(
+        "/predict-bulk?stream=true",
+        content=arrow_stream(students, chunksize=200),
+        headers={"Content-Type": ARROW_STREAM}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [line["offset"] for line in lines[:-1]] == [0, 200, 400]
+    assert [p for line in lines[:-1] for p in line["predictions"]] == expected
+    assert lines[-1]["done"] is True
+    assert lines[-1]["n_predictions"] == len(students)
+
+
+def test_bulk_without_g2(client, students):
+    df = students.drop(columns="G2")
+
+    response = client.post(
+        "/predict-bulk?include_g2=false",
+        content=arrow_stream(df),
+        headers={"Content-Type": ARROW_STREAM}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["mode"] == "without_g2"
+
+
+@pytest.mark.parametrize("stream", ["false", "true"])
+def test_bulk_rejects_missing_column(client, students, stream):
+    response = client.post(
+        f"/predict-bulk?stream={stream}",
+        content=arrow_stream(students.drop(columns="G1")),
+        headers={"Content-Type": ARROW_STREAM}
+    )
+
+    assert response.status_code == 400
+    assert "G1" in response.json()["detail"]
+
+
+def test_bulk_rejects_wrong_type(client, students):
+    df = students.assign(absences=students["absences"].astype(str))
+
+    response = client.post(
+        "/predict-bulk", content=arrow_stream(df), headers={"Content-Type": ARROW_STREAM}
+    )
+
+    assert response.status_code == 400
+    assert "absences" in response.json()["detail"]
+
+
+def test_bulk_rejects_missing_values(client, students):
+    df = students.astype({"famsize": object})
+    df.loc[3, "famsize"] = None
+
+    response = client.post(
+        "/predict-bulk", content=arrow_stream(df), headers={"Content-Type": ARROW_STREAM}
+    )
+
+    assert response.status_code == 400
+    assert "famsize" in response.json()["detail"]
+
+
+def test_bulk_rejects_unreadable_body(client):
+    response = client.post(
+        "/predict-bulk", content=b"pas de l'arrow", headers={"Content-Type": ARROW_STREAM}
+    )
+
+    assert response.status_code == 400
+
+
+def test_bulk_rejects_unsupported_content_type(client, students):
+    response = client.post("/predict-bulk", json=students.to_dict(orient="records"))
+
+    assert response.status_code == 415
+
+
+def test_bulk_benchmark_reports_every_format(client, students_concat):
+    from benchmarks.bulk_bench import FORMATS, run_bulk_benchmark_async, sample_students
+    from main import app
+
+    df = sample_students(students_concat, 300)
+    results = asyncio.run(run_bulk_benchmark_async(app, df, runs=1))
+
+    assert list(results["formats"]) == FORMATS
+    for stats in results["formats"].values():
+        assert stats["rows_per_s"] > 0
+        assert stats["peak_python_mb"] >= 0
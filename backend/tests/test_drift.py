@@ -0,0 +1,80 @@
+from modules import drift as drift_module
+from modules.data_preparation import prepare_dataset
+from modules.drift import DriftMonitor, build_profile
+
+
+def training_features(students_concat):
+    X, _ = prepare_dataset(students_concat, include_g2=True)
+    return X
+
+
+def test_profile_bins_discrete_and_categorical_features(students_concat):
+    profile = build_profile(training_features(students_concat))
+
+    studytime = profile["features"]["studytime"]
+    assert studytime["type"] == "numeric"
+    assert len(studytime["frequencies"]) == len(studytime["cuts"]) + 1
+    assert abs(sum(studytime["frequencies"]) - 1) < 1e-4
+
+    famsize = profile["features"]["famsize"]
+    assert famsize["type"] == "categorical"
+    assert set(famsize["categories"]) == {"GT3", "LE3"}
+
+
+def test_training_distribution_is_stable_and_shift_is_detected(students_concat):
+    X = training_features(students_concat)
+    profile = build_profile(X)
+    records = X.to_dict(orient="records")
+
+    stable = DriftMonitor("v1", profile)
+    stable.observe_many(records)
+    report = stable.report()
+    assert report["n_observations"] == len(X)
+    assert report["status"] == "stable"
+    assert report["features"]["absences"]["ks"] < 0.01
+
+    shifted = DriftMonitor("v1", profile)
+    for record in records:
+        shifted.observe({**record, "absences": record["absences"] + 20, "famsize": "XL"})
+    report = shifted.report()
+    assert report["features"]["absences"]["status"] == "drift"
+    assert report["features"]["absences"]["ks"] > 0.5
+    assert report["features"]["famsize"]["unseen_share"] == 1.0
+    assert report["features"]["G1"]["status"] == "stable"
+
+
+def test_window_slides_and_memory_stays_bounded(students_concat, monkeypatch):
+    X = training_features(students_concat)
+    monitor = DriftMonitor("v1", build_profile(X), window_seconds=60, segment_seconds=10)
+    record = X.iloc[0].to_dict()
+
+    now = [1000.0]
+    monkeypatch.setattr(drift_module.time, "monotonic", lambda: now[0])
+    for _ in range(600):
+        monitor.observe(record)
+        now[0] += 1
+
+    # 600 s de trafic, fenêtre de 60 s : 6 segments au plus
+    assert len(monitor._segments) <= 6
+    assert monitor.report()["n_observations"] <= 60
+
+    now[0] += 120
+    assert monitor.report()["n_observations"] == 0
+
+
+def test_drift_endpoint_reports_served_inputs(client, student_payload, students_concat):
+    from main import drift_monitors, models
+
+    X, _ = prepare_dataset(students_concat, include_g2=False)
+    version = models.get("without_g2").version
+    drift_monitors.reset("without_g2", version, build_profile(X))
+
+    for _ in range(3):
+        client.post("/predict-without-g2", json=student_payload)
+    client.post("/predict-batch-without-g2", json=[student_payload] * 40)
+
+    report = client.get("/drift", params={"model": "without_g2"}).json()["without_g2"]
+    assert report["version"] == version
+    assert report["n_observations"] == 43
+    assert report["features"]["G1"]["psi"] is not None
+    assert client.get("/drift", params={"model": "inconnu"}).status_code == 404
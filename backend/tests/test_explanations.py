@@ -0,0 +1,93 @@
+import io
+import json
+
+import numpy as np
+import pyarrow as pa
+
+from modules.explanations import top_features
+
+
+def test_top_features_ranks_by_absolute_contribution():
+    matrix = np.array([
+        [0.1, -2.0, 0.5, 1.0],
+        [3.0, 0.0, -0.2, 0.0],
+    ])
+
+    indices, values = top_features(matrix, k=2)
+
+    assert indices.tolist() == [[1, 3], [0, 2]]
+    assert values.tolist() == [[-2.0, 1.0], [3.0, -0.2]]
+
+
+def test_top_features_is_capped_by_feature_count():
+    matrix = np.array([[1.0, -3.0, 2.0]])
+
+    indices, values = top_features(matrix, k=10)
+
+    assert indices.tolist() == [[1, 2, 0]]
+    assert values.tolist() == [[-3.0, 2.0, 1.0]]
+
+
+def test_predict_explain_returns_top_contributions(client, student_payload):
+    plain = client.post("/predict-with-g2", json=student_payload).json()
+    response = client.post("/predict-with-g2?explain=true", json=student_payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["prediction"] == plain["prediction"]
+    assert "explanation" not in plain
+
+    explanation = body["explanation"]
+    contributions = [c["contribution"] for c in explanation["contributions"]]
+    assert len(contributions) == 5
+    assert [abs(c) for c in contributions] == sorted((abs(c) for c in contributions), reverse=True)
+    assert (explanation["score"] > 0) == (body["prediction"] == 1)
+    # Une seule entrée par feature d'origine (one-hot replié)
+    features = [c["feature"] for c in explanation["contributions"]]
+    assert len(set(features)) == len(features)
+    assert set(features) <= set(student_payload)
+
+
+def test_batch_explain_matches_single(client, student_payload):
+    weak_student = {**student_payload, "G1": 4, "G2": 3, "failures": 3}
+
+    response = client.post(
+        "/predict-batch-with-g2?explain=true", json=[student_payload, weak_student, {}]
+    )
+
+    body = response.json()
+    assert body["explanation"]["features"]
+    assert "contributions" not in body["results"][2]
+    for student, result in zip([student_payload, weak_student], body["results"]):
+        single = client.post("/predict-with-g2?explain=true", json=student).json()
+        assert result["contributions"] == single["explanation"]["contributions"]
+
+
+def test_bulk_explain_is_columnar(client, students_concat):
+    students = students_concat.drop(columns="G3").head(300)
+    table = pa.Table.from_pandas(students, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=100)
+    headers = {"Content-Type": "application/vnd.apache.arrow.stream"}
+
+    body = client.post(
+        "/predict-bulk?explain=true", content=sink.getvalue(), headers=headers
+    ).json()
+    explanation = body["explanation"]
+    assert len(explanation["top_features"]) == len(explanation["contributions"]) == 300
+
+    first = client.post(
+        "/predict-with-g2?explain=true",
+        json=json.loads(students.head(1).to_json(orient="records"))[0]
+    ).json()["explanation"]
+    assert [explanation["features"][i] for i in explanation["top_features"][0]] == [
+        c["feature"] for c in first["contributions"]
+    ]
+
+    lines = client.post(
+        "/predict-bulk?explain=true&stream=true", content=sink.getvalue(), headers=headers
+    ).text.splitlines()
+    blocks = [json.loads(line) for line in lines]
+    assert [len(b["top_features"]) for b in blocks[:-1]] == [100, 100, 100]
+    assert blocks[-1]["explanation"]["features"] == explanation["features"]
@@ -0,0 +1,137 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from modules.data_preparation import prepare_dataset
+from modules.fast_scorer import PipelineScorer, compile_pipeline, make_scorer
+from modules.preprocessing import make_preprocessor
+
+MODELS_DIR = Path(__file__).resolve().parents[1] / "models"
+
+
+def fit_pipeline(df, include_g2, classifier=None):
+    X, y = prepare_dataset(df, include_g2=include_g2)
+    pipeline = Pipeline(
+        steps=[
+            ("preprocessor", make_preprocessor(X)),
+            ("classifier", classifier or LogisticRegression(max_iter=1000))
+        ]
+    )
+    return pipeline.fit(X, y), X
+
+
+@pytest.mark.parametrize("include_g2", [False, True])
+def test_compiled_scorer_matches_pipeline(students_concat, include_g2):
+    pipeline, X = fit_pipeline(students_concat, include_g2)
+    scorer = compile_pipeline(pipeline)
+
+    expected = pipeline.predict(X)
+
+    np.testing.assert_array_equal(scorer.predict(X), expected)
+    np.testing.assert_allclose(
+        scorer.decision_function(X), pipeline.decision_function(X), atol=1e-9
+    )
+    single = [scorer.predict_one(row) for row in X.to_dict(orient="records")]
+    np.testing.assert_array_equal(single, expected)
+
+
+@pytest.mark.parametrize("with_mean, with_std", [(False, True), (True, False), (False, False)])
+def test_compiled_scorer_honours_scaler_options(students_concat, with_mean, with_std):
+    pipeline, X = fit_pipeline(students_concat, include_g2=True)
+    preprocessor = pipeline.named_steps["preprocessor"]
+    for _, transformer, _ in preprocessor.transformers:
+        if isinstance(transformer, StandardScaler):
+            transformer.set_params(with_mean=with_mean, with_std=with_std)
+    pipeline.fit(X, prepare_dataset(students_concat, include_g2=True)[1])
+
+    scorer = compile_pipeline(pipeline)
+
+    np.testing.assert_array_equal(scorer.predict(X), pipeline.predict(X))
+    np.testing.assert_allclose(
+        scorer.decision_function(X), pipeline.decision_function(X), atol=1e-9
+    )
+    single = [scorer.predict_one(row) for row in X.head(200).to_dict(orient="records")]
+    np.testing.assert_array_equal(single, pipeline.predict(X.head(200)))
+
+
+@pytest.mark.parametrize("name", ["model_with_g2.pkl", "model_without_g2.pkl"])
+def test_shipped_models_compile(students_concat, name):
+    pipeline = joblib.load(MODELS_DIR / name)
+    scorer = make_scorer(pipeline)
+    X = students_concat[scorer.features]
+
+    assert scorer.compiled
+    np.testing.assert_array_equal(scorer.predict(X), pipeline.predict(X))
+
+
+def test_unknown_category_is_ignored(students_concat):
+    pipeline, X = fit_pipeline(students_concat, include_g2=False)
+    scorer = compile_pipeline(pipeline)
+
+    X_unknown = X.head(20).assign(source="autre")
+
+    np.testing.assert_array_equal(
+        scorer.predict(X_unknown), pipeline.predict(X_unknown)
+    )
+
+
+def test_contributions_sum_to_decision(students_concat):
+    pipeline, X = fit_pipeline(students_concat, include_g2=True)
+    scorer = compile_pipeline(pipeline)
+
+    contributions = scorer.contributions(X)
+
+    assert contributions.shape == (len(X), len(scorer.features))
+    np.testing.assert_allclose(
+        contributions.sum(axis=1) + scorer.base_score,
+        pipeline.decision_function(X),
+        atol=1e-9
+    )
+    single = [scorer.contributions_one(row) for row in X.head(50).to_dict(orient="records")]
+    np.testing.assert_allclose(single, contributions[:50], atol=1e-12)
+
+
+def test_one_hot_contributions_are_folded_to_source_field(students_concat):
+    pipeline, X = fit_pipeline(students_concat, include_g2=True)
+    scorer = compile_pipeline(pipeline)
+    transformed = pipeline.named_steps["preprocessor"].transform(X.head(20))
+    coef = pipeline.named_steps["classifier"].coef_[0]
+    names = pipeline.named_steps["preprocessor"].get_feature_names_out()
+
+    contributions = scorer.contributions(X.head(20))
+
+    for column, feature in enumerate(scorer.features):
+        # Toutes les colonnes transformées issues de la feature (num__G1, cat__source_mat...)
+        mask = np.array([
+            name in (f"num__{feature}",) or name.startswith(f"cat__{feature}_")
+            for name in names
+        ])
+        expected = np.asarray(transformed[:, mask] @ coef[mask]).ravel()
+        np.testing.assert_allclose(contributions[:, column], expected, atol=1e-9)
+
+
+def test_categorical_columns_score_like_strings(students_concat):
+    pipeline, X = fit_pipeline(students_concat, include_g2=False)
+    scorer = compile_pipeline(pipeline)
+    X_categorical = X.astype({f: "category" for f in scorer.categorical_features})
+
+    np.testing.assert_array_equal(scorer.predict(X_categorical), scorer.predict(X))
+    np.testing.assert_allclose(scorer.contributions(X_categorical), scorer.contributions(X))
+
+
+def test_fallback_for_uncompilable_pipeline(students_concat):
+    pipeline, X = fit_pipeline(
+        students_concat, include_g2=False, classifier=DecisionTreeClassifier()
+    )
+    scorer = make_scorer(pipeline)
+
+    assert isinstance(scorer, PipelineScorer)
+    assert not scorer.explainable
+    np.testing.assert_array_equal(scorer.predict(X), pipeline.predict(X))
+    assert scorer.predict_one(X.iloc[0].to_dict()) == pipeline.predict(X.head(1))[0]
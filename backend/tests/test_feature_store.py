@@ -0,0 +1,197 @@
+import io
+import os
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from modules.feature_store import FeatureStore, FeatureStoreError, STORE_COLUMNS
+from modules.ingestion import read_training_csv
+from modules.retraining import retrain_model
+from tests.test_retrain_jobs import wait_for_job
+
+
+@pytest.fixture
+def training_rows(students_concat):
+    df, _ = read_training_csv(io.BytesIO(students_concat.to_csv(sep=";", index=False).encode()))
+    return df
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FeatureStore(tmp_path / "store")
+
+
+def test_ingest_writes_partition_and_manifest(store, training_rows):
+    entry = store.ingest(training_rows, "uci-2008", source="students_concat.csv")
+
+    assert entry["version"] == 1
+    assert entry["n_rows"] == len(training_rows)
+    assert entry["path"].startswith("cohort=uci-2008/")
+
+    manifest = store.manifest()
+    assert manifest["n_rows"] == len(training_rows)
+    assert manifest["cohorts"] == {"uci-2008": len(training_rows)}
+    assert manifest["parts"][0]["sha256"] == entry["sha256"]
+    assert store.verify() == []
+
+
+def test_reingest_skips_rows_already_in_cohort(store, training_rows):
+    store.ingest(training_rows.iloc[:600], "uci-2008")
+
+    # Export qui recouvre le précédent : seules les nouvelles lignes sont ajoutées
+    entry = store.ingest(training_rows, "uci-2008")
+
+    assert entry["n_rows"] == len(training_rows) - 600
+    assert entry["n_duplicates"] == 600
+    assert store.select().count() == len(training_rows)
+
+    # Rien de nouveau : ni fichier ni nouvelle version
+    unchanged = store.ingest(training_rows, "uci-2008")
+    assert unchanged["n_rows"] == 0
+    assert store.manifest()["version"] == 2
+
+
+def test_identical_students_in_one_file_are_kept(store, training_rows):
+    twins = pd.concat([training_rows.head(1)] * 3, ignore_index=True)
+
+    assert store.ingest(twins, "2025")["n_rows"] == 3
+    # Même contenu dans une autre cohorte : autres élèves
+    assert store.ingest(twins, "2026")["n_rows"] == 3
+
+
+def test_snapshot_and_cohort_selection(store, training_rows):
+    store.ingest(training_rows.iloc[:500], "2024")
+    store.ingest(training_rows.iloc[500:], "2025")
+
+    assert store.select(snapshot=1).count() == 500
+    assert store.select(cohorts=["2025"]).count() == len(training_rows) - 500
+    assert len(store.select().load()) == len(training_rows)
+
+    with pytest.raises(FeatureStoreError):
+        store.select(snapshot=3)
+
+
+def test_time_filter_uses_ingestion_date(store, training_rows):
+    store.ingest(training_rows.iloc[:500], "2024")
+    middle = datetime.now(timezone.utc)
+    store.ingest(training_rows.iloc[500:], "2024")
+
+    assert store.select(since=middle).count() == len(training_rows) - 500
+    assert store.select(until=middle).count() == 500
+    assert store.select(since=middle + timedelta(days=1)).count() == 0
+
+
+def test_load_is_typed_and_column_pruned(store, training_rows):
+    store.ingest(training_rows, "uci-2008")
+
+    df = store.select().load(columns=["G1", "source", "target"])
+
+    assert list(df.columns) == ["G1", "source", "target"]
+    assert isinstance(df["source"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(
+        store.select().load()[STORE_COLUMNS].reset_index(drop=True),
+        training_rows[STORE_COLUMNS].reset_index(drop=True),
+        check_dtype=False,
+        check_categorical=False
+    )
+
+
+def test_rows_without_g2_disable_g2_column(store, training_rows):
+    store.ingest(training_rows.iloc[:500], "2024")
+    store.ingest(training_rows.iloc[500:].drop(columns="G2"), "2025")
+
+    assert "G2" not in store.select().load().columns
+    assert "G2" in store.select(cohorts=["2024"]).load().columns
+
+
+@pytest.mark.parametrize("change, message", [
+    (lambda df: df.drop(columns="G1"), "G1"),
+    (lambda df: df.assign(famsize=df["famsize"].astype(str).replace("LE3", "XXL")), "famsize"),
+    (lambda df: df.assign(target=df["target"] * 2), "target"),
+])
+def test_invalid_rows_are_rejected(store, training_rows, change, message):
+    with pytest.raises(FeatureStoreError, match=message):
+        store.ingest(change(training_rows), "2025")
+    assert store.manifest()["version"] == 0
+
+
+def test_invalid_cohort_name_is_rejected(store, training_rows):
+    with pytest.raises(FeatureStoreError):
+        store.ingest(training_rows, "../2025")
+
+
+def test_verify_detects_modified_file(store, training_rows):
+    entry = store.ingest(training_rows, "uci-2008")
+    path = store.root / entry["path"]
+    os.truncate(path, path.stat().st_size - 10)
+
+    assert store.verify() == [f"{entry['path']} : SHA-256 différent"]
+
+
+def test_retrain_model_from_store_selection(store, training_rows, tmp_path):
+    store.ingest(training_rows, "uci-2008")
+
+    from_frame = retrain_model(
+        training_rows, include_g2=False, model_output_path=tmp_path / "a.pkl", run_name="a"
+    )
+    from_store = retrain_model(
+        store.select(), include_g2=False, model_output_path=tmp_path / "b.pkl", run_name="b"
+    )
+
+    assert from_store["n_samples"] == from_frame["n_samples"]
+    for metric in ("f1_mean", "recall_mean"):
+        assert from_store[metric] == pytest.approx(from_frame[metric])
+
+
+# -------------------------------------------------------------------
+# API
+# -------------------------------------------------------------------
+
+def test_api_ingest_then_retrain_from_store(client, students_concat):
+    payload = students_concat.to_csv(sep=";", index=False).encode()
+
+    response = client.post(
+        "/feature-store/rows",
+        files={"file": ("students.csv", payload, "text/csv")},
+        data={"cohort": "api-2008"}
+    )
+    assert response.status_code == 200
+    assert response.json()["n_rows"] == len(students_concat)
+    assert client.get("/feature-store").json()["cohorts"]["api-2008"] == len(students_concat)
+
+    response = client.post("/retrain", data={"cohorts": "api-2008"})
+    assert response.status_code == 202
+    assert response.json()["feature_store"]["selection"]["n_rows"] == len(students_concat)
+
+    job = wait_for_job(client, response.json()["job_id"])
+    assert job["status"] == "succeeded", job["error"]
+    assert job["filename"].startswith("feature-store@")
+    assert job["result"]["results"]["with_g2"]["n_samples"] == len(students_concat)
+
+
+def test_api_upload_with_cohort_appends_new_rows_only(client, students_concat):
+    first = students_concat.iloc[:600].to_csv(sep=";", index=False).encode()
+    both = students_concat.to_csv(sep=";", index=False).encode()
+    client.post(
+        "/feature-store/rows",
+        files={"file": ("a.csv", first, "text/csv")},
+        data={"cohort": "api-append"}
+    )
+
+    response = client.post(
+        "/retrain",
+        files={"file": ("b.csv", both, "text/csv")},
+        data={"cohort": "api-append", "cohorts": "api-append"}
+    )
+
+    body = response.json()
+    assert body["feature_store"]["ingested"]["n_duplicates"] == 600
+    assert body["feature_store"]["selection"]["n_rows"] == len(students_concat)
+    assert wait_for_job(client, body["job_id"])["status"] == "succeeded"
+
+
+def test_api_rejects_empty_selection(client):
+    response = client.post("/retrain", data={"cohorts": "inexistante"})
+
+    assert response.status_code == 400
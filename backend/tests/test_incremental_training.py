@@ -0,0 +1,57 @@
+import numpy as np
+
+from modules.data_preparation import prepare_dataset, prepare_training_frame
+from modules.fast_scorer import compile_pipeline
+from modules.retraining import (
+    iter_frame_batches,
+    partial_fit_pipeline,
+    retrain_incremental_from_csv,
+    train_incremental,
+)
+
+
+def test_partial_fit_updates_without_replaying_history(students_concat):
+    data = prepare_training_frame(students_concat)
+    first, second = data.iloc[:500], data.iloc[500:]
+
+    X1, y1 = prepare_dataset(first, include_g2=True)
+    pipeline = partial_fit_pipeline(None, X1, y1)
+    scaler = pipeline.named_steps["preprocessor"].named_transformers_["num"]
+    assert scaler.n_samples_seen_ == 500
+
+    X2, y2 = prepare_dataset(second, include_g2=True)
+    pipeline = partial_fit_pipeline(pipeline, X2, y2)
+    assert scaler.n_samples_seen_ == len(data)
+
+    # Le modèle incrémental reste servi par le scoreur compilé
+    X, _ = prepare_dataset(data, include_g2=True)
+    np.testing.assert_array_equal(compile_pipeline(pipeline).predict(X), pipeline.predict(X))
+
+
+def test_prequential_metrics(students_concat):
+    data = prepare_training_frame(students_concat).sample(frac=1, random_state=0)
+
+    pipeline, metrics = train_incremental(iter_frame_batches(data, 100), include_g2=True)
+
+    assert metrics["n_samples"] == len(data)
+    assert metrics["n_batches"] == 11
+    assert metrics["n_evaluated"] == len(data) - 100
+    assert metrics["prequential_f1"] > 0.8
+
+
+def test_out_of_core_training_from_csv(students_concat, tmp_path):
+    csv_path = tmp_path / "students.csv"
+    students_concat.to_csv(csv_path, sep=";", index=False)
+
+    result = retrain_incremental_from_csv(
+        csv_path,
+        include_g2=False,
+        model_output_path=tmp_path / "model_without_g2.pkl",
+        run_name="test_incremental",
+        chunksize=200
+    )
+
+    assert result["training_mode"] == "incremental"
+    assert result["n_batches"] == 6
+    assert result["initialized"] is True
+    assert (tmp_path / "model_without_g2.pkl").exists()
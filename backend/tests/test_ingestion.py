@@ -0,0 +1,50 @@
+import hashlib
+import io
+
+import pandas as pd
+import pytest
+
+from modules.ingestion import CsvSchemaError, read_training_csv
+
+
+def test_typed_projection_matches_pandas(dummy_dataset):
+    raw = dummy_dataset.read_bytes()
+    reference = pd.read_csv(dummy_dataset, sep=";")
+
+    df, digest = read_training_csv(io.BytesIO(raw), chunksize=7)
+
+    assert digest == hashlib.sha256(raw).hexdigest()
+    assert "G3" not in df.columns
+    assert df["target"].tolist() == (reference["G3"] >= 10).astype(int).tolist()
+    assert df["G1"].tolist() == reference["G1"].tolist()
+    assert df["source"].tolist() == reference["source"].tolist()
+    assert str(df["source"].dtype) == "category"
+    assert df["G1"].dtype.itemsize == 1
+
+
+def test_extra_columns_are_dropped_and_memory_shrinks(students_concat):
+    raw = students_concat.to_csv(sep=";", index=False).encode()
+
+    df, _ = read_training_csv(io.BytesIO(raw), chunksize=100)
+
+    assert len(df) == len(students_concat)
+    assert "school" not in df.columns
+    assert df.memory_usage(deep=True).sum() < students_concat.memory_usage(deep=True).sum() / 10
+
+
+def test_missing_columns_fail_on_header():
+    class HeaderOnly(io.BytesIO):
+        def read(self, *args):
+            raise AssertionError("le corps du fichier ne doit pas être lu")
+
+    with pytest.raises(CsvSchemaError, match="Colonnes manquantes"):
+        read_training_csv(HeaderOnly(b"source;famsize;G3\nmat;GT3;12\n"))
+
+
+def test_invalid_values_raise_schema_error(dummy_dataset):
+    df = pd.read_csv(dummy_dataset, sep=";").astype({"G1": object})
+    df.loc[3, "G1"] = "douze"
+    raw = df.to_csv(sep=";", index=False).encode()
+
+    with pytest.raises(CsvSchemaError):
+        read_training_csv(io.BytesIO(raw))
@@ -0,0 +1,66 @@
+import threading
+
+from modules.metrics import Counter, Histogram, InfoGauge
+
+
+def sample(text: str, name: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_counter_aggregates_per_thread_shards():
+    counter = Counter("hits_total", "test", ("route",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(("/a",))
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.collect() == {("/a",): 4000}
+    assert 'hits_total{route="/a"} 4000' in counter.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(("/a",), value)
+
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+
+
+def test_info_gauge_replaces_previous_version():
+    info = InfoGauge("model_info", "test", ("model", "version"))
+    info.set(("m", "v1"), 1, replace_prefix=1)
+    info.set(("m", "v2"), 1, replace_prefix=1)
+
+    lines = info.render()
+    assert 'model_info{model="m",version="v2"} 1' in lines
+    assert not any('version="v1"' in line for line in lines)
+
+
+def test_metrics_endpoint_tracks_routes_and_inference(client, student_payload):
+    before = client.get("/metrics").text
+    client.post("/predict-with-g2", json={**student_payload, "absences": 37})
+    client.get("/retrain/inconnu")
+    after = client.get("/metrics").text
+
+    requests = 'http_requests_total{method="POST",route="/predict-with-g2",status="200"}'
+    not_found = 'http_requests_total{method="GET",route="/retrain/{job_id}",status="404"}'
+    inference = 'model_inference_duration_seconds_count{model="with_g2",kind="single"}'
+
+    assert sample(after, requests) == sample(before, requests) + 1
+    assert sample(after, not_found) == sample(before, not_found) + 1
+    assert sample(after, inference) == sample(before, inference) + 1
+    assert "prediction_log_write_duration_seconds_count" in after
+    assert 'model_info{model="with_g2"' in after
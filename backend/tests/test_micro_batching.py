@@ -0,0 +1,175 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from modules.micro_batching import BACKOFF_FLOOR, MicroBatcher
+
+
+class RecordingScorer:
+    """Scoreur factice : prédit 1 si G1 >= 10 et garde la taille des lots."""
+
+    explainable = False
+
+    def __init__(self, compiled: bool):
+        self.compiled = compiled
+        self.batches = []
+
+    def predict_one(self, student):
+        if student["G1"] < 0:
+            raise ValueError("G1 négatif")
+        return int(student["G1"] >= 10)
+
+    def predict_many(self, students: list) -> list:
+        self.batches.append(len(students))
+        return [self.predict_one(student) for student in students]
+
+
+def make_model(compiled: bool = False, version: str = "v1"):
+    return SimpleNamespace(name="with_g2", version=version, scorer=RecordingScorer(compiled))
+
+
+async def predict_all(batcher, model, grades: list) -> list:
+    return await asyncio.gather(
+        *(batcher.predict(model, {"G1": grade}) for grade in grades),
+        return_exceptions=True
+    )
+
+
+def test_low_traffic_is_scored_immediately():
+    batcher = MicroBatcher(max_size=16, max_wait=0.05)
+    model = make_model()
+
+    async def sequential():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for grade in (8, 12, 15):
+            await batcher.predict(model, {"G1": grade})
+            await asyncio.sleep(0.06)
+        return loop.time() - start
+
+    elapsed = asyncio.run(sequential())
+
+    assert model.scorer.batches == [1, 1, 1]
+    # Aucune fenêtre d'attente : uniquement les pauses entre requêtes
+    assert elapsed < 3 * 0.06 + 0.05
+
+
+def test_window_adapts_to_arrival_rate():
+    batcher = MicroBatcher(max_size=16, max_wait=0.002)
+    queue = batcher._queue(make_model())
+
+    queue.gap = 0.5
+    assert batcher.window(queue) == 0.0
+
+    queue.gap = 0.0001
+    assert batcher.window(queue) == pytest.approx(0.0016)
+
+    queue.gap = 0.001
+    assert batcher.window(queue) == 0.002
+
+
+def test_sequential_client_stops_waiting():
+    batcher = MicroBatcher(max_size=16, max_wait=0.02)
+    model = make_model()
+    queue = batcher._queue(model)
+    queue.gap = 0.0001
+
+    async def sequential():
+        for grade in range(20):
+            await batcher.predict(model, {"G1": grade})
+        # Arrivées rapprochées mais jamais simultanées : plus d'attente
+        queue.gap = 0.0001
+        return batcher.window(queue)
+
+    assert asyncio.run(sequential()) == 0.0
+    assert queue.scale < BACKOFF_FLOOR
+    assert model.scorer.batches == [1] * 20
+
+
+def test_compiled_scorer_is_never_delayed():
+    batcher = MicroBatcher(max_size=8, max_wait=0.05)
+    model = make_model(compiled=True)
+    batcher._queue(model).gap = 0.0001
+
+    predictions = asyncio.run(predict_all(batcher, model, [8, 12, 15]))
+
+    assert predictions == [0, 1, 1]
+    assert model.scorer.batches == [1, 1, 1]
+
+
+def test_concurrent_requests_share_batches():
+    batcher = MicroBatcher(max_size=4, max_wait=0.05)
+    model = make_model()
+    grades = list(range(4, 14))
+
+    predictions = asyncio.run(predict_all(batcher, model, grades))
+
+    assert predictions == [int(grade >= 10) for grade in grades]
+    # Premier élève sans attente, puis lots pleins pendant le scoring
+    assert model.scorer.batches == [1, 4, 4, 1]
+
+
+def test_busy_traffic_waits_for_a_fuller_batch():
+    batcher = MicroBatcher(max_size=8, max_wait=0.05)
+    model = make_model()
+    batcher._queue(model).gap = 0.001
+
+    asyncio.run(predict_all(batcher, model, list(range(5))))
+
+    assert model.scorer.batches == [5]
+
+
+def test_invalid_student_only_fails_its_request():
+    batcher = MicroBatcher(max_size=8, max_wait=0.05)
+    model = make_model()
+
+    predictions = asyncio.run(predict_all(batcher, model, [12, -1, 5, 11]))
+
+    assert predictions[0] == 1 and predictions[2:] == [0, 1]
+    assert isinstance(predictions[1], ValueError)
+
+
+def test_new_model_version_gets_its_own_queue():
+    batcher = MicroBatcher(max_size=8, max_wait=0.05)
+    old, new = make_model(version="v1"), make_model(version="v2")
+
+    asyncio.run(predict_all(batcher, old, [12]))
+    asyncio.run(predict_all(batcher, new, [12]))
+
+    assert list(batcher._queues) == [("with_g2", "v2")]
+    assert new.scorer.batches == [1]
+
+
+# -------------------------------------------------------------------
+# API
+# -------------------------------------------------------------------
+
+def test_api_batched_predictions_match_direct_path(client, students_concat, monkeypatch):
+    import main
+
+    columns = list(main.StudentInputWithG2.model_fields)
+    students = students_concat[columns].head(40).to_dict(orient="records")
+    expected = [
+        client.post("/predict-with-g2", json=student).json()["prediction"]
+        for student in students
+    ]
+
+    monkeypatch.setattr(main, "micro_batcher", MicroBatcher(max_size=8, max_wait=0.01))
+    monkeypatch.setattr(main.prediction_cache, "maxsize", 0)
+
+    async def concurrent():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            responses = await asyncio.gather(
+                *(http.post("/predict-with-g2", json=student) for student in students)
+            )
+        return [response.json()["prediction"] for response in responses]
+
+    assert asyncio.run(concurrent()) == expected
+
+    metrics = client.get("/metrics").text
+    assert 'microbatch_size_count{model="with_g2"}' in metrics
+    assert 'microbatch_queue_wait_seconds_bucket{model="with_g2",le="0.01"}' in metrics
+    assert 'model_inference_duration_seconds_count{model="with_g2",kind="microbatch"}' in metrics
@@ -0,0 +1,190 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pytest
+
+from modules.model_registry import ModelRegistry, ModelStore, UnknownModelVersion
+from tests.conftest import SHIPPED_MODELS_DIR
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    for model in SHIPPED_MODELS_DIR.glob("*.pkl"):
+        shutil.copy(model, tmp_path)
+    registry = ModelRegistry(tmp_path)
+    registry.bootstrap()
+    return registry
+
+
+def test_bootstrap_registers_shipped_models(registry):
+    for name in ("with_g2", "without_g2"):
+        versions = registry.versions(name)
+        assert len(versions) == 1
+        assert registry.active_version(name) == versions[0]["version"]
+        assert versions[0]["source"] == f"model_{name}.pkl"
+
+
+def test_save_deduplicates_on_content_hash(registry):
+    first = registry.versions("with_g2")[0]
+    again = registry.save("with_g2", SHIPPED_MODELS_DIR / "model_with_g2.pkl")
+
+    assert again["version"] == first["version"]
+    assert len(registry.versions("with_g2")) == 1
+
+
+def test_promote_and_rollback(registry, tmp_path):
+    initial = registry.active_version("without_g2")
+
+    # Nouveau contenu → nouvelle version (le pipeline "with_g2" fait l'affaire)
+    meta = registry.save("without_g2", SHIPPED_MODELS_DIR / "model_with_g2.pkl")
+    assert registry.active_version("without_g2") == initial
+
+    registry.promote("without_g2", meta["version"])
+    assert registry.active_version("without_g2") == meta["version"]
+
+    registry.rollback("without_g2")
+    assert registry.active_version("without_g2") == initial
+
+    with pytest.raises(UnknownModelVersion):
+        registry.rollback("without_g2")
+    with pytest.raises(UnknownModelVersion):
+        registry.promote("without_g2", "inexistante")
+
+
+def test_store_hot_swaps_by_reference(registry):
+    store = ModelStore(registry)
+    store.reload_all()
+    in_flight = store.get("without_g2")
+
+    meta = registry.save("without_g2", SHIPPED_MODELS_DIR / "model_with_g2.pkl")
+    registry.promote("without_g2", meta["version"])
+    swapped = store.reload("without_g2")
+
+    assert store.get("without_g2") is swapped
+    assert swapped.version == meta["version"]
+    # La prédiction en cours conserve son propre modèle
+    assert in_flight.version != swapped.version
+    assert in_flight.scorer is not swapped.scorer
+
+
+def test_no_partial_files_left_behind(registry):
+    leftovers = [p for p in registry.root.rglob(".*") if p.is_file()]
+    assert leftovers == []
+    assert joblib.load(
+        registry.model_path("with_g2", registry.active_version("with_g2"))
+    ) is not None
+
+
+def test_prediction_carries_model_version(client, student_payload):
+    body = client.post("/predict-with-g2", json=student_payload).json()
+    models = client.get("/models").json()
+
+    assert body["model_version"] == models["with_g2"]["serving_version"]
+
+
+def test_compact_scorer_is_memory_mapped_and_matches_pipeline(registry, students_concat):
+    from modules.data_preparation import prepare_dataset
+
+    scorer, meta = registry.load_scorer("with_g2")
+    pipeline, _ = registry.load("with_g2")
+    X, _ = prepare_dataset(students_concat, include_g2=True)
+
+    assert scorer.compiled
+    assert isinstance(scorer.numeric_weights.base, np.memmap)
+    assert (scorer.predict(X) == pipeline.predict(X)).all()
+    assert meta["scorer"]["format"] == "linear-v1"
+
+
+def test_versions_without_compact_scorer_are_exported_on_load(registry):
+    version = registry.active_version("without_g2")
+    meta_path = registry.root / "without_g2" / f"{version}.json"
+    meta = json.loads(meta_path.read_text())
+    del meta["scorer"]
+    meta_path.write_text(json.dumps(meta))
+    registry.scorer_path("without_g2", version).unlink()
+
+    scorer, meta = registry.load_scorer("without_g2")
+
+    assert scorer.compiled
+    assert registry.scorer_path("without_g2", version).exists()
+    assert "scorer" in registry.metadata("without_g2", version)
+
+
+def test_health_is_a_readiness_probe(client):
+    response = client.get("/health")
+    body = response.json()
+
+    assert response.status_code == 200
+    assert body["checks"] == {"models_loaded": True, "prediction_log": True}
+    assert body["models"]["with_g2"]["compiled"] is True
+
+
+def test_serving_process_does_not_import_training_stack(client, models_dir, tmp_path):
+    env = {
+        **os.environ,
+        "MODELS_DIR": str(models_dir),
+        "LOGS_DIR": str(tmp_path),
+        "PREDICTION_LOG": str(tmp_path / "predictions.jsonl"),
+        "PREDICTION_DB": str(tmp_path / "predictions.db"),
+    }
+    probe = "import sys, main; print(sorted(m for m in ('mlflow', 'sklearn') if m in sys.modules))"
+    # Registre déjà importé et exporté au format compact par la fixture client
+    out = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+
+    assert out.strip().splitlines()[-1] == "[]"
+
+
+def test_store_follows_promotions_made_by_other_processes(registry):
+    store = ModelStore(registry)
+    store.reload_all()
+    store.start_watching(interval=0.05)
+
+    # Registre ouvert séparément : promotion faite par un autre worker
+    other = ModelRegistry(registry.models_dir)
+    meta = other.save("without_g2", SHIPPED_MODELS_DIR / "model_with_g2.pkl")
+    other.promote("without_g2", meta["version"])
+
+    deadline = time.monotonic() + 5
+    while store.get("without_g2").version != meta["version"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    store.stop_watching()
+
+    assert store.get("without_g2").version == meta["version"]
+
+
+def test_import_starts_no_thread(client, models_dir, tmp_path):
+    env = {
+        **os.environ,
+        "MODELS_DIR": str(models_dir),
+        "LOGS_DIR": str(tmp_path),
+        "PREDICTION_LOG": str(tmp_path / "predictions.jsonl"),
+        "PREDICTION_DB": str(tmp_path / "predictions.db"),
+    }
+    # Parent gunicorn (preload_app) : aucun thread avant les forks, les
+    # services du process démarrent avec le lifespan de chaque worker
+    probe = (
+        "import json, threading, main\n"
+        "print(len(threading.enumerate()))\n"
+        "from fastapi.testclient import TestClient\n"
+        "with TestClient(main.app):\n"
+        "    print(json.dumps([t.name for t in threading.enumerate()]))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()
+
+    assert out[-2] == "1"
+    assert {"prediction-log-writer", "model-watcher"} <= set(json.loads(out[-1]))
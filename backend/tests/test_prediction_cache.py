@@ -0,0 +1,48 @@
+from modules.prediction_cache import PredictionCache
+
+
+def test_lru_eviction_and_counters():
+    cache = PredictionCache(maxsize=2)
+
+    cache.put(("m", "v1", 1), 1)
+    cache.put(("m", "v1", 2), 0)
+    assert cache.get(("m", "v1", 1)) == 1  # 1 devient le plus récent
+    cache.put(("m", "v1", 3), 1)           # évince 2
+
+    assert cache.get(("m", "v1", 2)) is None
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_invalidate_keeps_current_version_only():
+    cache = PredictionCache(maxsize=10)
+    cache.put(("with_g2", "v1", 1), 1)
+    cache.put(("with_g2", "v2", 1), 0)
+    cache.put(("without_g2", "v1", 1), 1)
+
+    cache.invalidate("with_g2", keep_version="v2")
+
+    assert cache.get(("with_g2", "v1", 1)) is None
+    assert cache.get(("with_g2", "v2", 1)) == 0
+    assert cache.get(("without_g2", "v1", 1)) == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = PredictionCache(maxsize=0)
+    cache.put(("m", "v1", 1), 1)
+    assert cache.stats()["size"] == 0
+
+
+def test_repeated_prediction_hits_cache(client, student_payload):
+    profile = {**student_payload, "absences": 42}
+    before = client.get("/cache/stats").json()
+
+    first = client.post("/predict-with-g2", json=profile).json()
+    second = client.post("/predict-with-g2", json=profile).json()
+    after = client.get("/cache/stats").json()
+
+    assert first == second
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"] + 1
@@ -0,0 +1,60 @@
+import json
+
+from modules.prediction_log import PredictionLogWriter
+
+
+def read_events(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_events_are_flushed_in_batches_and_drained_on_close(tmp_path):
+    path = tmp_path / "predictions.jsonl"
+    writer = PredictionLogWriter(path, batch_size=10, flush_interval=60)
+    writer.start()
+
+    for i in range(25):
+        writer.write({"event": "prediction", "prediction": i % 2})
+    writer.close()
+
+    events = read_events(path)
+    assert [e["prediction"] for e in events] == [i % 2 for i in range(25)]
+    assert writer.flushes == 3
+
+
+def test_size_based_rotation(tmp_path):
+    path = tmp_path / "predictions.jsonl"
+    writer = PredictionLogWriter(path, batch_size=1, max_bytes=200, backup_count=2)
+    writer.start()
+
+    for i in range(30):
+        writer.write({"event": "prediction", "session_id": f"session-{i:03d}"})
+    writer.close()
+
+    rotated = sorted(p.name for p in tmp_path.iterdir())
+    assert rotated == ["predictions.jsonl", "predictions.jsonl.1", "predictions.jsonl.2"]
+    assert all(p.stat().st_size <= 200 for p in tmp_path.iterdir())
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    writer = PredictionLogWriter(tmp_path / "predictions.jsonl", max_queue=1)
+
+    writer.write({"event": "prediction"})
+    writer.write({"event": "prediction"})
+
+    assert writer.dropped == 1
+
+
+def test_prediction_endpoint_logs_compact_event(client, student_payload):
+    from main import prediction_log
+
+    client.post("/predict-with-g2", json=student_payload, headers={"X-Session-ID": "abc"})
+    prediction_log.close()
+    prediction_log.start()
+
+    event = read_events(prediction_log.path)[-1]
+    assert set(event) == {
+        "event", "timestamp", "session_id", "endpoint",
+        "model", "model_version", "prediction"
+    }
+    assert event["session_id"] == "abc"
+    assert event["endpoint"] == "/predict-with-g2"
@@ -0,0 +1,163 @@
+from modules.prediction_store import PredictionStore
+
+
+def make_event(i, model):
+    return {
+        "event": "prediction",
+        "timestamp": f"2026-01-12T09:{i // 60:02d}:{i % 60:02d}",
+        "session_id": f"session-{i % 3}",
+        "endpoint": f"/predict-{model.replace('_', '-')}",
+        "model": model,
+        "model_version": "v1",
+        "prediction": i % 2,
+    }
+
+
+def test_cursor_pagination_walks_history_newest_first(tmp_path):
+    store = PredictionStore(tmp_path / "predictions.db")
+    store.insert_many([make_event(i, "with_g2") for i in range(25)])
+
+    seen, cursor = [], None
+    while True:
+        page = store.query(limit=10, cursor=cursor)
+        seen += [item["timestamp"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 25
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_filters_on_model_session_and_since(tmp_path):
+    store = PredictionStore(tmp_path / "predictions.db")
+    store.insert_many(
+        [make_event(i, "with_g2") for i in range(10)]
+        + [make_event(i, "without_g2") for i in range(10)]
+    )
+
+    by_model = store.query(model="without_g2", limit=100)["items"]
+    assert len(by_model) == 10
+    assert {item["model"] for item in by_model} == {"without_g2"}
+
+    by_session = store.query(session_id="session-0", limit=100)["items"]
+    assert {item["session_id"] for item in by_session} == {"session-0"}
+
+    recent = store.query(since="2026-01-12T09:00:05", limit=100)["items"]
+    assert len(recent) == 10
+
+
+def test_query_uses_indexes(tmp_path):
+    store = PredictionStore(tmp_path / "predictions.db")
+    plan = store._connection().execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM predictions "
+        "WHERE model = ? AND id < ? ORDER BY id DESC LIMIT 10",
+        ("with_g2", 100)
+    ).fetchall()
+
+    assert "idx_predictions_model" in " ".join(str(tuple(row)) for row in plan)
+
+
+def test_predictions_endpoint_returns_logged_events(client, student_payload):
+    from main import prediction_log
+
+    client.post("/predict-with-g2", json=student_payload, headers={"X-Session-ID": "hist"})
+    prediction_log.close()
+    prediction_log.start()
+
+    page = client.get("/predictions", params={"session_id": "hist", "limit": 5}).json()
+
+    assert page["items"][0]["model"] == "with_g2"
+    assert page["items"][0]["endpoint"] == "/predict-with-g2"
+    assert client.get("/predictions", params={"limit": 0}).status_code == 400
+
+
+def test_rollups_match_events_per_bucket(tmp_path):
+    store = PredictionStore(tmp_path / "predictions.db")
+    events = [make_event(i, "with_g2") for i in range(150)]
+    # Deux flushes : les compteurs s'additionnent
+    store.insert_many(events[:70])
+    store.insert_many(events[70:] + [{
+        "event": "prediction_batch",
+        "timestamp": "2026-01-12T09:01:30",
+        "session_id": "session-0",
+        "endpoint": "/predict-batch-with-g2",
+        "model": "with_g2",
+        "batch_size": 10,
+        "n_errors": 2,
+        "n_positive": 4,
+    }])
+
+    minutes = store.stats("minute", "2026-01-12T09:00:00", "2026-01-12T10:00:00")
+    assert [row["bucket"] for row in minutes] == [
+        "2026-01-12T09:00:00", "2026-01-12T09:01:00", "2026-01-12T09:02:00"
+    ]
+    assert [row["requests"] for row in minutes] == [60, 61, 30]
+    assert minutes[1]["predictions"] == 70
+    assert minutes[1]["n_risk"] == 30 + 6
+    assert minutes[1]["n_errors"] == 2
+
+    by_endpoint = store.stats(
+        "hour", "2026-01-12T00:00:00", "2026-01-13T00:00:00", group_by="endpoint"
+    )
+    assert {row["grp"]: row["predictions"] for row in by_endpoint} == {
+        "/predict-batch-with-g2": 10, "/predict-with-g2": 150
+    }
+
+    sessions = store.stats(
+        "day", "2026-01-12T00:00:00", "2026-01-13T00:00:00", group_by="session"
+    )
+    assert sum(row["requests"] for row in sessions) == 151
+    assert len(sessions) == 3
+
+
+def test_rollups_are_rebuilt_for_existing_history(tmp_path):
+    store = PredictionStore(tmp_path / "predictions.db")
+    store.insert_many([make_event(i, "without_g2") for i in range(20)])
+    expected = store.stats("day", "2026-01-12T00:00:00", "2026-01-13T00:00:00")
+
+    # Base créée avant l'introduction des agrégats
+    with store._connection() as conn:
+        conn.execute("DROP TABLE prediction_rollups")
+        conn.execute("DROP TABLE session_rollups")
+
+    reopened = PredictionStore(tmp_path / "predictions.db")
+    assert reopened.stats("day", "2026-01-12T00:00:00", "2026-01-13T00:00:00") == expected
+
+
+def test_stats_query_reads_only_requested_buckets(tmp_path):
+    store = PredictionStore(tmp_path / "predictions.db")
+    plan = store._connection().execute(
+        "EXPLAIN QUERY PLAN SELECT bucket FROM prediction_rollups "
+        "WHERE granularity = ? AND bucket >= ? AND bucket < ?",
+        ("minute", "2026-01-12T09:00:00", "2026-01-12T10:00:00")
+    ).fetchall()
+
+    assert "PRIMARY KEY" in " ".join(str(tuple(row)) for row in plan)
+
+
+def test_stats_endpoint_counts_logged_predictions(client, student_payload):
+    from main import prediction_log
+
+    for _ in range(3):
+        client.post("/predict-without-g2", json=student_payload, headers={"X-Session-ID": "stats"})
+    prediction_log.close()
+    prediction_log.start()
+
+    stats = client.get("/stats", params={"granularity": "minute", "group_by": "model"}).json()
+    totals = {total["group"]: total for total in stats["totals"]}
+    assert totals["without_g2"]["predictions"] >= 3
+    assert 0 <= totals["without_g2"]["risk_share"] <= 1
+
+    session = client.get(
+        "/stats", params={"granularity": "day", "session_id": "stats"}
+    ).json()
+    assert session["totals"][0]["requests"] == 3
+
+    assert client.get("/stats", params={"granularity": "week"}).status_code == 400
+    assert client.get(
+        "/stats", params={"granularity": "hour", "group_by": "session"}
+    ).status_code == 400
+    assert client.get(
+        "/stats", params={"granularity": "minute", "since": "2020-01-01T00:00:00"}
+    ).status_code == 400
@@ -0,0 +1,204 @@
+import io
+import time
+
+import pandas as pd
+
+from modules.ingestion import read_training_csv
+from modules.retrain_jobs import TERMINAL_STATUSES, RetrainJobManager
+
+
+def wait_for_job(client, job_id, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/retrain/{job_id}").json()
+        if job["status"] in TERMINAL_STATUSES:
+            return job
+        time.sleep(0.2)
+    raise TimeoutError(job_id)
+
+
+def active_versions(client):
+    return {name: m["active_version"] for name, m in client.get("/models").json().items()}
+
+
+def test_retrain_returns_job_id_and_promotes_models(client, dummy_dataset):
+    before = active_versions(client)
+
+    with open(dummy_dataset, "rb") as f:
+        response = client.post(
+            "/retrain", files={"file": ("students.csv", f, "text/csv")}
+        )
+
+    assert response.status_code == 202
+    job = wait_for_job(client, response.json()["job_id"])
+
+    assert job["status"] == "succeeded"
+    assert job["result"]["models_trained"] == ["without_g2", "with_g2"]
+
+    after = active_versions(client)
+    assert after["with_g2"] != before["with_g2"]
+    assert after["with_g2"] == job["result"]["results"]["with_g2"]["model_version"]
+    # "succeeded" : nouvelles versions déjà servies
+    assert client.get("/models").json()["with_g2"]["serving_version"] == after["with_g2"]
+
+    # Profil de référence dans les métadonnées de la version, servi par /drift
+    assert "reference_profile" not in job["result"]["results"]["with_g2"]
+    drift = client.get("/drift", params={"model": "with_g2"}).json()["with_g2"]
+    assert drift["version"] == after["with_g2"]
+    assert drift["reference_samples"] == 20
+
+
+def test_identical_submissions_are_coalesced(client, dummy_dataset):
+    payload = dummy_dataset.read_bytes()
+
+    first = client.post("/retrain", files={"file": ("a.csv", payload, "text/csv")})
+    second = client.post("/retrain", files={"file": ("b.csv", payload, "text/csv")})
+
+    assert second.json()["coalesced"] is True
+    assert second.json()["job_id"] == first.json()["job_id"]
+    wait_for_job(client, first.json()["job_id"])
+
+
+def test_cancelled_job_does_not_publish_models(client, dummy_dataset):
+    df = pd.read_csv(dummy_dataset, sep=";")
+    payload = df.assign(G1=df["G1"] + 1).to_csv(sep=";", index=False).encode()
+    before = active_versions(client)
+
+    job_id = client.post(
+        "/retrain", files={"file": ("students.csv", payload, "text/csv")}
+    ).json()["job_id"]
+    client.delete(f"/retrain/{job_id}")
+
+    job = wait_for_job(client, job_id)
+    assert job["status"] == "cancelled"
+    assert active_versions(client) == before
+
+
+def test_schema_errors_are_rejected_before_queueing(client):
+    response = client.post(
+        "/retrain", files={"file": ("vide.csv", b"a;b\n1;2\n", "text/csv")}
+    )
+
+    assert response.status_code == 400
+    assert "Colonnes manquantes" in response.json()["detail"]
+
+
+def test_failed_job_reports_error(client, dummy_dataset):
+    df = pd.read_csv(dummy_dataset, sep=";").head(3)
+    payload = df.to_csv(sep=";", index=False).encode()
+
+    response = client.post("/retrain", files={"file": ("petit.csv", payload, "text/csv")})
+
+    job = wait_for_job(client, response.json()["job_id"])
+    assert job["status"] == "failed"
+    assert "insuffisant" in job["error"]
+
+
+def test_unknown_job_returns_404(client):
+    assert client.get("/retrain/inconnu").status_code == 404
+
+
+def test_incremental_mode_updates_active_models(client, students_concat):
+    cohorts = [students_concat.iloc[:500], students_concat.iloc[500:]]
+    payloads = [cohort.to_csv(sep=";", index=False).encode() for cohort in cohorts]
+
+    # Modèles actifs livrés (non incrémentaux) : pas d'initialisation sur le seul lot
+    response = client.post(
+        "/retrain",
+        files={"file": ("cohorte_0.csv", payloads[0], "text/csv")},
+        data={"mode": "incremental"}
+    )
+    assert response.status_code == 400
+    assert "non incrémentaux" in response.json()["detail"]
+
+    # Initialisation depuis le feature store, puis mise à jour avec le lot suivant
+    client.post(
+        "/feature-store/rows",
+        files={"file": ("cohorte_0.csv", payloads[0], "text/csv")},
+        data={"cohort": "incremental-init"}
+    )
+    requests = [
+        {"data": {"mode": "incremental", "cohorts": "incremental-init"}},
+        {
+            "files": {"file": ("cohorte_1.csv", payloads[1], "text/csv")},
+            "data": {"mode": "incremental"}
+        },
+    ]
+    results = []
+    for request in requests:
+        response = client.post("/retrain", **request)
+        job = wait_for_job(client, response.json()["job_id"])
+        assert job["status"] == "succeeded", job["error"]
+        results.append(job["result"]["results"]["with_g2"])
+
+    assert results[0]["initialized"] is True
+    assert results[0]["n_samples"] == len(cohorts[0])
+    assert results[1]["initialized"] is False
+    assert results[1]["n_samples"] == len(cohorts[1])
+
+
+def test_unknown_retrain_mode_is_rejected(client, dummy_dataset):
+    response = client.post(
+        "/retrain",
+        files={"file": ("students.csv", dummy_dataset.read_bytes(), "text/csv")},
+        data={"mode": "magique"}
+    )
+    assert response.status_code == 400
+
+
+def test_job_state_is_shared_between_workers(client, dummy_dataset):
+    from main import registry
+
+    df = pd.read_csv(dummy_dataset, sep=";")
+    payload = df.assign(G1=df["G1"] + 2).to_csv(sep=";", index=False).encode()
+    df, digest = read_training_csv(io.BytesIO(payload))
+
+    # Second gestionnaire sur le même registre : un autre worker de l'API
+    other_worker = RetrainJobManager(registry=registry)
+
+    job_id = client.post(
+        "/retrain", files={"file": ("students.csv", payload, "text/csv")}
+    ).json()["job_id"]
+
+    job, coalesced = other_worker.submit(df, digest, "students.csv")
+    assert coalesced is True
+    assert job["job_id"] == job_id
+
+    finished = wait_for_job(client, job_id)
+    assert other_worker.get(job_id)["status"] == finished["status"] == "succeeded"
+    assert other_worker.get(job_id)["result"] == finished["result"]
+    other_worker.shutdown()
+
+
+def test_tuning_is_rejected_for_incremental_mode(client, dummy_dataset):
+    response = client.post(
+        "/retrain",
+        files={"file": ("students.csv", dummy_dataset.read_bytes(), "text/csv")},
+        data={"mode": "incremental", "tune": "true"}
+    )
+    assert response.status_code == 400
+
+
+def test_extra_estimators_require_tuning(client, dummy_dataset):
+    response = client.post(
+        "/retrain",
+        files={"file": ("students.csv", dummy_dataset.read_bytes(), "text/csv")},
+        data={"tune_extra_estimators": "true"}
+    )
+    assert response.status_code == 400
+
+
+def test_tuning_with_extra_estimators(client, dummy_dataset):
+    from modules.tuning import search_space
+
+    response = client.post(
+        "/retrain",
+        files={"file": ("students.csv", dummy_dataset.read_bytes(), "text/csv")},
+        data={"tune": "true", "tune_budget": "30", "tune_extra_estimators": "true"}
+    )
+
+    job = wait_for_job(client, response.json()["job_id"])
+    assert job["status"] == "succeeded", job["error"]
+    tuning = job["result"]["results"]["without_g2"]["tuning"]
+    assert tuning["n_candidates"] == len(search_space(extra_estimators=True))
+
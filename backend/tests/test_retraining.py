@@ -24,3 +24,34 @@ def test_retrain_model_without_g2(dummy_dataset, tmp_path):
     assert model_path.exists()
     assert 0.0 <= results["f1_mean"] <= 1.0
     assert 0.0 <= results["recall_mean"] <= 1.0
+
+
+def test_retrain_models_parallel_matches_sequential(dummy_dataset, tmp_path):
+    from modules.retraining import retrain_models
+
+    df = pd.read_csv(dummy_dataset, sep=";")
+
+    (tmp_path / "seq").mkdir()
+    (tmp_path / "par").mkdir()
+
+    sequential = retrain_models(df, output_dir=tmp_path / "seq", n_jobs=1)
+    parallel = retrain_models(df, output_dir=tmp_path / "par", n_jobs=2)
+
+    assert parallel["mode"] == "parallel"
+    assert parallel["models_trained"] == ["without_g2", "with_g2"]
+    for name in ("without_g2", "with_g2"):
+        assert parallel["results"][name]["f1_mean"] == sequential["results"][name]["f1_mean"]
+        assert (tmp_path / "par" / f"model_{name}.pkl").exists()
+        assert {"cross_validation", "fit", "total"} <= set(parallel["results"][name]["timings"])
+    assert "prepare_shared" in parallel["timings"]
+
+
+def test_retrain_models_skips_with_g2_without_column(dummy_dataset, tmp_path):
+    from modules.retraining import retrain_models
+
+    df = pd.read_csv(dummy_dataset, sep=";").drop(columns="G2")
+
+    results = retrain_models(df, output_dir=tmp_path)
+
+    assert results["results"]["with_g2"]["status"] == "skipped"
+    assert not (tmp_path / "model_with_g2.pkl").exists()
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from benchmarks.serving_bench import (
+    compare_with_baseline,
+    make_payloads,
+    run_benchmark,
+    train_fixture_models,
+)
+
+
+def test_benchmark_reports_latency_percentiles(client, students_concat):
+    from main import app
+
+    results = run_benchmark(
+        app, make_payloads(students_concat), n_requests=40, concurrency=4, warmup=4
+    )
+
+    for endpoint in ("/predict-with-g2", "/predict-without-g2", "/health"):
+        stats = results["endpoints"][endpoint]
+        assert stats["requests"] == 40
+        assert stats["errors"] == 0
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+        assert stats["throughput_rps"] > 0
+
+
+def test_compare_with_baseline_flags_regressions():
+    baseline = {"endpoints": {"/health": {"p95_ms": 10, "p99_ms": 20, "throughput_rps": 1000}}}
+    same = {"endpoints": {"/health": {"p95_ms": 11, "p99_ms": 21, "throughput_rps": 950}}}
+    slower = {"endpoints": {"/health": {"p95_ms": 15, "p99_ms": 20, "throughput_rps": 600}}}
+
+    assert compare_with_baseline(same, baseline, tolerance=0.2) == []
+    assert len(compare_with_baseline(slower, baseline, tolerance=0.2)) == 2
+
+
+def test_fixture_models_are_trained_from_dataset(tmp_path):
+    df = train_fixture_models(tmp_path)
+
+    assert len(df) == 1044
+    assert {p.name for p in tmp_path.iterdir()} == {"model_with_g2.pkl", "model_without_g2.pkl"}
+    assert isinstance(df, pd.DataFrame)
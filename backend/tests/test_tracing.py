@@ -0,0 +1,120 @@
+import json
+
+from modules.tracing import Tracer, span
+
+
+class MemoryWriter:
+    def __init__(self):
+        self.events = []
+
+    def write(self, event: dict):
+        self.events.append(event)
+
+
+def stages(server_timing: str) -> dict:
+    entries = {}
+    for entry in server_timing.split(", "):
+        name, duration = entry.split(";dur=")
+        entries[name] = float(duration)
+    return entries
+
+
+def test_span_without_trace_is_a_no_op():
+    with span("inference"):
+        pass
+
+
+def test_server_timing_sums_repeated_stages():
+    tracer = Tracer()
+    trace, token = tracer.start({})
+    for _ in range(2):
+        with span("inference"):
+            pass
+    with span("log"):
+        pass
+
+    header = tracer.finish(trace, token, "POST /x", {}, 200)
+
+    assert list(stages(header)) == ["inference", "log", "total"]
+    assert stages(header)["total"] >= stages(header)["inference"]
+
+
+def test_sampled_trace_is_exported_as_otlp_json():
+    writer = MemoryWriter()
+    tracer = Tracer(writer=writer, sample_rate=1.0, server_timing=False)
+    trace, token = tracer.start({})
+    with span("inference"):
+        with span("predict"):
+            pass
+
+    assert tracer.finish(trace, token, "POST /predict", {"http.route": "/predict"}, 200) is None
+
+    (event,) = writer.events
+    spans = event["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root, inference, predict = spans
+    assert root["kind"] == 2 and root["name"] == "POST /predict"
+    assert {"key": "http.route", "value": {"stringValue": "/predict"}} in root["attributes"]
+    assert inference["parentSpanId"] == root["spanId"]
+    assert predict["parentSpanId"] == inference["spanId"]
+    assert len({s["traceId"] for s in spans}) == 1 and len(root["traceId"]) == 32
+    assert int(root["startTimeUnixNano"]) <= int(predict["startTimeUnixNano"]) \
+        <= int(predict["endTimeUnixNano"]) <= int(root["endTimeUnixNano"])
+
+
+def test_traceparent_decides_sampling():
+    writer = MemoryWriter()
+    tracer = Tracer(writer=writer, sample_rate=0.5)
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+    not_sampled, token = tracer.start({"traceparent": f"00-{trace_id}-{parent_id}-00"})
+    tracer.finish(not_sampled, token, "GET /", {}, 200)
+    sampled, token = tracer.start({"traceparent": f"00-{trace_id}-{parent_id}-01"})
+    tracer.finish(sampled, token, "GET /", {}, 200)
+
+    (event,) = writer.events
+    root = event["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert root["traceId"] == trace_id
+    assert root["parentSpanId"] == parent_id
+
+
+def test_sampling_requires_a_writer():
+    assert Tracer(sample_rate=1.0, server_timing=False).enabled is False
+
+
+# -------------------------------------------------------------------
+# API
+# -------------------------------------------------------------------
+
+def test_prediction_returns_server_timing(client, student_payload):
+    response = client.post(
+        "/predict-with-g2?explain=true", json={**student_payload, "absences": 41}
+    )
+
+    timings = stages(response.headers["Server-Timing"])
+    for stage in ("validate", "lookup", "inference", "explain", "log", "audit_log", "total"):
+        assert stage in timings
+    assert timings["total"] >= timings["inference"]
+
+
+def test_batch_prediction_returns_server_timing(client, student_payload):
+    response = client.post("/predict-batch-with-g2", json=[student_payload] * 3)
+
+    timings = stages(response.headers["Server-Timing"])
+    for stage in ("validate", "dataframe", "inference", "log"):
+        assert stage in timings
+
+
+def test_sampled_requests_are_written_to_span_log(client, student_payload, monkeypatch):
+    import main
+
+    writer = MemoryWriter()
+    monkeypatch.setattr(main.tracer, "writer", writer)
+    monkeypatch.setattr(main.tracer, "sample_rate", 1.0)
+
+    client.post("/predict-without-g2", json={**student_payload, "absences": 43})
+
+    (event,) = writer.events
+    spans = event["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans[0]["name"] == "POST /predict-without-g2"
+    assert {"validate", "lookup", "inference", "log", "audit_log"} <= {s["name"] for s in spans}
+    json.dumps(event)
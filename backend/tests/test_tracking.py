@@ -0,0 +1,49 @@
+import pandas as pd
+
+from modules.retraining import retrain_model
+from modules.tracking import MemoryTracker, MlflowTracker, set_tracker
+
+
+def test_retrain_model_collects_run_in_one_write(dummy_dataset, tmp_path):
+    tracker = MemoryTracker()
+    previous = set_tracker(tracker)
+    try:
+        result = retrain_model(
+            df=pd.read_csv(dummy_dataset, sep=";"),
+            include_g2=True,
+            model_output_path=tmp_path / "model.pkl",
+            run_name="test_tracking"
+        )
+    finally:
+        set_tracker(previous)
+
+    [run] = tracker.runs
+    assert run["run_name"] == "test_tracking"
+    assert run["params"]["include_g2"] is True
+    assert run["metrics"]["f1_mean"] == result["f1_mean"]
+    assert run["model"] is not None
+    assert "tracking" in result["timings"]
+
+
+def test_mlflow_tracker_logs_batch_then_model_in_background(monkeypatch, tmp_path):
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    from mlflow.tracking import MlflowClient
+    from sklearn.linear_model import LogisticRegression
+
+    uri = f"file://{tmp_path / 'mlruns'}"
+    tracker = MlflowTracker(uri=uri, experiment="test")
+    model = LogisticRegression().fit([[0.0], [1.0]], [0, 1])
+
+    with tracker.start_run("background") as run:
+        run.log_params({"model_type": "LogisticRegression", "cv_folds": 5})
+        run.log_metrics({"f1_mean": 0.9, "recall_mean": 0.8})
+        run.log_model(model)
+
+    assert tracker.flush(timeout=120)
+
+    client = MlflowClient(uri)
+    [logged] = client.search_runs([client.get_experiment_by_name("test").experiment_id])
+    assert logged.info.run_name == "background"
+    assert logged.info.status == "FINISHED"
+    assert logged.data.params == {"model_type": "LogisticRegression", "cv_folds": "5"}
+    assert logged.data.metrics == {"f1_mean": 0.9, "recall_mean": 0.8}
@@ -0,0 +1,93 @@
+import pandas as pd
+
+from modules.retraining import retrain_model, retrain_models
+from modules.training_cache import TrainingCache
+
+
+def _retrain(df, path, cache, **kwargs):
+    return retrain_model(
+        df=df,
+        include_g2=False,
+        model_output_path=path,
+        run_name="test_cache",
+        cache=cache,
+        **kwargs
+    )
+
+
+def test_identical_retrain_is_served_from_cache(dummy_dataset, tmp_path):
+    df = pd.read_csv(dummy_dataset, sep=";")
+    cache = TrainingCache(tmp_path / "cache")
+
+    first = _retrain(df, tmp_path / "first.pkl", cache)
+    # Même contenu, index et ordre des colonnes différents
+    reuploaded = df[df.columns[::-1]].set_index(df.index + 100)
+    second = _retrain(reuploaded, tmp_path / "second.pkl", cache)
+
+    assert first["cache_hit"] is False
+    assert second["cache_hit"] is True
+    assert second["f1_mean"] == first["f1_mean"]
+    assert second["model_path"] == "second.pkl"
+    assert "cross_validation" not in second["timings"]
+    assert (tmp_path / "second.pkl").read_bytes() == (tmp_path / "first.pkl").read_bytes()
+
+
+def test_cache_key_depends_on_data_and_config(dummy_dataset, tmp_path):
+    df = pd.read_csv(dummy_dataset, sep=";")
+    cache = TrainingCache(tmp_path / "cache")
+
+    _retrain(df, tmp_path / "a.pkl", cache)
+    changed = df.copy()
+    changed.loc[0, "absences"] = 30
+
+    assert _retrain(changed, tmp_path / "b.pkl", cache)["cache_hit"] is False
+    assert _retrain(df, tmp_path / "c.pkl", cache, tune=True, tune_budget=5)["cache_hit"] is False
+    assert cache.stats()["entries"] == 3
+
+
+def test_cache_evicts_least_recently_used(dummy_dataset, tmp_path):
+    df = pd.read_csv(dummy_dataset, sep=";")
+    cache = TrainingCache(tmp_path / "cache", max_entries=2)
+
+    frames = []
+    for i in range(3):
+        frame = df.copy()
+        frame.loc[0, "absences"] = i
+        frames.append(frame)
+
+    _retrain(frames[0], tmp_path / "0.pkl", cache)
+    _retrain(frames[1], tmp_path / "1.pkl", cache)
+    assert _retrain(frames[0], tmp_path / "0.pkl", cache)["cache_hit"]  # 0 plus récent que 1
+    _retrain(frames[2], tmp_path / "2.pkl", cache)
+
+    assert cache.stats()["entries"] == 2
+    assert _retrain(frames[0], tmp_path / "0.pkl", cache)["cache_hit"]
+    assert not _retrain(frames[1], tmp_path / "1.pkl", cache)["cache_hit"]
+
+
+def test_cache_respects_size_limit(dummy_dataset, tmp_path):
+    df = pd.read_csv(dummy_dataset, sep=";")
+    cache = TrainingCache(tmp_path / "cache", max_bytes=1)
+
+    _retrain(df, tmp_path / "a.pkl", cache)
+    changed = df.copy()
+    changed.loc[0, "absences"] = 30
+    _retrain(changed, tmp_path / "b.pkl", cache)
+
+    # L'entrée la plus récente est toujours conservée
+    assert cache.stats()["entries"] == 1
+    assert _retrain(changed, tmp_path / "b.pkl", cache)["cache_hit"]
+
+
+def test_retrain_models_reports_cache_hit_per_scenario(dummy_dataset, tmp_path):
+    df = pd.read_csv(dummy_dataset, sep=";")
+    cache = TrainingCache(tmp_path / "cache")
+    (tmp_path / "first").mkdir()
+    (tmp_path / "second").mkdir()
+
+    retrain_models(df, output_dir=tmp_path / "first", cache=cache)
+    second = retrain_models(df, output_dir=tmp_path / "second", cache=cache)
+
+    for name in ("without_g2", "with_g2"):
+        assert second["results"][name]["cache_hit"] is True
+        assert (tmp_path / "second" / f"model_{name}.pkl").exists()
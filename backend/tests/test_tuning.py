@@ -0,0 +1,55 @@
+import pandas as pd
+from sklearn.model_selection import StratifiedKFold
+
+from modules.data_preparation import prepare_dataset
+from modules.preprocessing import make_preprocessor
+from modules.retraining import retrain_model
+from modules.tuning import DEFAULT_CONFIG, search_space, successive_halving
+
+
+def _search_inputs(students_concat):
+    X, y = prepare_dataset(students_concat, include_g2=False)
+    splits = list(StratifiedKFold(n_splits=3, shuffle=True, random_state=42).split(X, y))
+    return X, y, make_preprocessor(X), splits
+
+
+def test_successive_halving_keeps_best_candidate(students_concat):
+    X, y, preprocessor, splits = _search_inputs(students_concat)
+    candidates = search_space()[:9]
+
+    result = successive_halving(X, y, preprocessor, splits, candidates, time_budget=120)
+
+    assert result["best_params"] in candidates
+    assert not result["budget_exhausted"]
+    # 9 candidats, facteur 3 : 9 puis 3 candidats
+    assert [r["n_candidates"] for r in result["rounds"]] == [9, 3]
+    assert result["rounds"][-1]["resources"] == min(len(train) for train, _ in splits)
+    assert result["n_fits"] == (9 + 3) * len(splits)
+
+
+def test_exhausted_budget_falls_back_to_default(students_concat):
+    X, y, preprocessor, splits = _search_inputs(students_concat)
+
+    result = successive_halving(X, y, preprocessor, splits, search_space(), time_budget=0)
+
+    assert result["budget_exhausted"]
+    assert result["best_params"] == DEFAULT_CONFIG
+    assert result["n_fits"] == 0
+
+
+def test_retrain_model_with_tuning_reports_search(dummy_dataset, tmp_path):
+    df = pd.read_csv(dummy_dataset, sep=";")
+
+    results = retrain_model(
+        df=df,
+        include_g2=False,
+        model_output_path=tmp_path / "model.pkl",
+        run_name="test_tuning",
+        tune=True,
+        tune_budget=30
+    )
+
+    assert results["tuning"]["best_params"]["estimator"] == results["model_type"]
+    assert results["tuning"]["n_fits"] > 0
+    assert "search" in results["timings"]
+    assert (tmp_path / "model.pkl").exists()
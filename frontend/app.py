@@ -1,12 +1,12 @@
 import streamlit as st
 import requests
 
+import backend_client
+
 # -------------------------------------------------------------------
 # Configuration
 # -------------------------------------------------------------------
 
-BACKEND_URL = "http://backend:8000"
-
 st.set_page_config(
     page_title="Prédiction de la réussite scolaire",
     page_icon="🎓",
@@ -166,38 +166,46 @@ if st.button("🔮 Lancer la prédiction"):
         endpoint = "/predict-without-g2"
 
     try:
-        response = requests.post(
-            f"{BACKEND_URL}{endpoint}",
-            json=payload,
-            timeout=5
-        )
+        result, duration_ms = backend_client.predict(endpoint, payload)
+
+        st.success("Prédiction réalisée avec succès ✅")
 
-        if response.status_code == 200:
-            result = response.json()
+        if result["prediction"] == 1:
+            st.markdown("### 🟢 Réussite probable")
+        else:
+            st.markdown("### 🔴 Risque d’échec")
 
-            st.success("Prédiction réalisée avec succès ✅")
+        st.markdown(
+            f"""
+            **Mode utilisé :** {result['mode']}
+            **Interprétation :** {result['interpretation']}
+            """
+        )
 
-            if result["prediction"] == 1:
-                st.markdown("### 🟢 Réussite probable")
-            else:
-                st.markdown("### 🔴 Risque d’échec")
+        explanation = result.get("explanation")
+        if explanation:
+            st.markdown("**Principaux facteurs :**")
+            st.markdown("\n".join(
+                f"- {'🟢' if c['contribution'] > 0 else '🔴'} `{c['feature']}` "
+                f"({c['contribution']:+.2f})"
+                for c in explanation["contributions"]
+            ))
+            st.caption(
+                "Contribution de chaque variable au score du modèle : "
+                "positive vers la réussite, négative vers le risque d’échec."
+            )
 
-            st.markdown(
-                f"""
-                **Mode utilisé :** {result['mode']}
-                **Interprétation :** {result['interpretation']}
-                """
+        if mode == "Prédiction précoce (sans G2)":
+            st.info(
+                "ℹ️ Cette prédiction est basée sur un niveau "
+                "d’information limité et doit être interprétée "
+                "avec prudence."
             )
 
-            if mode == "Prédiction précoce (sans G2)":
-                st.info(
-                    "ℹ️ Cette prédiction est basée sur un niveau "
-                    "d’information limité et doit être interprétée "
-                    "avec prudence."
-                )
+        st.caption(f"⏱️ {duration_ms:.0f} ms")
 
-        else:
-            st.error("Erreur lors de la prédiction")
+    except requests.exceptions.HTTPError:
+        st.error("Erreur lors de la prédiction")
 
     except requests.exceptions.RequestException as e:
         st.error("Impossible de contacter l’API backend")
@@ -0,0 +1,148 @@
+import os
+import time
+import uuid
+from collections import deque
+
+import requests
+import streamlit as st
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://backend:8000")
+
+# Connexions keep-alive conservées par le pool (partagé par toutes les sessions)
+POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "20"))
+
+# Nouvelles tentatives : erreurs de connexion et 502/503/504 (API en
+# redémarrage), avec attente exponentielle 0.2 s, 0.4 s, 0.8 s ; uniquement
+# pour les requêtes idempotentes (GET, prédictions)
+RETRIES = int(os.getenv("BACKEND_RETRIES", "3"))
+BACKOFF = float(os.getenv("BACKEND_BACKOFF", "0.2"))
+
+# Latences conservées par session Streamlit
+LATENCY_HISTORY = 50
+
+
+# -------------------------------------------------------------------
+# Session HTTP partagée (une seule par process Streamlit)
+# -------------------------------------------------------------------
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """
+    Session keep-alive avec pool de connexions, partagée entre les reruns
+    et entre les utilisateurs : une poignée de connexions TCP vers l'API
+    au lieu d'une par clic.
+    """
+    def adapter(methods: set) -> HTTPAdapter:
+        retry = Retry(
+            total=RETRIES,
+            backoff_factor=BACKOFF,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(methods),
+            raise_on_status=False,
+        )
+        return HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    # POST / DELETE jamais rejoués (upload de ré-entraînement, ajout au
+    # feature store) : une nouvelle tentative après un timeout pourrait
+    # soumettre un second job ou ajouter les lignes deux fois
+    session.mount("http://", adapter({"GET"}))
+    session.mount("https://", adapter({"GET"}))
+    # Prédictions (/predict-*) : sans effet de bord, POST rejouable
+    session.mount(f"{BACKEND_URL}/predict", adapter({"GET", "POST"}))
+    return session
+
+
+def session_id() -> str:
+    """Identifiant de la session Streamlit, transmis à l'API (X-Session-ID)."""
+    if "session_id" not in st.session_state:
+        st.session_state["session_id"] = str(uuid.uuid4())
+    return st.session_state["session_id"]
+
+
+# -------------------------------------------------------------------
+# Mesure de latence côté client
+# -------------------------------------------------------------------
+
+def record_latency(path: str, duration_ms: float, status):
+    history = st.session_state.setdefault("backend_latencies", deque(maxlen=LATENCY_HISTORY))
+    history.append({
+        "path": path,
+        "duration_ms": round(duration_ms, 1),
+        "status": status,
+    })
+    logger.debug("BACKEND | {} | status={} | {:.1f}ms", path, status, duration_ms)
+
+
+def latency_stats() -> dict:
+    """Résumé des derniers appels de la session (affichage)."""
+    history = list(st.session_state.get("backend_latencies", ()))
+    if not history:
+        return {}
+    durations = sorted(call["duration_ms"] for call in history)
+    return {
+        "calls": len(history),
+        "last_ms": history[-1]["duration_ms"],
+        "median_ms": durations[len(durations) // 2],
+        "max_ms": durations[-1],
+    }
+
+
+def request(method: str, path: str, timeout: float = 10, **kwargs) -> requests.Response:
+    """Appel à l'API via la session partagée, latence mesurée."""
+    headers = {"X-Session-ID": session_id(), **kwargs.pop("headers", {})}
+
+    start = time.perf_counter()
+    try:
+        response = get_session().request(
+            method, f"{BACKEND_URL}{path}", headers=headers, timeout=timeout, **kwargs
+        )
+    except requests.exceptions.RequestException:
+        record_latency(path, (time.perf_counter() - start) * 1000, "error")
+        raise
+
+    record_latency(path, (time.perf_counter() - start) * 1000, response.status_code)
+    return response
+
+
+def get(path: str, **kwargs) -> requests.Response:
+    return request("GET", path, **kwargs)
+
+
+def post(path: str, **kwargs) -> requests.Response:
+    return request("POST", path, **kwargs)
+
+
+def delete(path: str, **kwargs) -> requests.Response:
+    return request("DELETE", path, **kwargs)
+
+
+# -------------------------------------------------------------------
+# Prédictions
+# -------------------------------------------------------------------
+
+def predict(endpoint: str, payload: dict) -> tuple:
+    """
+    Prédiction unitaire. Pas de mémoïsation côté interface : un profil déjà
+    simulé ("what-if") est resservi par le cache de l'API, indexé sur la
+    version du modèle servi, et chaque prédiction reste journalisée.
+
+    Retourne (résultat, latence en ms).
+    """
+    start = time.perf_counter()
+    response = post(
+        endpoint,
+        json=payload,
+        # Contributions des features : quelques µs côté API, affichées au conseiller
+        params={"explain": "true"},
+        timeout=5
+    )
+    response.raise_for_status()
+    return response.json(), (time.perf_counter() - start) * 1000
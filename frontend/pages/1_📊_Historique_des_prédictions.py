@@ -1,13 +1,12 @@
 import streamlit as st
-import json
-from pathlib import Path
+import requests
 import pandas as pd
 
+import backend_client
+
 st.set_page_config(page_title="Historique des prédictions", layout="wide")
 st.title("📊 Historique des prédictions")
 
-LOG_FILE = Path("/app/logs/predictions.jsonl")
-
 st.markdown(
     """
     Cette page affiche l’historique des prédictions réalisées par l’API.
@@ -16,52 +15,135 @@ st.markdown(
     """
 )
 
-if not LOG_FILE.exists():
-    st.warning("Aucun fichier de log trouvé.")
-    st.stop()
+# -------------------------------------------------------------------
+# Activité (agrégats par tranche de temps, GET /stats)
+# -------------------------------------------------------------------
 
-records = []
+st.subheader("📈 Activité")
 
-with open(LOG_FILE, "r") as f:
-    for line in f:
-        try:
-            log = json.loads(line)
+GRANULARITIES = {"Minute (60 dernières)": "minute", "Heure (48 dernières)": "hour", "Jour (30 derniers)": "day"}
+FREQUENCIES = {"minute": "min", "hour": "h", "day": "D"}
+GROUPS = {"Modèle": "model", "Endpoint": "endpoint"}
 
-            extra = log.get("record", {}).get("extra", {})
-            if extra.get("event") == "prediction":
-                records.append({
-                    "Date": extra.get("timestamp"),
-                    "Session ID": extra.get("session_id"),
-                    "Endpoint": extra.get("endpoint"),
-                    "Modèle": extra.get("model"),
-                    "Prédiction": extra.get("prediction"),
-                })
+stats_col1, stats_col2 = st.columns(2)
+with stats_col1:
+    granularity = GRANULARITIES[st.selectbox("Granularité", list(GRANULARITIES))]
+with stats_col2:
+    group_by = GROUPS[st.selectbox("Regrouper par", list(GROUPS))]
 
-        except json.JSONDecodeError:
-            continue
 
+def fetch_stats(**params) -> dict:
+    response = backend_client.get("/stats", params=params)
+    response.raise_for_status()
+    return response.json()
 
 
-if not records:
-    st.info("Aucune prédiction enregistrée pour le moment.")
+def series_frame(stats: dict, value: str) -> pd.DataFrame:
+    """Tranches en lignes, groupes en colonnes ; tranches vides à zéro."""
+    index = pd.date_range(
+        stats["since"], stats["until"], freq=FREQUENCIES[stats["granularity"]], inclusive="left"
+    )
+    if not stats["series"]:
+        return pd.DataFrame(index=index)
+    frame = pd.DataFrame(stats["series"])
+    frame["bucket"] = pd.to_datetime(frame["bucket"])
+    return frame.pivot_table(
+        index="bucket", columns="group", values=value, aggfunc="sum"
+    ).reindex(index)
+
+
+try:
+    stats = fetch_stats(granularity=granularity, group_by=group_by)
+    by_model = fetch_stats(granularity=granularity, group_by="model")
+    by_session = fetch_stats(granularity="day", group_by="session")
+except requests.exceptions.RequestException as e:
+    st.error("Impossible de contacter l’API backend")
+    st.text(str(e))
     st.stop()
 
-df = pd.DataFrame(records)
-df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-df = df.sort_values("Date", ascending=False)
+st.markdown("**Prédictions par tranche**")
+st.bar_chart(series_frame(stats, "predictions").fillna(0))
+
+st.markdown("**Part de « Risque d’échec » par modèle**")
+st.line_chart(series_frame(by_model, "risk_share"))
+
+if by_session["totals"]:
+    sessions = pd.DataFrame(by_session["totals"]).rename(columns={
+        "group": "Session ID",
+        "requests": "Requêtes",
+        "predictions": "Prédictions",
+        "risk_share": "Part risque d’échec",
+    }).sort_values("Prédictions", ascending=False)
+    st.markdown("**Sessions (30 derniers jours)**")
+    st.dataframe(
+        sessions[["Session ID", "Requêtes", "Prédictions", "Part risque d’échec"]].head(20),
+        use_container_width=True
+    )
+
+# -------------------------------------------------------------------
+# Détail des prédictions
+# -------------------------------------------------------------------
+
+st.subheader("🗂️ Détail")
 
 # Filtres simples
 col1, col2 = st.columns(2)
 with col1:
     model_filter = st.selectbox(
         "Filtrer par modèle",
-        ["Tous"] + sorted(df["Modèle"].dropna().unique().tolist())
+        ["Tous", "with_g2", "without_g2"]
     )
 
 with col2:
     limit = st.slider("Nombre de lignes", 5, 100, 20)
 
+# Pagination par curseur : pile des curseurs des pages déjà vues
+filters = (model_filter, limit)
+if st.session_state.get("history_filters") != filters:
+    st.session_state["history_filters"] = filters
+    st.session_state["history_cursors"] = [None]
+
+cursors = st.session_state["history_cursors"]
+
+params = {"limit": limit, "cursor": cursors[-1]}
 if model_filter != "Tous":
-    df = df[df["Modèle"] == model_filter]
+    params["model"] = model_filter
+
+try:
+    response = backend_client.get("/predictions", params=params)
+    response.raise_for_status()
+    page = response.json()
+except requests.exceptions.RequestException as e:
+    st.error("Impossible de contacter l’API backend")
+    st.text(str(e))
+    st.stop()
+
+if not page["items"]:
+    st.info("Aucune prédiction enregistrée pour le moment.")
+    st.stop()
+
+df = pd.DataFrame(page["items"]).rename(columns={
+    "timestamp": "Date",
+    "session_id": "Session ID",
+    "endpoint": "Endpoint",
+    "model": "Modèle",
+    "model_version": "Version",
+    "prediction": "Prédiction",
+    "batch_size": "Nb élèves",
+})
+df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+
+st.dataframe(
+    df[["Date", "Session ID", "Endpoint", "Modèle", "Version", "Prédiction", "Nb élèves"]],
+    use_container_width=True
+)
 
-st.dataframe(df.head(limit), use_container_width=True)
+prev_col, next_col = st.columns(2)
+with prev_col:
+    if len(cursors) > 1 and st.button("⬅️ Page précédente"):
+        cursors.pop()
+        st.rerun()
+with next_col:
+    if page["next_cursor"] is not None and st.button("Page suivante ➡️"):
+        cursors.append(page["next_cursor"])
+        st.rerun()
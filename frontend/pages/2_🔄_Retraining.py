@@ -1,7 +1,7 @@
 import streamlit as st
-import requests
+import time
 
-BACKEND_URL = "http://backend:8000"
+import backend_client
 
 st.set_page_config(page_title="Ré-entrainement", layout="centered")
 st.title("🔄 Ré-entrainement des modèles")
@@ -24,41 +24,77 @@ uploaded_file = st.file_uploader(
     type=["csv"]
 )
 
+TERMINAL_STATUSES = {"succeeded", "failed", "cancelled"}
+
+
+def show_results(res):
+    """Résumé clair des résultats d'un job terminé."""
+    results = res.get("results", {})
+
+    for model_name, metrics in results.items():
+        st.subheader(f"📦 {model_name}")
+
+        if metrics.get("status") == "skipped":
+            st.warning(metrics.get("reason"))
+            continue
+
+        st.metric("F1-score moyen", f"{metrics['f1_mean']:.3f}")
+        st.metric("Recall moyen", f"{metrics['recall_mean']:.3f}")
+        st.caption(f"Modèle sauvegardé : `{metrics['model_path']}`")
+
+
 if uploaded_file and st.button("🚀 Lancer le ré-entrainement"):
-    with st.spinner("Ré-entrainement en cours..."):
-        files = {
-            "file": (uploaded_file.name, uploaded_file.getvalue(), "text/csv")
-        }
-
-        try:
-            response = requests.post(
-                f"{BACKEND_URL}/retrain",
-                files=files,
-                timeout=300
-            )
+    files = {
+        "file": (uploaded_file.name, uploaded_file.getvalue(), "text/csv")
+    }
+
+    try:
+        response = backend_client.post("/retrain", files=files, timeout=30)
+
+        if response.status_code == 202:
+            st.session_state["retrain_job_id"] = response.json()["job_id"]
+        else:
+            st.error(f"Erreur backend ({response.status_code})")
+            st.text(response.text)
+
+    except Exception as e:
+        st.error(f"Erreur backend : {e}")
 
-            if response.status_code == 200:
-                res = response.json()
+job_id = st.session_state.get("retrain_job_id")
 
-                st.success("✅ Ré-entrainement terminé")
+if job_id:
+    st.caption(f"Job de ré-entrainement : `{job_id}`")
 
-                # Résumé clair des résultats
-                results = res.get("results", {})
+    if st.button("⏹️ Annuler le ré-entrainement"):
+        backend_client.delete(f"/retrain/{job_id}")
 
-                for model_name, metrics in results.items():
-                    st.subheader(f"📦 {model_name}")
+    status_placeholder = st.empty()
 
-                    if metrics.get("status") == "skipped":
-                        st.warning(metrics.get("reason"))
-                        continue
+    try:
+        # Suivi de l'avancement (le backend répond immédiatement)
+        while True:
+            job = backend_client.get(f"/retrain/{job_id}").json()
+
+            if job["status"] in TERMINAL_STATUSES:
+                break
+
+            progress = job.get("progress") or {}
+            status_placeholder.info(
+                f"⏳ {job['status']} – étape : {progress.get('step', 'en attente')} "
+                f"({progress.get('completed', 0)}/{progress.get('total', 2)})"
+            )
+            time.sleep(2)
 
-                    st.metric("F1-score moyen", f"{metrics['f1_mean']:.3f}")
-                    st.metric("Recall moyen", f"{metrics['recall_mean']:.3f}")
-                    st.caption(f"Modèle sauvegardé : `{metrics['model_path']}`")
+        status_placeholder.empty()
 
-            else:
-                st.error(f"Erreur backend ({response.status_code})")
-                st.text(response.text)
+        if job["status"] == "succeeded":
+            st.success("✅ Ré-entrainement terminé")
+            show_results(job["result"])
+        elif job["status"] == "cancelled":
+            st.warning("Ré-entrainement annulé, les modèles n’ont pas été modifiés")
+        else:
+            st.error("Échec du ré-entrainement")
+            st.text(job.get("error"))
 
-        except Exception as e:
-            st.error(f"Erreur backend : {e}")
+    except Exception as e:
+        st.error(f"Erreur backend : {e}")